@@ -0,0 +1,107 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from wp_client import get_client
+from wp_probe import get_probe_cache
+
+# 저장된 모든 계정을 동시에 점검한다 (REST API 접근 + 인증/권한).
+# 계정마다 스레드 하나로 한꺼번에 보내므로 전체 시간은 가장 느린 사이트 하나의 시간 정도이고,
+# 사이트마다 deadline 을 넘기면 결과를 기다리지 않고 '시간 초과' 로 표시한다 (죽은 도메인이 점검을 붙잡지 않는다).
+
+DEFAULT_DEADLINE = 10.0
+# 연결 타임아웃. 읽기 타임아웃은 deadline 과 같게 둔다.
+CONNECT_TIMEOUT = 5.0
+MAX_SWEEP_WORKERS = 128
+
+STATUS_OK = 'ok'
+STATUS_NO_WRITE = 'no_write'
+STATUS_AUTH_FAILED = 'auth_failed'
+STATUS_UNREACHABLE = 'unreachable'
+STATUS_TIMEOUT = 'timeout'
+STATUS_ERROR = 'error'
+STATUS_NO_PASSWORD = 'no_password'
+
+STATUS_LABELS = {
+    STATUS_OK: '정상',
+    STATUS_NO_WRITE: '글 작성 권한 없음',
+    STATUS_AUTH_FAILED: '인증 실패',
+    STATUS_UNREACHABLE: 'REST API 접근 불가',
+    STATUS_TIMEOUT: '시간 초과',
+    STATUS_ERROR: '네트워크 오류',
+    STATUS_NO_PASSWORD: '비밀번호 필요',
+}
+
+
+class HealthResult:
+    def __init__(self, account, status, detail='', elapsed=0.0, probe=None):
+        self.account = account
+        self.status = status
+        self.detail = detail
+        self.elapsed = elapsed
+        self.probe = probe
+
+    @property
+    def ok(self):
+        return self.status == STATUS_OK
+
+    @property
+    def label(self):
+        text = STATUS_LABELS[self.status]
+        return f'{text} ({self.detail})' if self.detail else text
+
+
+def classify(probe):
+    if probe.index_status == 401 or probe.user_status == 401:
+        return STATUS_AUTH_FAILED, ''
+    if not probe.reachable:
+        return STATUS_UNREACHABLE, probe.error or str(probe.index_status)
+    if probe.can_write:
+        return STATUS_OK, '일괄 발행 지원' if probe.supports_batch else ''
+    if probe.authenticated:
+        return STATUS_NO_WRITE, ', '.join(probe.user.get('roles', []))
+    return STATUS_ERROR, str(probe.user_status)
+
+
+def check_account(account, deadline=DEFAULT_DEADLINE):
+    started = time.perf_counter()
+    if not account.get('password'):
+        return HealthResult(account, STATUS_NO_PASSWORD)
+    client = get_client(account['domain'], account['username'], account['password'])
+    try:
+        probe, _ = get_probe_cache().probe(client, refresh=True, timeout=(min(CONNECT_TIMEOUT, deadline), deadline))
+    except Exception as e:
+        return HealthResult(account, STATUS_ERROR, type(e).__name__, time.perf_counter() - started)
+    status, detail = classify(probe)
+    return HealthResult(account, status, detail, time.perf_counter() - started, probe)
+
+
+def sweep(accounts, on_result=None, deadline=DEFAULT_DEADLINE, should_cancel=None):
+    # 모든 계정을 동시에 점검해 입력 순서대로 HealthResult 목록을 돌려준다.
+    # on_result(index, result) 는 결과가 도착하는 순서대로 이 스레드에서 호출된다.
+    results = [None] * len(accounts)
+    if not accounts:
+        return results
+
+    def deliver(index, result):
+        results[index] = result
+        if on_result:
+            on_result(index, result)
+
+    end = time.monotonic() + deadline
+    pool = ThreadPoolExecutor(max_workers=min(MAX_SWEEP_WORKERS, len(accounts)), thread_name_prefix='wpbot-health')
+    try:
+        futures = {pool.submit(check_account, account, deadline): index for index, account in enumerate(accounts)}
+        pending = set(futures)
+        while pending and not (should_cancel and should_cancel()):
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=min(remaining, 0.5), return_when=FIRST_COMPLETED)
+            for future in done:
+                deliver(futures[future], future.result())
+        for future in pending:
+            # 아직 응답이 없는 사이트는 기다리지 않는다 (요청 타임아웃이 지나면 스레드는 스스로 끝난다).
+            index = futures[future]
+            deliver(index, HealthResult(accounts[index], STATUS_TIMEOUT, f'{deadline:.0f}s', deadline))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
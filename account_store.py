@@ -0,0 +1,107 @@
+import json
+import os
+import threading
+from app_paths import data_path
+from wp_client import normalize_domain
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+
+# 추가한 워드프레스 계정을 디스크에 저장해 다음 실행 때 다시 입력하지 않게 한다.
+# 비밀번호는 cryptography 의 Fernet 으로 암호화해 저장하고, 키는 데이터 폴더의 별도 파일(소유자만 읽기)에 둔다.
+# cryptography 가 없으면 비밀번호는 저장하지 않는다 (도메인/아이디만 저장, 실행할 때 다시 입력).
+
+ACCOUNTS_FILE = 'accounts.json'
+KEY_FILE = 'accounts.key'
+
+
+def encryption_available():
+    return Fernet is not None
+
+
+def _load_key(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        pass
+    key = Fernet.generate_key()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+class AccountStore:
+    def __init__(self, path=None, key_path=None):
+        self.path = path or data_path(ACCOUNTS_FILE)
+        self.key_path = key_path or data_path(KEY_FILE)
+        self._lock = threading.Lock()
+        self._fernet = Fernet(_load_key(self.key_path)) if Fernet is not None else None
+
+    def _encrypt(self, password):
+        if self._fernet is None or not password:
+            return None
+        return self._fernet.encrypt(password.encode('utf-8')).decode('ascii')
+
+    def _decrypt(self, token):
+        if self._fernet is None or not token:
+            return None
+        try:
+            return self._fernet.decrypt(token.encode('ascii')).decode('utf-8')
+        except InvalidToken:
+            # 키 파일이 바뀌었거나 다른 PC 에서 복사해 온 경우
+            return None
+
+    def _read(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f).get('accounts', [])
+        except (OSError, ValueError):
+            return []
+
+    def _write(self, records):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'accounts': records}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        # [{'domain', 'username', 'password'}]. 비밀번호를 복호화할 수 없으면 password 는 None.
+        with self._lock:
+            records = self._read()
+        return [{'domain': record['domain'], 'username': record['username'],
+                 'password': self._decrypt(record.get('password'))} for record in records]
+
+    def upsert(self, account):
+        record = {'domain': normalize_domain(account['domain']), 'username': account['username'],
+                  'password': self._encrypt(account.get('password'))}
+        with self._lock:
+            records = self._read()
+            for index, existing in enumerate(records):
+                if (existing['domain'], existing['username']) == (record['domain'], record['username']):
+                    records[index] = record
+                    break
+            else:
+                records.append(record)
+            self._write(records)
+
+    def remove(self, domain, username):
+        domain = normalize_domain(domain)
+        with self._lock:
+            records = [r for r in self._read() if (r['domain'], r['username']) != (domain, username)]
+            self._write(records)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_account_store():
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = AccountStore()
+        return _default_store
@@ -0,0 +1,14 @@
+import os
+
+# 캐시/설정 파일을 저장하는 디렉터리. WPBOT_HOME 환경 변수로 바꿀 수 있다.
+DEFAULT_DATA_DIR = os.path.join(os.path.expanduser('~'), '.wpbot')
+
+
+def data_dir():
+    path = os.environ.get('WPBOT_HOME') or DEFAULT_DATA_DIR
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def data_path(name):
+    return os.path.join(data_dir(), name)
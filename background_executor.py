@@ -0,0 +1,216 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wp_metrics import record_ui_lag
+
+# Tk 이벤트 루프를 막지 않도록 네트워크 호출을 워커 스레드에서 실행하고,
+# 결과/진행 상황은 스레드 안전한 큐를 통해 after() 폴링으로 UI 스레드에 전달한다.
+
+STATE_PENDING = '대기'
+STATE_RUNNING = '실행 중'
+STATE_DONE = '완료'
+STATE_FAILED = '실패'
+STATE_CANCELLED = '취소됨'
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class BackgroundTask:
+    def __init__(self, executor, task_id, label):
+        self._executor = executor
+        self.id = task_id
+        self.label = label
+        self.state = STATE_PENDING
+        self.message = ''
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def finished(self):
+        return self.state in (STATE_DONE, STATE_FAILED, STATE_CANCELLED)
+
+    def cancel(self):
+        self._cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            # 아직 시작되지 않은 작업은 워커가 실행하지 않으므로 여기서 취소를 알린다.
+            self._executor._events.put((self, 'cancelled', None))
+
+    def check_cancelled(self):
+        # 워커 함수는 요청 사이사이에 호출해 취소 요청을 확인한다.
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def progress(self, message, data=None):
+        # 워커 스레드에서 호출해도 안전하다 (UI 갱신은 폴링 시점에 수행).
+        # data 는 on_progress(message, data) 로 그대로 전달된다 (부분 결과 스트리밍용).
+        self._executor._events.put((self, 'progress', (message, data)))
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    def describe(self):
+        text = f"#{self.id} {self.label} - {self.state}"
+        if self.message:
+            text += f" ({self.message})"
+        if self.started_at is not None:
+            text += f" {self.elapsed():.1f}s"
+        return text
+
+
+class BackgroundExecutor:
+    POLL_INTERVAL_MS = 16
+    # 한 프레임에서 이벤트 처리에 쓰는 최대 시간 (초). 남은 이벤트는 다음 프레임에서 처리한다.
+    FRAME_BUDGET = 0.008
+    KEEP_FINISHED = 50
+
+    def __init__(self, root, max_workers=8):
+        self.root = root
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='wpbot-worker')
+        self._events = queue.Queue()
+        self._ids = itertools.count(1)
+        self._callbacks = {}
+        self._listeners = []
+        self.tasks = {}
+        self._after_id = None
+        self._poll_due = None
+        self._closed = False
+        self._schedule_poll()
+
+    def add_listener(self, listener):
+        # listener(task): 작업 상태/진행 메시지가 바뀔 때마다 UI 스레드에서 호출된다.
+        self._listeners.append(listener)
+
+    def submit(self, label, fn, *args, on_success=None, on_error=None, on_progress=None,
+               on_finally=None, **kwargs):
+        # fn(task, *args, **kwargs) 형태로 워커 스레드에서 실행된다.
+        # 콜백들은 모두 UI 스레드에서 호출된다.
+        if self._closed:
+            raise RuntimeError('executor is closed')
+        task = BackgroundTask(self, next(self._ids), label)
+        self.tasks[task.id] = task
+        self._callbacks[task.id] = (on_success, on_error, on_progress, on_finally)
+
+        def run():
+            if task.cancelled:
+                self._events.put((task, 'cancelled', None))
+                return
+            self._events.put((task, 'started', time.perf_counter()))
+            try:
+                result = fn(task, *args, **kwargs)
+            except TaskCancelled:
+                self._events.put((task, 'cancelled', None))
+            except Exception as e:
+                self._events.put((task, 'error', e))
+            else:
+                if task.cancelled:
+                    self._events.put((task, 'cancelled', None))
+                else:
+                    self._events.put((task, 'success', result))
+
+        task.future = self._pool.submit(run)
+        self._notify(task)
+        return task
+
+    def running_tasks(self):
+        return [task for task in self.tasks.values() if not task.finished]
+
+    def cancel_all(self):
+        for task in self.running_tasks():
+            task.cancel()
+
+    def close(self):
+        self._closed = True
+        self.cancel_all()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule_poll(self):
+        if not self._closed:
+            self._poll_due = time.perf_counter() + self.POLL_INTERVAL_MS / 1000
+            self._after_id = self.root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        # 예정보다 늦게 불렸다면 그만큼 UI 스레드가 막혀 있었던 것이다.
+        now = time.perf_counter()
+        if self._poll_due is not None:
+            record_ui_lag(now - self._poll_due)
+        deadline = now + self.FRAME_BUDGET
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    task, kind, payload = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                self._dispatch(task, kind, payload)
+        finally:
+            self._schedule_poll()
+
+    def _dispatch(self, task, kind, payload):
+        on_success, on_error, on_progress, on_finally = self._callbacks.get(task.id, (None, None, None, None))
+        if kind == 'started':
+            if task.finished:
+                return
+            task.state = STATE_RUNNING
+            task.started_at = payload
+        elif kind == 'progress':
+            if task.finished or task.cancelled:
+                return
+            message, data = payload
+            task.message = message
+            if on_progress:
+                self._safe_call(on_progress, message, data)
+        else:
+            if task.finished:
+                return
+            task.finished_at = time.perf_counter()
+            if kind == 'success':
+                task.state = STATE_DONE
+                task.message = ''
+                if on_success:
+                    self._safe_call(on_success, payload)
+            elif kind == 'error':
+                task.state = STATE_FAILED
+                task.message = str(payload)
+                if on_error:
+                    self._safe_call(on_error, payload)
+            else:
+                task.state = STATE_CANCELLED
+                task.message = ''
+            if on_finally:
+                self._safe_call(on_finally)
+            self._callbacks.pop(task.id, None)
+            self._prune_finished()
+        self._notify(task)
+
+    def _prune_finished(self):
+        finished = [task_id for task_id, task in self.tasks.items() if task.finished]
+        for task_id in finished[:-self.KEEP_FINISHED]:
+            del self.tasks[task_id]
+
+    def _notify(self, task):
+        for listener in self._listeners:
+            self._safe_call(listener, task)
+
+    def _safe_call(self, callback, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            self.root.report_callback_exception(type(e), e, e.__traceback__)
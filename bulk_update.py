@@ -0,0 +1,185 @@
+import re
+from wp_batch import MAX_BATCH_SIZE, supports_batch, update_posts
+from wp_client import WordPressAPIError
+
+# 이미 발행된 글을 한꺼번에 고친다 (카테고리 바꾸기, 제목 바꾸기, 본문 찾아 바꾸기 등).
+# 글은 필요한 필드만 (_fields) 여러 페이지를 동시에 읽어 오고, 변환 함수를 적용한 뒤
+# 실제로 달라진 필드만 모아 batch/v1 로 보낸다. 바뀌지 않은 글은 쓰기 요청을 보내지 않는다.
+# dry_run 이면 보내지 않고 몇 건/몇 번의 요청이 나갈지만 보고한다.
+
+# 제목/본문/요약은 context=edit 의 raw 값을 비교/수정한다 (rendered 는 필터가 적용된 HTML).
+TEXT_FIELDS = ('title', 'content', 'excerpt')
+TERM_FIELDS = ('categories', 'tags')
+EDITABLE_FIELDS = TEXT_FIELDS + TERM_FIELDS + ('status', 'slug')
+
+
+def flatten_post(post):
+    # {'title': {'raw': ..., 'rendered': ...}} -> {'title': ...}
+    flat = {}
+    for key, value in post.items():
+        if key in TEXT_FIELDS and isinstance(value, dict):
+            value = value.get('raw', value.get('rendered', ''))
+        flat[key] = value
+    return flat
+
+
+def diff_post(before, after):
+    # 달라진 필드만 {필드: 새 값}. 카테고리/태그는 순서와 관계없이 비교한다.
+    changes = {}
+    for field in EDITABLE_FIELDS:
+        if field not in after:
+            continue
+        old, new = before.get(field), after[field]
+        if field in TERM_FIELDS:
+            if sorted(set(old or [])) != sorted(set(new or [])):
+                changes[field] = sorted(set(new or []))
+        elif old != new:
+            changes[field] = new
+    return changes
+
+
+# 변환: post(평탄화된 dict) -> 고친 dict. 필요한 필드 목록을 fields 속성으로 가진다.
+
+class Transform:
+    fields = ()
+
+    def __call__(self, post):
+        return post
+
+
+class ReplaceText(Transform):
+    def __init__(self, old, new, field='content', regex=False, ignore_case=False):
+        self.fields = (field,)
+        self.field = field
+        flags = re.IGNORECASE if ignore_case else 0
+        self.pattern = re.compile(old if regex else re.escape(old), flags)
+        # 정규식이 아니면 바꿀 문자열의 \1 같은 표현을 그대로 둔다.
+        self.new = new if regex else new.replace('\\', '\\\\')
+
+    def __call__(self, post):
+        text = post.get(self.field) or ''
+        post[self.field] = self.pattern.sub(self.new, text)
+        return post
+
+
+class RewriteTitle(Transform):
+    # template 의 {title}, {id} 를 치환한다. 예: "[공지] {title}"
+    fields = ('title',)
+
+    def __init__(self, template):
+        self.template = template
+
+    def __call__(self, post):
+        post['title'] = self.template.replace('{title}', post.get('title') or '').replace('{id}', str(post['id']))
+        return post
+
+
+class Recategorize(Transform):
+    # add/remove 는 ID 목록, mapping 은 {옛 ID: 새 ID}
+    def __init__(self, add=(), remove=(), mapping=None, field='categories'):
+        self.fields = (field,)
+        self.field = field
+        self.add = list(add)
+        self.remove = set(remove)
+        self.mapping = mapping or {}
+
+    def __call__(self, post):
+        terms = [self.mapping.get(term_id, term_id) for term_id in post.get(self.field) or []]
+        terms = [term_id for term_id in terms if term_id not in self.remove]
+        post[self.field] = list(dict.fromkeys(terms + self.add))
+        return post
+
+
+class Chain(Transform):
+    def __init__(self, transforms):
+        self.transforms = list(transforms)
+        self.fields = tuple(dict.fromkeys(field for t in self.transforms for field in t.fields))
+
+    def __call__(self, post):
+        for transform in self.transforms:
+            post = transform(post)
+        return post
+
+
+class UpdatePlan:
+    def __init__(self):
+        self.scanned = 0
+        self.changes = []
+        self.field_counts = {}
+        self.errors = []
+
+    @property
+    def unchanged(self):
+        return self.scanned - len(self.changes)
+
+    def add(self, post_id, changes):
+        self.changes.append((post_id, changes))
+        for field in changes:
+            self.field_counts[field] = self.field_counts.get(field, 0) + 1
+
+    def write_requests(self, batch=True):
+        # 실제로 나갈 HTTP 요청 수
+        if not self.changes:
+            return 0
+        return -(-len(self.changes) // MAX_BATCH_SIZE) if batch else len(self.changes)
+
+    def summary(self, batch=True):
+        fields = ', '.join(f'{field} {count}' for field, count in sorted(self.field_counts.items())) or '-'
+        return (f'글 {self.scanned}개 확인, 변경 {len(self.changes)} / 변경 없음 {self.unchanged} '
+                f'(필드별: {fields}), 쓰기 요청 {self.write_requests(batch)}회')
+
+
+def fetch_posts(client, fields, params=None, on_page=None, should_cancel=None):
+    # 필요한 필드만 여러 페이지 동시에 읽는다. 초안/예약 글도 포함한다.
+    query = {'context': 'edit', 'status': 'any', '_fields': ','.join(dict.fromkeys(('id',) + tuple(fields)))}
+    query.update(params or {})
+    return client.fetch_all_pages('wp/v2/posts', params=query, on_page=on_page, should_cancel=should_cancel)
+
+
+def plan_updates(posts, transform):
+    plan = UpdatePlan()
+    for post in posts:
+        plan.scanned += 1
+        before = flatten_post(post)
+        try:
+            after = transform(dict(before))
+        except Exception as e:
+            plan.errors.append((before.get('id'), str(e)))
+            continue
+        changes = diff_post(before, after)
+        if changes:
+            plan.add(before['id'], changes)
+    return plan
+
+
+def apply_plan(client, plan, on_request=None):
+    # [(post_id, 오류 또는 None), ...]
+    results = []
+    responses = update_posts(client, plan.changes, on_request=on_request)
+    for (post_id, _), response in zip(plan.changes, responses):
+        results.append((post_id, None if response.ok else response.error_text))
+    return results
+
+
+def bulk_update(client, transform, params=None, dry_run=True, on_request=None, should_cancel=None):
+    # (plan, 적용 결과 목록 또는 dry_run 이면 None)
+    posts = fetch_posts(client, transform.fields, params, should_cancel=should_cancel)
+    plan = plan_updates(posts, transform)
+    if dry_run or not plan.changes:
+        return plan, None
+    return plan, apply_plan(client, plan, on_request)
+
+
+def describe_changes(post_id, changes, limit=80):
+    parts = []
+    for field, value in changes.items():
+        text = str(value)
+        parts.append(f'{field}={text[:limit]}{"…" if len(text) > limit else ""}')
+    return f'#{post_id}: ' + ', '.join(parts)
+
+
+def batch_enabled(client):
+    try:
+        return supports_batch(client)
+    except (WordPressAPIError, OSError):
+        return False
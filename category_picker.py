@@ -0,0 +1,196 @@
+import tkinter as tk
+
+# 카테고리가 수천 개인 사이트에서도 빠른 카테고리 선택 목록.
+# 카테고리마다 Checkbutton/BooleanVar 를 만들지 않고, Canvas 에 보이는 줄만 그린다 (스크롤하면 같은 줄 아이템을 재사용).
+# 선택 상태는 ID 집합 하나로만 들고 있고, 검색은 미리 만든 1/2글자 색인으로 후보를 좁힌 뒤 확인한다.
+# 입력을 이어서 칠 때는 (이전 검색어로 시작하면) 이전 결과 안에서만 다시 거른다.
+
+ROW_HEIGHT = 20
+CHECKED = '☑'
+UNCHECKED = '☐'
+
+
+def normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+class CategoryIndex:
+    def __init__(self, categories=()):
+        self.items = []
+        self.keys = []
+        self.positions = {}
+        # 1글자/2글자 -> 그 글자를 포함한 항목 위치 목록 (오름차순)
+        self.grams = {}
+        self._last_query = None
+        self._last_result = None
+        self.extend(categories)
+
+    def __len__(self):
+        return len(self.items)
+
+    def extend(self, categories):
+        for cat in categories:
+            if cat['id'] in self.positions:
+                continue
+            position = len(self.items)
+            key = normalize(cat['name'])
+            self.items.append(cat)
+            self.keys.append(key)
+            self.positions[cat['id']] = position
+            for gram in set(key) | {key[i:i + 2] for i in range(len(key) - 1)}:
+                self.grams.setdefault(gram, []).append(position)
+        self._last_query = self._last_result = None
+
+    def search(self, query):
+        # 검색어를 포함하는 항목 위치 목록. 이름이 검색어로 시작하는 항목을 먼저 돌려준다.
+        query = normalize(query)
+        if not query:
+            return range(len(self.items))
+        if self._last_query and query.startswith(self._last_query):
+            candidates = self._last_result
+        else:
+            candidates = self._candidates(query)
+        keys = self.keys
+        prefix = [p for p in candidates if keys[p].startswith(query)]
+        rest = [p for p in candidates if query in keys[p] and not keys[p].startswith(query)]
+        result = prefix + rest
+        self._last_query, self._last_result = query, sorted(result)
+        return result
+
+    def _candidates(self, query):
+        if len(query) == 1:
+            return self.grams.get(query, [])
+        # 검색어의 2글자 조각 중 후보가 가장 적은 것부터 쓴다.
+        postings = [self.grams.get(query[i:i + 2], []) for i in range(len(query) - 1)]
+        return min(postings, key=len)
+
+
+class CategoryPicker(tk.Frame):
+    def __init__(self, master, height=8, width=60, on_change=None):
+        super().__init__(master)
+        self.on_change = on_change
+        self.index = CategoryIndex()
+        self.selected = set()
+        self.view = range(0)
+        self.top = 0
+        self._rows = []
+        self._filter_pending = None
+        search_frame = tk.Frame(self)
+        search_frame.pack(fill='x')
+        tk.Label(search_frame, text='카테고리 검색').pack(side='left')
+        self.filter_var = tk.StringVar(self)
+        self.filter_var.trace_add('write', self._schedule_filter)
+        tk.Entry(search_frame, textvariable=self.filter_var, width=30).pack(side='left', padx=5)
+        self.count_label = tk.Label(search_frame, text='', fg='gray')
+        self.count_label.pack(side='left')
+        body = tk.Frame(self)
+        body.pack(fill='both', expand=True)
+        self.canvas = tk.Canvas(body, height=height * ROW_HEIGHT, width=width * 7, bg='white', highlightthickness=1)
+        self.canvas.pack(side='left', fill='both', expand=True)
+        self.scrollbar = tk.Scrollbar(body, orient='vertical', command=self.yview)
+        self.scrollbar.pack(side='left', fill='y')
+        self.canvas.bind('<Configure>', lambda event: self.redraw())
+        self.canvas.bind('<Button-1>', self._on_click)
+        self.canvas.bind('<MouseWheel>', lambda event: self.scroll(-1 if event.delta > 0 else 1))
+        self.canvas.bind('<Button-4>', lambda event: self.scroll(-1))
+        self.canvas.bind('<Button-5>', lambda event: self.scroll(1))
+
+    # 데이터
+
+    @property
+    def categories(self):
+        return self.index.items
+
+    def set_categories(self, categories):
+        # 목록을 바꿔도 같은 ID 가 남아 있으면 선택은 유지한다.
+        self.index = CategoryIndex(categories)
+        self.selected &= set(self.index.positions)
+        self.top = 0
+        self.apply_filter()
+
+    def append(self, categories):
+        # 페이지 단위로 도착하는 카테고리를 이어 붙인다.
+        self.index.extend(categories)
+        self.apply_filter(keep_position=True)
+
+    def clear(self):
+        self.selected.clear()
+        self.set_categories([])
+
+    def selected_ids(self):
+        # 목록 순서대로
+        positions = self.index.positions
+        return sorted(self.selected, key=lambda cat_id: positions.get(cat_id, 0))
+
+    def set_selected(self, ids):
+        self.selected = set(ids) & set(self.index.positions)
+        self.redraw()
+
+    def toggle(self, cat_id):
+        if cat_id in self.selected:
+            self.selected.discard(cat_id)
+        else:
+            self.selected.add(cat_id)
+        self.redraw()
+        if self.on_change:
+            self.on_change(self.selected_ids())
+
+    # 검색
+
+    def _schedule_filter(self, *args):
+        # 빠르게 입력할 때 글자마다 검색하지 않도록 잠깐 모았다가 한 번 거른다.
+        if self._filter_pending is not None:
+            self.after_cancel(self._filter_pending)
+        self._filter_pending = self.after(30, self.apply_filter)
+
+    def apply_filter(self, keep_position=False):
+        self._filter_pending = None
+        self.view = self.index.search(self.filter_var.get())
+        if not keep_position:
+            self.top = 0
+        self.redraw()
+
+    # 그리기
+
+    def visible_rows(self):
+        return max(1, self.canvas.winfo_height() // ROW_HEIGHT)
+
+    def redraw(self):
+        count = self.visible_rows()
+        self.top = max(0, min(self.top, len(self.view) - count))
+        while len(self._rows) < count:
+            y = len(self._rows) * ROW_HEIGHT
+            self._rows.append(self.canvas.create_text(4, y + ROW_HEIGHT // 2, anchor='w', text=''))
+        items = self.index.items
+        for row, item_id in enumerate(self._rows):
+            position = self.top + row
+            if row < count and position < len(self.view):
+                cat = items[self.view[position]]
+                mark = CHECKED if cat['id'] in self.selected else UNCHECKED
+                self.canvas.itemconfigure(item_id, text=f"{mark} {cat['name']} (ID:{cat['id']})")
+            else:
+                self.canvas.itemconfigure(item_id, text='')
+        total = len(self.view)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + count) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self.count_label.config(text=f'{total}/{len(self.index)}개 표시, {len(self.selected)}개 선택')
+
+    def scroll(self, rows):
+        self.top += rows
+        self.redraw()
+
+    def yview(self, action, value, unit=None):
+        if action == 'moveto':
+            self.top = int(float(value) * len(self.view))
+        elif unit == 'pages':
+            self.top += int(value) * self.visible_rows()
+        else:
+            self.top += int(value)
+        self.redraw()
+
+    def _on_click(self, event):
+        position = self.top + int(self.canvas.canvasy(event.y)) // ROW_HEIGHT
+        if 0 <= position < len(self.view):
+            self.toggle(self.index.items[self.view[position]]['id'])
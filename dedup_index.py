@@ -0,0 +1,307 @@
+import hashlib
+import html
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
+import requests
+from app_paths import data_path
+from wp_client import WordPressAPIError, normalize_domain
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 같은 사이트에 거의 같은 글을 다시 발행하지 않도록 하는 사이트별 지문(SimHash) 인덱스.
+# 제목+본문(태그 제거)을 글자 4-gram 으로 나눠 64비트 SimHash 를 만들고, 사이트마다 (글 ID, 지문) 을
+# array 두 개에 모아 둔다 (10만 개에 약 1.6MB). 발행 전에 새 글의 지문과 모든 지문의 해밍 거리를 한 번에 계산해
+# max_distance 이하인 글이 있으면 중복으로 본다. numpy 가 있으면 벡터 연산으로, 없으면 int.bit_count 로 비교한다.
+# 지문은 SQLite 에 저장하고, 사이트의 기존 글은 modified_after 로 바뀐 글만 받아 증분으로 반영한다.
+# 발행 경로에서는 sync_in_background() 로 백그라운드 스레드에서 받는다 (첫 동기화는 글 전체를 받으므로 오래 걸린다).
+
+INDEX_FILE = 'dedup_index.sqlite3'
+SHINGLE_SIZE = 4
+# 64비트 중 이 개수 이하만 다르면 거의 같은 글로 본다. 문장 몇 개를 고친 글은 보통 10 이하,
+# 주제가 다른 글은 25 이상 차이 난다. 무관한 지문이 8 이하로 우연히 가까울 확률은 약 1e-9 이다.
+DEFAULT_MAX_DISTANCE = 8
+# 이보다 짧은 글(태그 제거 후 글자 수) 은 지문이 불안정하므로 검사하지 않는다.
+MIN_TEXT_LENGTH = 80
+# 마지막 동기화 후 이 시간이 지나면 발행 전에 바뀐 글을 다시 받는다 (다른 곳에서 쓴 글 반영).
+SYNC_INTERVAL = 600.0
+SYNC_FIELDS = 'id,title,content,modified'
+SYNC_STATUS = 'publish,future,draft,pending,private'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS fingerprints (
+    site TEXT NOT NULL,
+    post_id INTEGER NOT NULL,
+    fingerprint INTEGER NOT NULL,
+    PRIMARY KEY (site, post_id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    site TEXT PRIMARY KEY,
+    last_modified TEXT,
+    synced_at REAL
+);
+'''
+
+_TAG = re.compile(r'<[^>]+>')
+_SPACE = re.compile(r'\s+')
+_SIGN_BIT = 1 << 63
+
+
+def normalize_text(title, content):
+    text = f'{title} {content}'
+    text = html.unescape(_TAG.sub(' ', text))
+    return _SPACE.sub(' ', text).strip().lower()
+
+
+def _shingle_hashes(text):
+    grams = {text[i:i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+    return [int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=8).digest(), 'little') for gram in grams]
+
+
+def simhash(text):
+    hashes = _shingle_hashes(text)
+    half = len(hashes) / 2
+    if np is not None:
+        bits = np.unpackbits(np.array(hashes, dtype=np.uint64).view(np.uint8), bitorder='little')
+        counts = bits.reshape(len(hashes), 64).sum(axis=0)
+        return sum(1 << bit for bit in range(64) if counts[bit] > half)
+    fingerprint = 0
+    for bit in range(64):
+        if sum((h >> bit) & 1 for h in hashes) > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def fingerprint_post(title, content):
+    # 너무 짧은 글이면 None
+    text = normalize_text(title, content)
+    if len(text) < MIN_TEXT_LENGTH:
+        return None
+    return simhash(text)
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def similarity(distance):
+    return 1.0 - distance / 64
+
+
+def _to_signed(value):
+    # SQLite INTEGER 는 부호 있는 64비트
+    return value - (1 << 64) if value & _SIGN_BIT else value
+
+
+def _to_unsigned(value):
+    return value & 0xFFFFFFFFFFFFFFFF
+
+
+if np is not None:
+    _POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _nearest(fingerprints, fingerprint):
+    # (가장 가까운 위치, 거리). fingerprints 는 array('Q')
+    if np is not None:
+        diff = np.frombuffer(fingerprints, dtype=np.uint64) ^ np.uint64(fingerprint)
+        if hasattr(np, 'bitwise_count'):
+            distances = np.bitwise_count(diff)
+        else:
+            distances = _POPCOUNT[diff.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+        index = int(distances.argmin())
+        return index, int(distances[index])
+    distances = list(map(int.bit_count, map(fingerprint.__xor__, fingerprints)))
+    distance = min(distances)
+    return distances.index(distance), distance
+
+
+class DuplicateMatch:
+    def __init__(self, post_id, distance):
+        self.post_id = post_id
+        self.distance = distance
+
+    @property
+    def similarity(self):
+        return similarity(self.distance)
+
+    def __str__(self):
+        return f'비슷한 글이 이미 있습니다: #{self.post_id} (유사도 {self.similarity:.0%})'
+
+
+class _SiteFingerprints:
+    def __init__(self):
+        self.post_ids = array('q')
+        self.fingerprints = array('Q')
+        self.positions = {}
+
+    def put(self, post_id, fingerprint):
+        position = self.positions.get(post_id)
+        if position is None:
+            self.positions[post_id] = len(self.post_ids)
+            self.post_ids.append(post_id)
+            self.fingerprints.append(fingerprint)
+        else:
+            self.fingerprints[position] = fingerprint
+
+
+class DedupIndex:
+    def __init__(self, path=None, max_distance=DEFAULT_MAX_DISTANCE):
+        self.path = path or data_path(INDEX_FILE)
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._sites = {}
+        self._syncing = {}
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _site(self, site):
+        # 사이트 지문을 처음 쓸 때 SQLite 에서 배열로 읽어 온다. self._lock 안에서 호출한다.
+        entry = self._sites.get(site)
+        if entry is None:
+            entry = self._sites[site] = _SiteFingerprints()
+            rows = self._conn.execute('SELECT post_id, fingerprint FROM fingerprints WHERE site = ?', (site,))
+            for post_id, fingerprint in rows:
+                entry.put(post_id, _to_unsigned(fingerprint))
+        return entry
+
+    def count(self, site):
+        with self._lock:
+            return len(self._site(normalize_domain(site)).post_ids)
+
+    def add(self, site, post_id, title, content):
+        fingerprint = fingerprint_post(title, content)
+        if fingerprint is not None:
+            self.add_fingerprints(site, [(post_id, fingerprint)])
+        return fingerprint
+
+    def add_fingerprints(self, site, items):
+        # items: [(post_id, fingerprint)]
+        site = normalize_domain(site)
+        with self._lock:
+            entry = self._site(site)
+            for post_id, fingerprint in items:
+                entry.put(post_id, fingerprint)
+            with self._conn:
+                self._conn.executemany('INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?)',
+                                       [(site, post_id, _to_signed(fingerprint)) for post_id, fingerprint in items])
+
+    def find_similar(self, site, fingerprint, max_distance=None):
+        # 가장 가까운 글이 max_distance 이내이면 DuplicateMatch, 아니면 None
+        if fingerprint is None:
+            return None
+        max_distance = self.max_distance if max_distance is None else max_distance
+        with self._lock:
+            entry = self._site(normalize_domain(site))
+            if not entry.post_ids:
+                return None
+            position, distance = _nearest(entry.fingerprints, fingerprint)
+            post_id = entry.post_ids[position]
+        if distance > max_distance:
+            return None
+        return DuplicateMatch(post_id, distance)
+
+    def check(self, site, title, content, max_distance=None):
+        return self.find_similar(site, fingerprint_post(title, content), max_distance)
+
+    def clear(self, site):
+        site = normalize_domain(site)
+        with self._lock, self._conn:
+            self._sites.pop(site, None)
+            self._conn.execute('DELETE FROM fingerprints WHERE site = ?', (site,))
+            self._conn.execute('DELETE FROM sync_state WHERE site = ?', (site,))
+
+    def sync_state(self, site):
+        with self._lock:
+            row = self._conn.execute('SELECT last_modified, synced_at FROM sync_state WHERE site = ?',
+                                     (normalize_domain(site),)).fetchone()
+        return row if row else (None, None)
+
+    def sync(self, client, full=False, should_cancel=None):
+        # 사이트의 글을 받아 지문을 만든다. 처음에는 전체, 이후에는 바뀐 글만. 받은 글 수를 돌려준다.
+        site = client.domain
+        if full:
+            self.clear(site)
+        last, _ = self.sync_state(site)
+        params = {'_fields': SYNC_FIELDS, 'orderby': 'modified', 'order': 'asc', 'status': SYNC_STATUS}
+        if last:
+            # modified_after 는 초 단위로 비교하므로 1초 앞에서 시작한다 (post_index 와 같다).
+            params['modified_after'] = (datetime.fromisoformat(last) - timedelta(seconds=1)).isoformat()
+        fetched = [0]
+        newest = [last]
+
+        def handle_page(page, items, total_pages):
+            prints = []
+            for post in items:
+                fingerprint = fingerprint_post(post['title']['rendered'], post['content']['rendered'])
+                if fingerprint is not None:
+                    prints.append((post['id'], fingerprint))
+                newest[0] = max(newest[0] or '', post['modified'])
+            self.add_fingerprints(site, prints)
+            fetched[0] += len(items)
+
+        try:
+            client.fetch_pages('wp/v2/posts', params=params, on_page=handle_page, should_cancel=should_cancel)
+        except WordPressAPIError as e:
+            if e.status_code not in (400, 401, 403):
+                raise
+            # 비공개 상태를 볼 권한이 없으면 공개 글만
+            del params['status']
+            client.fetch_pages('wp/v2/posts', params=params, on_page=handle_page, should_cancel=should_cancel)
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)',
+                               (normalize_domain(site), newest[0], time.time()))
+        return fetched[0]
+
+    def ensure_synced(self, client, max_age=SYNC_INTERVAL):
+        # 마지막 동기화가 max_age 보다 오래됐으면 바뀐 글만 받아 온다.
+        _, synced_at = self.sync_state(client.domain)
+        if synced_at is not None and time.time() - synced_at < max_age:
+            return 0
+        return self.sync(client)
+
+    def sync_in_background(self, client, max_age=SYNC_INTERVAL):
+        # ensure_synced 를 데몬 스레드에서 실행한다. 사이트마다 하나만 돌며, 끝날 때까지는 이미 모은 지문으로만 비교한다.
+        # 실행 중인 (또는 새로 시작한) 스레드를 돌려준다. 동기화할 필요가 없으면 None.
+        site = normalize_domain(client.domain)
+        _, synced_at = self.sync_state(site)
+        if synced_at is not None and time.time() - synced_at < max_age:
+            return None
+        with self._lock:
+            thread = self._syncing.get(site)
+            if thread is not None and thread.is_alive():
+                return thread
+            thread = self._syncing[site] = threading.Thread(target=self._sync_quietly, args=(client,),
+                                                            name='wpbot-dedup-sync', daemon=True)
+        thread.start()
+        return thread
+
+    def _sync_quietly(self, client):
+        # 실패해도 발행은 막지 않는다. sync_state 가 그대로이므로 다음 발행 때 다시 시도한다.
+        try:
+            self.sync(client)
+        except (WordPressAPIError, requests.exceptions.RequestException):
+            pass
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_dedup_index():
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = DedupIndex()
+        return _default_index
@@ -0,0 +1,412 @@
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# 성능 측정용 가짜 워드프레스 REST 서버 (표준 라이브러리만 사용).
+# /wp-json/, /wp/v2/posts, /wp/v2/categories, /wp/v2/tags (조회/생성), /wp/v2/users/me, /wp/v2/media, /batch/v1 를 흉내 낸다.
+# 지연 시간, 오류율, 페이지 크기, 401/429 동작, 글 생성 뒤 응답 누락을 설정할 수 있고 요청/연결 수를 센다.
+# 글 슬러그는 워드프레스처럼 퍼센트 인코딩해 200바이트에서 자르고, 겹치면 -2 를 붙인다.
+#   python fake_wp_server.py --port 8080 --latency-ms 50 --error-rate 0.01
+
+DEFAULT_CATEGORIES = 250
+DEFAULT_TAGS = 100
+# 워드프레스 슬러그 최대 길이 (퍼센트 인코딩한 바이트 기준)
+MAX_SLUG_LENGTH = 200
+
+
+def sanitize_slug(value):
+    # sanitize_title 흉내: 소문자로 바꾸고 한글 등은 퍼센트 인코딩한 뒤 200바이트에서 (글자 단위로) 자른다.
+    pieces = []
+    length = 0
+    for char in value.strip().lower():
+        if char.isascii():
+            if not (char.isalnum() or char in '-_ '):
+                continue
+            piece = '-' if char == ' ' else char
+        else:
+            piece = ''.join(f'%{byte:02x}' for byte in char.encode('utf-8'))
+        if length + len(piece) > MAX_SLUG_LENGTH:
+            break
+        pieces.append(piece)
+        length += len(piece)
+    slug = ''.join(pieces)
+    while '--' in slug:
+        slug = slug.replace('--', '-')
+    return slug.strip('-')
+
+
+class FakeConfig:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, categories=DEFAULT_CATEGORIES,
+                 tags=DEFAULT_TAGS, max_per_page=100, username='admin', password='secret', rate_limit=0,
+                 retry_after=1, batch=True, max_batch_size=25, drop_responses=0,
+                 error_retry_after=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        # 5xx 를 돌려줄 확률 (0~1)
+        self.error_rate = error_rate
+        # 정하면 5xx 에도 Retry-After 를 붙인다 (점검 모드처럼)
+        self.error_retry_after = error_retry_after
+        self.categories = categories
+        self.tags = tags
+        self.max_per_page = max_per_page
+        self.username = username
+        self.password = password
+        # 초당 허용 요청 수 (0 이면 무제한). 넘으면 429 와 Retry-After.
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.batch = batch
+        self.max_batch_size = max_batch_size
+        # 글 생성 요청을 처리한 뒤 응답을 보내지 않고 연결을 끊을 횟수 (응답만 놓친 경우 재현용)
+        self.drop_responses = drop_responses
+
+
+class FakeState:
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.posts = []
+        self.media = []
+        self.drop_responses = config.drop_responses
+        self.requests = 0
+        self.connections = 0
+        self.status_counts = {}
+        self.window_started = time.monotonic()
+        self.window_count = 0
+        self.categories = [{'id': i, 'name': f'카테고리 {i}', 'slug': f'cat-{i}', 'parent': 0, 'count': i % 7}
+                           for i in range(1, config.categories + 1)]
+        self.tags = [{'id': i, 'name': f'태그 {i}', 'slug': f'tag-{i}', 'count': i % 5}
+                     for i in range(1, config.tags + 1)]
+
+    def count(self, status):
+        with self.lock:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def allow(self):
+        # 1초 고정 창 방식의 간단한 속도 제한
+        if not self.config.rate_limit:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_started >= 1.0:
+                self.window_started = now
+                self.window_count = 0
+            self.window_count += 1
+            return self.window_count <= self.config.rate_limit
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'connections': self.connections,
+                'posts': len(self.posts),
+                'media': len(self.media),
+                'status_counts': dict(self.status_counts),
+            }
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = 0
+            self.connections = 0
+            self.status_counts = {}
+
+
+class FakeWordPressHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeWordPress/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+
+    def send_json(self, status, body, headers=None):
+        # 304 는 본문 없이 보낸다.
+        data = b'' if status == 304 else json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+        self.state.count(status)
+
+    def send_error_json(self, status, code, message, headers=None):
+        self.send_json(status, {'code': code, 'message': message, 'data': {'status': status}}, headers)
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        remaining = length
+        chunks = []
+        while remaining:
+            chunk = self.rfile.read(min(remaining, 65536))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b''.join(chunks)
+
+    def authorized(self):
+        header = self.headers.get('Authorization') or ''
+        if not header.startswith('Basic '):
+            return False
+        try:
+            username, _, password = base64.b64decode(header[6:]).decode('utf-8').partition(':')
+        except ValueError:
+            return False
+        config = self.state.config
+        return username == config.username and password == config.password
+
+    def handle_request(self):
+        config = self.state.config
+        with self.state.lock:
+            self.state.requests += 1
+        body = self.read_body() if self.command in ('POST', 'PUT') else b''
+        delay = config.latency_ms + random.uniform(0, config.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000.0)
+        if not self.state.allow():
+            return self.send_error_json(429, 'rest_too_many_requests', 'Too many requests',
+                                        {'Retry-After': str(config.retry_after)})
+        if config.error_rate and random.random() < config.error_rate:
+            headers = None if config.error_retry_after is None else {'Retry-After': str(config.error_retry_after)}
+            return self.send_error_json(503, 'service_unavailable', 'Temporarily unavailable', headers)
+        parsed = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        route = parsed.path
+        if route.startswith('/wp-json'):
+            route = route[len('/wp-json'):] or '/'
+        elif 'rest_route' in query:
+            route = query['rest_route']
+        status, payload, headers = self.dispatch(self.command, route.rstrip('/') or '/', query, body)
+        if self.command == 'POST' and route.rstrip('/') in ('/wp/v2/posts', '/batch/v1') and self.drop_response():
+            self.close_connection = True
+            return
+        self.send_json(status, payload, headers)
+
+    def drop_response(self):
+        with self.state.lock:
+            if self.state.drop_responses <= 0:
+                return False
+            self.state.drop_responses -= 1
+            return True
+
+    def dispatch(self, method, route, query, body):
+        if route == '/' and method == 'GET':
+            namespaces = ['oembed/1.0', 'wp/v2', 'wp-site-health/v1'] + (['batch/v1'] if self.state.config.batch else [])
+            return 200, {'name': 'Fake WordPress', 'namespaces': namespaces}, None
+        if not self.authorized():
+            return 401, {'code': 'rest_not_logged_in', 'message': '로그인이 필요합니다.', 'data': {'status': 401}}, None
+        if route == '/wp/v2/users/me':
+            return 200, {'id': 1, 'name': self.state.config.username, 'roles': ['administrator'],
+                         'capabilities': {'edit_posts': True, 'publish_posts': True, 'upload_files': True}}, None
+        if route == '/wp/v2/categories' and method == 'GET':
+            return self.paginate(self.state.categories, query)
+        if route == '/wp/v2/tags' and method == 'GET':
+            return self.paginate(self.state.tags, query)
+        if route in ('/wp/v2/categories', '/wp/v2/tags') and method == 'POST':
+            return self.create_term(route.rsplit('/', 1)[1], json.loads(body or b'{}'))
+        if route == '/wp/v2/posts' and method == 'GET':
+            return self.list_posts(query)
+        if route == '/wp/v2/posts' and method == 'POST':
+            return self.create_post(json.loads(body or b'{}'))
+        if route.startswith('/wp/v2/posts/') and method == 'POST':
+            return self.update_post(int(route.rsplit('/', 1)[1]), json.loads(body or b'{}'))
+        if route == '/wp/v2/media' and method == 'GET':
+            return self.paginate(list(self.state.media), query)
+        if route == '/wp/v2/media' and method == 'POST':
+            return self.create_media(body)
+        if route == '/batch/v1' and method == 'POST' and self.state.config.batch:
+            return self.batch(json.loads(body or b'{}'))
+        return 404, {'code': 'rest_no_route', 'message': 'No route', 'data': {'status': 404}}, None
+
+    def paginate(self, items, query):
+        per_page = int(query.get('per_page', 10))
+        if per_page > self.state.config.max_per_page:
+            return 400, {'code': 'rest_invalid_param', 'message': 'per_page', 'data': {'status': 400}}, None
+        page = int(query.get('page', 1))
+        total_pages = max(1, -(-len(items) // per_page))
+        if page > total_pages:
+            return 400, {'code': 'rest_post_invalid_page_number', 'message': 'page', 'data': {'status': 400}}, None
+        chunk = items[(page - 1) * per_page:page * per_page]
+        fields = query.get('_fields')
+        if fields:
+            names = fields.split(',')
+            chunk = [{k: item[k] for k in names if k in item} for item in chunk]
+        etag = '"' + hashlib.md5(json.dumps(chunk).encode('utf-8')).hexdigest() + '"'
+        headers = {'X-WP-Total': str(len(items)), 'X-WP-TotalPages': str(total_pages), 'ETag': etag}
+        if self.headers.get('If-None-Match') == etag:
+            return 304, None, headers
+        return 200, chunk, headers
+
+    def list_posts(self, query):
+        with self.state.lock:
+            posts = list(self.state.posts)
+        if 'slug' in query:
+            slugs = {sanitize_slug(slug) for slug in query['slug'].split(',')}
+            posts = [p for p in posts if p['slug'] in slugs]
+        if 'modified_after' in query:
+            posts = [p for p in posts if p['modified'] > query['modified_after']]
+        if 'search' in query:
+            posts = [p for p in posts if query['search'] in p['title']['rendered'] + p['content']['rendered']]
+        if 'categories' in query:
+            wanted = {int(i) for i in query['categories'].split(',')}
+            posts = [p for p in posts if wanted & set(p['categories'])]
+        statuses = query.get('status', 'publish')
+        if statuses != 'any':
+            posts = [p for p in posts if p['status'] in statuses.split(',')]
+        return self.paginate(posts, query)
+
+    def create_post(self, data):
+        if not data.get('title'):
+            return 400, {'code': 'empty_content', 'message': '제목이 없습니다.', 'data': {'status': 400}}, None
+        now = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime())
+        with self.state.lock:
+            post_id = len(self.state.posts) + 1
+            slug = self.unique_slug(sanitize_slug(data.get('slug') or '') or f'post-{post_id}')
+            post = {
+                'id': post_id,
+                'title': {'raw': data['title'], 'rendered': data['title']},
+                'content': {'raw': data.get('content', ''), 'rendered': data.get('content', '')},
+                'slug': slug,
+                'status': data.get('status', 'draft'),
+                'categories': data.get('categories', []),
+                'tags': data.get('tags', []),
+                'featured_media': data.get('featured_media', 0),
+                'date_gmt': data.get('date_gmt') or now,
+                'modified': now,
+            }
+            self.state.posts.append(post)
+        return 201, post, None
+
+    def unique_slug(self, slug):
+        # wp_unique_post_slug 흉내: 이미 있으면 -2, -3 ... 을 붙인다 (붙일 자리를 위해 앞부분을 자른다).
+        taken = {post['slug'] for post in self.state.posts}
+        candidate = slug
+        number = 2
+        while candidate in taken:
+            suffix = f'-{number}'
+            candidate = slug[:MAX_SLUG_LENGTH - len(suffix)] + suffix
+            number += 1
+        return candidate
+
+    def update_post(self, post_id, data):
+        with self.state.lock:
+            if not 1 <= post_id <= len(self.state.posts):
+                return 404, {'code': 'rest_post_invalid_id', 'message': 'Invalid post ID.', 'data': {'status': 404}}, None
+            post = self.state.posts[post_id - 1]
+            for key, value in data.items():
+                post[key] = {'raw': value, 'rendered': value} if key in ('title', 'content') else value
+            post['modified'] = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime())
+            return 200, dict(post), None
+
+    def create_term(self, taxonomy, data):
+        name = (data.get('name') or '').strip()
+        if not name:
+            return 400, {'code': 'rest_missing_callback_param', 'message': 'name', 'data': {'status': 400}}, None
+        parent = data.get('parent', 0) if taxonomy == 'categories' else None
+        with self.state.lock:
+            terms = self.state.categories if taxonomy == 'categories' else self.state.tags
+            for term in terms:
+                if term['name'] == name and term.get('parent') == parent:
+                    return 400, {'code': 'term_exists', 'message': '같은 이름의 항목이 이미 있습니다.',
+                                 'data': {'status': 400, 'term_id': term['id']}}, None
+            term = {'id': max((t['id'] for t in terms), default=0) + 1, 'name': name,
+                    'slug': f'{taxonomy}-{len(terms) + 1}', 'count': 0}
+            if parent is not None:
+                term['parent'] = parent
+            terms.append(term)
+        return 201, term, None
+
+    def create_media(self, body):
+        with self.state.lock:
+            media_id = 10000 + len(self.state.media)
+            item = {'id': media_id, 'source_url': f'http://{self.headers.get("Host")}/uploads/{media_id}',
+                    'mime_type': self.headers.get('Content-Type', ''), 'media_details': {'filesize': len(body)}}
+            self.state.media.append(item)
+        return 201, item, None
+
+    def batch(self, data):
+        requests_list = data.get('requests') or []
+        if len(requests_list) > self.state.config.max_batch_size:
+            return 400, {'code': 'rest_batch_max_size_exceeded', 'message': 'Too many requests',
+                         'data': {'status': 400}}, None
+        responses = []
+        for item in requests_list:
+            route = urlparse(item['path']).path
+            status, body, _ = self.dispatch(item.get('method', 'POST'), route.rstrip('/'), {},
+                                            json.dumps(item.get('body') or {}).encode('utf-8'))
+            responses.append({'status': status, 'body': body, 'headers': {}})
+        return 207, {'responses': responses}, None
+
+    do_GET = handle_request
+    do_POST = handle_request
+    do_PUT = handle_request
+    do_HEAD = handle_request
+
+
+class FakeWordPressServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config=None, host='127.0.0.1', port=0):
+        super().__init__((host, port), FakeWordPressHandler)
+        self.state = FakeState(config or FakeConfig())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-wordpress', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='성능 측정용 가짜 워드프레스 REST 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--categories', type=int, default=DEFAULT_CATEGORIES)
+    parser.add_argument('--rate-limit', type=int, default=0, help='초당 허용 요청 수 (0: 무제한)')
+    parser.add_argument('--no-batch', action='store_true', help='batch/v1 을 지원하지 않는 사이트처럼 동작')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='secret')
+    args = parser.parse_args(argv)
+    config = FakeConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                        categories=args.categories, username=args.username, password=args.password,
+                        rate_limit=args.rate_limit, batch=not args.no_batch)
+    server = FakeWordPressServer(config, args.host, args.port)
+    print(f'가짜 워드프레스 서버: {server.url} (사용자 {args.username} / {args.password})')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,13 @@
 import tkinter as tk
 from tkinter import scrolledtext
-import google.generativeai as genai
+from gemini_cache import validate_api_key
+from background_executor import BackgroundExecutor
 
-class GeminiAuthGUI(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title('Gemini API 인증')
-        self.geometry('400x200')
+class GeminiAuthPanel(tk.Frame):
+    def __init__(self, master, executor):
+        super().__init__(master)
+        # 네트워크 호출은 executor 의 워커 스레드에서 실행한다 (통합 화면에서는 모든 탭이 하나를 공유한다).
+        self.executor = executor
 
         tk.Label(self, text='Gemini API Key').pack()
         self.gemini_entry = tk.Entry(self, width=50)
@@ -27,18 +28,44 @@ class GeminiAuthGUI(tk.Tk):
         if not api_key or not model_name:
             self.result_text.insert(tk.END, 'Gemini API 키와 모델명을 입력하세요.\n')
             return
-        try:
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel(model_name)
-            response = model.generate_content("Explain how AI works in a few words")
-            self.result_text.insert(tk.END, f"✅ Gemini API 인증 성공!\n응답: {getattr(response, 'text', str(response))}\n")
-            self.gemini_entry.config(state='disabled')
-            self.gemini_model_entry.config(state='disabled')
-            self.gemini_btn.config(state='disabled')
-        except ImportError:
+        self.result_text.insert(tk.END, 'Gemini 인증 확인 중...\n')
+        self.gemini_btn.config(state='disabled')
+        self.executor.submit('Gemini 인증', self._probe_gemini, api_key, model_name,
+                             on_success=self._on_gemini_ok, on_error=self._on_gemini_error)
+
+    def _probe_gemini(self, task, api_key, model_name):
+        # google.generativeai 는 무거우므로 처음 인증할 때 불러온다.
+        import google.generativeai as genai
+        # 과금되는 생성 호출 대신 모델 메타데이터 조회로 확인한다 (키 지문별로 캐시).
+        return validate_api_key(genai, api_key, model_name)
+
+    def _on_gemini_ok(self, result):
+        model_info, cached = result
+        suffix = ' (캐시)' if cached else ''
+        self.result_text.insert(tk.END, f"✅ Gemini API 인증 성공!{suffix}\n모델: {model_info['display_name']}\n")
+        self.gemini_entry.config(state='disabled')
+        self.gemini_model_entry.config(state='disabled')
+
+    def _on_gemini_error(self, error):
+        self.gemini_btn.config(state='normal')
+        if isinstance(error, ImportError):
             self.result_text.insert(tk.END, "❌ google-generativeai 라이브러리가 없습니다.\npip install google-generativeai\n")
-        except Exception as e:
-            self.result_text.insert(tk.END, f"❌ Gemini API 인증 실패: {e}\n")
+        else:
+            self.result_text.insert(tk.END, f"❌ Gemini API 인증 실패: {error}\n")
+
+class GeminiAuthGUI(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title('Gemini API 인증')
+        self.geometry('400x200')
+        self.executor = BackgroundExecutor(self)
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
+        self.panel = GeminiAuthPanel(self, self.executor)
+        self.panel.pack(fill='both', expand=True)
+
+    def on_close(self):
+        self.executor.close()
+        self.destroy()
 
 if __name__ == '__main__':
     app = GeminiAuthGUI()
@@ -0,0 +1,226 @@
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from gemini_cache import cache_key
+from wp_metrics import record_gemini
+
+# 주제 목록으로 여러 글을 Gemini 로 생성한다.
+# 동시 실행 수를 제한하고 모델의 RPM/TPM 할당량에 맞춘 토큰 버킷으로 요청 속도를 조절하며,
+# 429 를 받으면 지수 백오프 후 다시 시도한다. 각 결과는 끝나는 즉시 on_result 로 넘긴다.
+# cache 를 주면 같은 (모델, 프롬프트, 설정) 은 요청 없이 캐시된 응답을 쓴다.
+
+# 모델별 (RPM, TPM) 기본값. 유료 등급이면 GUI/인자로 바꿔 쓴다.
+MODEL_QUOTAS = {
+    'gemini-2.5-pro': (5, 250000),
+    'gemini-2.5-flash': (10, 250000),
+    'gemini-2.5-flash-lite': (15, 250000),
+}
+DEFAULT_QUOTA = (10, 250000)
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_OUTPUT_TOKENS = 2048
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 120.0
+
+PROMPT_TEMPLATE = (
+    "다음 주제로 블로그 글을 한국어로 작성하세요.\n"
+    "첫 줄에는 제목만 쓰고, 그 다음 줄부터 HTML 본문(<p>, <h2> 등)을 쓰세요.\n"
+    "주제: {topic}"
+)
+
+
+def quota_for(model_name):
+    return MODEL_QUOTAS.get(model_name, DEFAULT_QUOTA)
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, amount):
+        # 성공하면 0, 아니면 토큰이 찰 때까지 기다려야 하는 시간(초)을 돌려준다.
+        with self._lock:
+            self._refill()
+            amount = min(amount, self.capacity)
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    def adjust(self, amount):
+        # 실제 사용량이 추정치와 다를 때 차이만큼 빼거나 돌려준다 (음수 잔액 허용).
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class GeminiRateLimiter:
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        # 429 를 받으면 모든 워커가 함께 기다린다.
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self, estimated_tokens, should_cancel=None):
+        while True:
+            if should_cancel and should_cancel():
+                return False
+            with self._lock:
+                wait = self._paused_until - time.monotonic()
+            if wait <= 0:
+                wait = self.tokens.try_acquire(estimated_tokens)
+                if wait <= 0:
+                    wait = self.requests.try_acquire(1)
+                    if wait <= 0:
+                        return True
+                    # 요청 수 제한에 걸리면 미리 뺀 토큰을 돌려준다.
+                    self.tokens.adjust(-estimated_tokens)
+            # 취소를 빨리 알아차리도록 최대 0.5초씩 나눠서 기다린다.
+            time.sleep(min(wait, 0.5))
+
+
+class GenerationResult:
+    def __init__(self, topic, title=None, content=None, error=None, attempts=0, elapsed=0.0, tokens=0, cached=False):
+        self.topic = topic
+        self.title = title
+        self.content = content
+        self.error = error
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.tokens = tokens
+        self.cached = cached
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class BatchSummary:
+    def __init__(self, results, elapsed):
+        self.results = results
+        self.elapsed = elapsed
+        self.succeeded = sum(1 for r in results if r.ok)
+        self.failed = len(results) - self.succeeded
+        self.tokens = sum(r.tokens for r in results)
+        self.cached = sum(1 for r in results if r.cached)
+
+
+def is_rate_limit_error(error):
+    try:
+        from google.api_core import exceptions as api_exceptions
+        if isinstance(error, api_exceptions.ResourceExhausted):
+            return True
+    except ImportError:
+        pass
+    return getattr(error, 'code', None) == 429 or '429' in str(error)
+
+
+def retry_delay_hint(error):
+    # 오류 메시지의 retry_delay { seconds: N } 를 우선 따른다.
+    match = re.search(r'retry_delay\s*\{\s*seconds:\s*(\d+)', str(error))
+    return float(match.group(1)) if match else None
+
+
+def clean_title(line):
+    # '# 제목', '제목: ...', '**제목**' 같은 꾸밈을 뗀다.
+    return re.sub(r'^(#+\s*|제목\s*:\s*)', '', line).strip().strip('*').strip()
+
+
+def split_article(text):
+    lines = text.strip().splitlines()
+    if not lines:
+        return '', ''
+    return clean_title(lines[0]), '\n'.join(lines[1:]).strip()
+
+
+class BatchGenerator:
+    def __init__(self, model, rpm=None, tpm=None, max_concurrency=DEFAULT_CONCURRENCY,
+                 max_retries=DEFAULT_MAX_RETRIES, generation_config=None, prompt_template=PROMPT_TEMPLATE,
+                 cache=None):
+        # model 은 genai.GenerativeModel 인스턴스, cache 는 gemini_cache.GeminiResponseCache
+        self.model_name = getattr(model, 'model_name', '').replace('models/', '')
+        default_rpm, default_tpm = quota_for(self.model_name)
+        self.model = model
+        self.cache = cache
+        self.limiter = GeminiRateLimiter(rpm or default_rpm, tpm or default_tpm)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.generation_config = generation_config
+        self.prompt_template = prompt_template
+        max_output = (generation_config or {}).get('max_output_tokens', DEFAULT_OUTPUT_TOKENS)
+        self.output_token_estimate = max_output
+
+    def estimate_tokens(self, prompt):
+        # 대략 4글자당 1토큰 + 최대 출력 토큰
+        return len(prompt) // 4 + self.output_token_estimate
+
+    def generate_one(self, topic, should_cancel=None):
+        prompt = self.prompt_template.format(topic=topic)
+        started = time.perf_counter()
+        key = cache_key(self.model_name, prompt, self.generation_config)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                title, content = split_article(cached.text)
+                return GenerationResult(topic, title=title, content=content,
+                                        elapsed=time.perf_counter() - started, cached=True)
+        estimate = self.estimate_tokens(prompt)
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self.limiter.acquire(estimate, should_cancel):
+                return GenerationResult(topic, error='취소됨', attempts=attempt - 1)
+            request_started = time.perf_counter()
+            try:
+                response = self.model.generate_content(prompt, generation_config=self.generation_config)
+                text = response.text
+            except Exception as e:
+                record_gemini(self.model_name, request_started, error=e)
+                if is_rate_limit_error(e) and attempt <= self.max_retries:
+                    delay = retry_delay_hint(e) or min(BACKOFF_MAX, BACKOFF_BASE ** attempt)
+                    self.limiter.pause(delay * random.uniform(1.0, 1.25))
+                    continue
+                return GenerationResult(topic, error=e, attempts=attempt, elapsed=time.perf_counter() - started)
+            record_gemini(self.model_name, request_started, chars=len(text))
+            usage = getattr(response, 'usage_metadata', None)
+            used = getattr(usage, 'total_token_count', 0) or estimate
+            self.limiter.tokens.adjust(used - estimate)
+            if self.cache is not None:
+                self.cache.put(key, self.model_name, text, used)
+            title, content = split_article(text)
+            return GenerationResult(topic, title=title, content=content, attempts=attempt,
+                                    elapsed=time.perf_counter() - started, tokens=used)
+
+    def run(self, topics, on_result=None, should_cancel=None):
+        # on_result(result) 는 각 주제가 끝나는 즉시 (워커 스레드에서) 호출된다.
+        started = time.perf_counter()
+        results = []
+        results_lock = threading.Lock()
+
+        def work(topic):
+            result = self.generate_one(topic, should_cancel)
+            with results_lock:
+                results.append(result)
+            if on_result:
+                on_result(result)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='wpbot-gemini') as pool:
+            for topic in topics:
+                pool.submit(work, topic)
+        return BatchSummary(results, time.perf_counter() - started)
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from app_paths import data_path
+
+# Gemini 응답 캐시와 API 키 확인 캐시.
+# 응답은 (모델, 프롬프트, 생성 설정) 해시를 키로 SQLite 에 저장하고, 나이/전체 크기 기준으로 지운다.
+# API 키 확인은 과금되는 generate_content 대신 모델 메타데이터 조회로 하고,
+# 키 원문이 아닌 지문(fingerprint)으로 결과를 캐시한다.
+
+RESPONSE_CACHE_FILE = 'gemini_cache.sqlite3'
+AUTH_CACHE_FILE = 'gemini_auth_cache.json'
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+AUTH_TTL = 24 * 3600
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    text TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+'''
+
+
+def cache_key(model_name, prompt, generation_config=None):
+    payload = json.dumps([model_name, prompt, generation_config or {}], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def key_fingerprint(api_key):
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+
+class CachedResponse:
+    def __init__(self, text, tokens):
+        self.text = text
+        self.tokens = tokens
+
+
+class GeminiResponseCache:
+    def __init__(self, path=None, max_age=DEFAULT_MAX_AGE, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or data_path(RESPONSE_CACHE_FILE)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self.evict()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT text, tokens, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None or now - row[2] > self.max_age:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            self.hits += 1
+        return CachedResponse(row[0], row[1])
+
+    def put(self, key, model_name, text, tokens=0):
+        now = time.time()
+        size = len(text.encode('utf-8'))
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                               (key, model_name, text, tokens, size, now, now))
+        self.evict()
+
+    def evict(self):
+        # 오래된 항목을 먼저 지우고, 그래도 크면 가장 오래 사용하지 않은 항목부터 지운다.
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM responses WHERE created_at < ?', (time.time() - self.max_age,))
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for key, size in self._conn.execute('SELECT key, size FROM responses ORDER BY accessed_at').fetchall():
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def stats(self):
+        with self._lock:
+            count, size = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': count,
+            'bytes': size,
+        }
+
+
+class GeminiAuthCache:
+    def __init__(self, path=None, ttl=AUTH_TTL):
+        self.path = path or data_path(AUTH_CACHE_FILE)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, api_key, model_name):
+        with self._lock:
+            entry = self._entries.get(f'{key_fingerprint(api_key)}|{model_name}')
+        if entry is None or time.time() - entry['checked_at'] >= self.ttl:
+            return None
+        return entry['model']
+
+    def put(self, api_key, model_name, model_info):
+        with self._lock:
+            self._entries[f'{key_fingerprint(api_key)}|{model_name}'] = {'model': model_info, 'checked_at': time.time()}
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+def validate_api_key(genai, api_key, model_name, auth_cache=None, refresh=False):
+    # (모델 정보 dict, 캐시 여부) 를 돌려준다. 키가 잘못되었거나 모델이 없으면 genai 예외가 그대로 올라간다.
+    genai.configure(api_key=api_key)
+    auth_cache = auth_cache or get_auth_cache()
+    if not refresh:
+        cached = auth_cache.get(api_key, model_name)
+        if cached is not None:
+            return cached, True
+    name = model_name if model_name.startswith('models/') else f'models/{model_name}'
+    model = genai.get_model(name)
+    model_info = {
+        'name': model.name,
+        'display_name': getattr(model, 'display_name', model.name),
+        'input_token_limit': getattr(model, 'input_token_limit', None),
+        'output_token_limit': getattr(model, 'output_token_limit', None),
+    }
+    auth_cache.put(api_key, model_name, model_info)
+    return model_info, False
+
+
+_default_response_cache = None
+_default_auth_cache = None
+_defaults_lock = threading.Lock()
+
+
+def get_response_cache():
+    global _default_response_cache
+    with _defaults_lock:
+        if _default_response_cache is None:
+            _default_response_cache = GeminiResponseCache()
+        return _default_response_cache
+
+
+def get_auth_cache():
+    global _default_auth_cache
+    with _defaults_lock:
+        if _default_auth_cache is None:
+            _default_auth_cache = GeminiAuthCache()
+        return _default_auth_cache
@@ -0,0 +1,286 @@
+import html
+import queue
+import re
+import threading
+import time
+from gemini_batch import clean_title
+from gemini_cache import cache_key
+from wp_metrics import record_gemini
+
+# Gemini 응답을 스트리밍으로 받아 편집기에 바로 채운다.
+# 워커 스레드는 조각이 올 때마다 ArticleStream.feed() 로 쌓기만 하고, UI 스레드는 한 프레임에 한 번
+# drain() 으로 그동안 쌓인 것을 한꺼번에 가져가 Text 위젯에 넣는다 (조각마다 위젯을 건드리지 않는다).
+# 첫 줄은 제목, 나머지는 본문이다. Markdown 변환을 켜면 블록(문단/목록/제목/코드)이 끝날 때마다 HTML 로 바꾸고,
+# 아직 끝나지 않은 마지막 블록은 원문 그대로 보여주다가 끝나면 변환된 HTML 로 바꾼다.
+
+MARKDOWN_PROMPT_TEMPLATE = (
+    "다음 주제로 블로그 글을 한국어로 작성하세요.\n"
+    "첫 줄에는 제목만 쓰고, 그 다음 줄부터 Markdown 본문(## 소제목, 목록, **강조** 등)을 쓰세요.\n"
+    "주제: {topic}"
+)
+
+# 조각을 기다리는 동안 취소 여부를 확인하는 간격 (초)
+CANCEL_POLL_INTERVAL = 0.1
+
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_UNORDERED = re.compile(r'^\s*[-*+]\s+(.*)$')
+_ORDERED = re.compile(r'^\s*\d+[.)]\s+(.*)$')
+_FENCE = re.compile(r'^\s*(```|~~~)')
+_INLINE = [
+    (re.compile(r'`([^`]+)`'), r'<code>\1</code>'),
+    (re.compile(r'\*\*(.+?)\*\*|__(.+?)__'), lambda m: f'<strong>{m.group(1) or m.group(2)}</strong>'),
+    (re.compile(r'(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?!\*)|(?<!\w)_(?!\s)(.+?)(?<!\s)_(?!\w)'),
+     lambda m: f'<em>{m.group(1) or m.group(2)}</em>'),
+    (re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)'), r'<a href="\2">\1</a>'),
+]
+
+
+def convert_inline(text):
+    text = html.escape(text, quote=False)
+    for pattern, replacement in _INLINE:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def convert_block(lines):
+    # 빈 줄로 나뉜 블록 하나 (줄 목록) -> HTML
+    if _FENCE.match(lines[0]):
+        body = lines[1:-1] if len(lines) > 1 and _FENCE.match(lines[-1]) else lines[1:]
+        return '<pre><code>' + html.escape('\n'.join(body), quote=False) + '</code></pre>'
+    if lines[0].lstrip().startswith('<'):
+        # 모델이 HTML 을 그대로 쓴 경우
+        return '\n'.join(lines)
+    heading = _HEADING.match(lines[0])
+    if heading and len(lines) == 1:
+        level = len(heading.group(1))
+        return f'<h{level}>{convert_inline(heading.group(2))}</h{level}>'
+    for pattern, tag in ((_UNORDERED, 'ul'), (_ORDERED, 'ol')):
+        items = [pattern.match(line) for line in lines]
+        if all(items):
+            return f'<{tag}>\n' + '\n'.join(f'<li>{convert_inline(m.group(1))}</li>' for m in items) + f'\n</{tag}>'
+    return '<p>' + '<br>\n'.join(convert_inline(line.strip()) for line in lines) + '</p>'
+
+
+def markdown_to_html(text):
+    converter = MarkdownStream()
+    done, _ = converter.feed(text)
+    return done + converter.flush()
+
+
+class MarkdownStream:
+    # 조각으로 들어오는 Markdown 을 블록 단위로 HTML 로 바꾼다.
+    def __init__(self):
+        self._partial = ''
+        self._block = []
+        self._in_fence = False
+        self._emitted = False
+
+    def feed(self, text):
+        # (새로 끝난 블록들의 HTML, 아직 끝나지 않은 부분의 원문)
+        out = []
+        self._partial += text
+        *lines, self._partial = self._partial.split('\n')
+        for line in lines:
+            self._add_line(line, out)
+        return ''.join(out), '\n'.join(self._block + [self._partial]).lstrip('\n')
+
+    def flush(self):
+        out = []
+        if self._partial:
+            self._add_line(self._partial, out)
+            self._partial = ''
+        self._end_block(out)
+        self._in_fence = False
+        return ''.join(out)
+
+    def _add_line(self, line, out):
+        if self._in_fence:
+            self._block.append(line)
+            if _FENCE.match(line):
+                self._in_fence = False
+                self._end_block(out)
+        elif _FENCE.match(line):
+            self._end_block(out)
+            self._block.append(line)
+            self._in_fence = True
+        elif not line.strip():
+            self._end_block(out)
+        elif _HEADING.match(line):
+            # 제목은 한 줄로 끝난다.
+            self._end_block(out)
+            self._block.append(line)
+            self._end_block(out)
+        else:
+            self._block.append(line)
+
+    def _end_block(self, out):
+        if self._block:
+            out.append(('\n\n' if self._emitted else '') + convert_block(self._block))
+            self._emitted = True
+            self._block = []
+
+
+class ArticleStream:
+    # 워커 스레드의 feed()/finish() 와 UI 스레드의 drain() 사이의 버퍼
+    def __init__(self, convert_markdown=True):
+        self.started = time.perf_counter()
+        self.ttft = None
+        self.chars = 0
+        self.title = None
+        self.finished = False
+        self._head = ''
+        self._converter = MarkdownStream() if convert_markdown else None
+        self._new_title = None
+        self._body = []
+        self._tail = ''
+        self._lock = threading.Lock()
+
+    def feed(self, text):
+        with self._lock:
+            if self.ttft is None:
+                self.ttft = time.perf_counter() - self.started
+            self.chars += len(text)
+            if self.title is None:
+                self._head += text
+                head = self._head.lstrip()
+                if '\n' not in head:
+                    return
+                first, text = head.split('\n', 1)
+                self.title = self._new_title = clean_title(first)
+            self._add_body(text)
+
+    def _add_body(self, text):
+        if self._converter is None:
+            self._body.append(text)
+        else:
+            done, self._tail = self._converter.feed(text)
+            self._body.append(done)
+
+    def finish(self):
+        with self._lock:
+            if self.title is None:
+                # 줄바꿈 없이 끝난 응답은 전부 제목으로 본다.
+                self.title = self._new_title = clean_title(self._head.strip())
+            if self._converter is not None:
+                self._body.append(self._converter.flush())
+                self._tail = ''
+            self.finished = True
+
+    def drain(self):
+        # (새 제목 또는 None, 새로 확정된 본문, 아직 확정되지 않은 본문 꼬리, 끝났는지)
+        with self._lock:
+            title, self._new_title = self._new_title, None
+            body, self._body = ''.join(self._body), []
+            return title, body, self._tail, self.finished
+
+
+class StreamResult:
+    def __init__(self, text, ttft=None, elapsed=0.0, tokens=0, cancelled=False, cached=False):
+        self.text = text
+        self.ttft = ttft
+        self.elapsed = elapsed
+        self.tokens = tokens
+        self.cancelled = cancelled
+        self.cached = cached
+
+
+def _chunk_text(chunk):
+    # 안전 필터 등으로 내용이 없는 조각은 .text 가 ValueError 를 낸다.
+    try:
+        return chunk.text
+    except ValueError:
+        return ''
+
+
+def _close_stream(response):
+    # 받던 스트림을 끊는다. SDK 마다 응답 또는 그 안의 반복자(gRPC 스트림 등) 가 cancel/close 를 가진다.
+    for target in (response, getattr(response, '_iterator', None)):
+        for name in ('cancel', 'close'):
+            method = getattr(target, name, None)
+            if callable(method):
+                try:
+                    method()
+                except Exception:
+                    pass
+
+
+def _read_stream(model, prompt, generation_config, chunks, stop):
+    # 별도 스레드에서 요청을 보내고 조각을 chunks 에 넣는다. 호출한 쪽이 기다리는 동안에도 취소할 수 있게 한다.
+    try:
+        response = model.generate_content(prompt, generation_config=generation_config, stream=True)
+        chunks.put(('response', response))
+        if stop.is_set():
+            _close_stream(response)
+            return
+        for chunk in response:
+            if stop.is_set():
+                break
+            chunks.put(('chunk', chunk))
+        else:
+            chunks.put(('done', None))
+            return
+        _close_stream(response)
+    except Exception as e:
+        chunks.put(('error', e))
+
+
+def stream_generate(model, prompt, on_text, should_cancel=None, generation_config=None, cache=None):
+    # on_text(조각) 는 호출한 (워커) 스레드에서 조각이 도착하는 즉시 호출된다.
+    # 요청과 수신은 별도 스레드에서 하고, 조각을 기다리는 동안에도 should_cancel() 을 확인해
+    # 참이 되면 바로 돌아오고 받던 응답을 끊는다. 끝까지 받은 응답만 캐시에 넣는다.
+    model_name = getattr(model, 'model_name', '').replace('models/', '')
+    started = time.perf_counter()
+    key = cache_key(model_name, prompt, generation_config)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            on_text(cached.text)
+            elapsed = time.perf_counter() - started
+            return StreamResult(cached.text, elapsed, elapsed, cached.tokens, cached=True)
+    parts = []
+    ttft = None
+    cancelled = False
+    response = None
+    chunks = queue.Queue()
+    stop = threading.Event()
+    threading.Thread(target=_read_stream, args=(model, prompt, generation_config, chunks, stop),
+                     name='wpbot-gemini-stream', daemon=True).start()
+    try:
+        while True:
+            try:
+                kind, value = chunks.get(timeout=CANCEL_POLL_INTERVAL)
+            except queue.Empty:
+                kind = value = None
+            if should_cancel and should_cancel():
+                cancelled = True
+                stop.set()
+                if response is not None:
+                    _close_stream(response)
+                break
+            if kind == 'error':
+                raise value
+            if kind == 'done':
+                break
+            if kind == 'response':
+                response = value
+            elif kind == 'chunk':
+                text = _chunk_text(value)
+                if not text:
+                    continue
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                parts.append(text)
+                on_text(text)
+    except Exception as e:
+        stop.set()
+        record_gemini(model_name, started, ttft, sum(map(len, parts)), error=e)
+        raise
+    text = ''.join(parts)
+    record_gemini(model_name, started, ttft, len(text))
+    tokens = 0
+    if not cancelled:
+        usage = getattr(response, 'usage_metadata', None)
+        tokens = getattr(usage, 'total_token_count', 0) or 0
+        if cache is not None and text:
+            cache.put(key, model_name, text, tokens)
+    return StreamResult(text, ttft, time.perf_counter() - started, tokens, cancelled)
@@ -1,35 +1,119 @@
+import time
+_STARTED = time.perf_counter()
+
+import importlib
+import os
+import sys
 import tkinter as tk
-from tkinter import messagebox
-from gemini_auth_gui import GeminiAuthGUI
-from wordpress_login_gui import WordPressLoginGUI
-from wordpress_category_gui import WordPressCategoryGUI
+from tkinter import ttk
+
+# 하나의 Tk 루트에 탭으로 각 화면을 띄운다.
+# 화면 모듈(및 requests, google.generativeai 같은 무거운 SDK)은 탭을 처음 열 때 불러온다.
+
+# (탭 이름, 모듈, 패널 클래스)
+PANELS = [
+    ('Gemini API 인증', 'gemini_auth_gui', 'GeminiAuthPanel'),
+    ('워드프레스 로그인', 'wordpress_login_gui', 'WordPressLoginPanel'),
+    ('워드프레스 카테고리 조회', 'wordpress_category_gui', 'WordPressCategoryPanel'),
+]
+# 프로세스 시작부터 첫 화면이 그려질 때까지의 목표 시간 (WPBOT_STARTUP_BUDGET_MS 로 변경 가능)
+STARTUP_BUDGET_MS = int(os.environ.get('WPBOT_STARTUP_BUDGET_MS', '300'))
+
 
 class MainIntegrationGUI(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title('Gemini & WordPress 통합 관리')
-        self.geometry('500x250')
+        self.geometry('500x420')
+        self.startup_ms = None
+        self.executor = None
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
+
+        tk.Label(self, text='통합 관리 메뉴').pack(pady=5)
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(fill='both', expand=True, padx=5, pady=5)
+        self.tabs = []
+        self.panels = {}
+        for title, _, _ in PANELS:
+            tab = tk.Frame(self.notebook)
+            tk.Label(tab, text='불러오는 중...', fg='gray').pack(pady=20)
+            self.notebook.add(tab, text=title)
+            self.tabs.append(tab)
+        self.status_label = tk.Label(self, text='', anchor='w', fg='gray')
+        self.status_label.pack(fill='x', padx=5)
+
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        # 첫 화면을 그린 다음에 시간을 재고, 그 뒤에 보이는 탭의 패널을 불러온다.
+        self.after_idle(self._on_first_paint)
+
+    def _on_first_paint(self):
+        self.update_idletasks()
+        self.startup_ms = (time.perf_counter() - _STARTED) * 1000
+        over = self.startup_ms > STARTUP_BUDGET_MS
+        self.status_label.config(text=f'시작 시간 {self.startup_ms:.0f}ms (목표 {STARTUP_BUDGET_MS}ms)',
+                                 fg='red' if over else 'gray')
+        if over:
+            print(f'[startup] {self.startup_ms:.0f}ms > budget {STARTUP_BUDGET_MS}ms', file=sys.stderr)
+        self.after_idle(self.on_tab_changed)
 
-        tk.Label(self, text='통합 관리 메뉴').pack(pady=10)
-        self.gemini_btn = tk.Button(self, text='Gemini API 인증', command=self.open_gemini)
-        self.gemini_btn.pack(pady=5)
-        self.wp_login_btn = tk.Button(self, text='워드프레스 로그인', command=self.open_wp_login)
-        self.wp_login_btn.pack(pady=5)
-        self.wp_cat_btn = tk.Button(self, text='워드프레스 카테고리 조회', command=self.open_wp_category)
-        self.wp_cat_btn.pack(pady=5)
+    def on_tab_changed(self, event=None):
+        if self.startup_ms is None:
+            # 첫 화면을 그리기 전에는 패널을 불러오지 않는다.
+            return
+        self.load_panel(self.notebook.index(self.notebook.select()))
 
-    def open_gemini(self):
-        win = GeminiAuthGUI()
-        win.mainloop()
+    def load_panel(self, index):
+        if index in self.panels:
+            return self.panels[index]
+        title, module_name, class_name = PANELS[index]
+        tab = self.tabs[index]
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(module_name)
+            panel = getattr(module, class_name)(tab, self.get_executor())
+        except Exception as e:
+            for widget in tab.winfo_children():
+                widget.destroy()
+            tk.Label(tab, text=f'화면을 불러오지 못했습니다: {e}', fg='red', wraplength=400).pack(pady=20)
+            return None
+        for widget in tab.winfo_children():
+            if widget is not panel:
+                widget.destroy()
+        panel.pack(fill='both', expand=True)
+        self.panels[index] = panel
+        self.status_label.config(text=f'{title} 로드 {(time.perf_counter() - started) * 1000:.0f}ms'
+                                      f' | 시작 시간 {self.startup_ms or 0:.0f}ms')
+        return panel
 
-    def open_wp_login(self):
-        win = WordPressLoginGUI()
-        win.mainloop()
+    def get_executor(self):
+        # 패널의 네트워크 호출은 모두 이 executor 하나로 보낸다.
+        # background_executor 는 wp_metrics 를 거쳐 requests 를 불러오므로 첫 패널을 열 때 만든다.
+        if self.executor is None:
+            from background_executor import BackgroundExecutor
+            self.executor = BackgroundExecutor(self)
+        return self.executor
+
+    def on_close(self):
+        if self.executor is not None:
+            self.executor.close()
+        self.destroy()
+
+
+def measure_startup():
+    # 첫 화면까지의 시간을 출력하고 목표를 넘으면 종료 코드 1 로 끝낸다 (CI/회귀 확인용).
+    app = MainIntegrationGUI()
+
+    def finish():
+        print(f'startup {app.startup_ms:.0f}ms (budget {STARTUP_BUDGET_MS}ms)')
+        app.on_close()
+
+    app.after(200, finish)
+    app.mainloop()
+    return 0 if app.startup_ms is not None and app.startup_ms <= STARTUP_BUDGET_MS else 1
 
-    def open_wp_category(self):
-        win = WordPressCategoryGUI()
-        win.mainloop()
 
 if __name__ == '__main__':
+    if '--measure-startup' in sys.argv:
+        sys.exit(measure_startup())
     app = MainIntegrationGUI()
     app.mainloop()
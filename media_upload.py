@@ -0,0 +1,252 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, unquote, urlparse
+from app_paths import data_path
+from wp_client import WordPressAPIError, normalize_domain
+
+# 이미지를 /wp/v2/media 로 올리고 글 본문/대표 이미지를 업로드된 주소로 바꾼다.
+# 본문의 로컬 경로는 입력 파일이 있는 폴더(base_dir) 안의 이미지 파일만 올린다 (local_path 참고).
+# 파일은 디스크에서 조각 단위로 읽어 그대로 요청 본문으로 흘려보내므로 (requests 가 파일 객체를 스트리밍)
+# 큰 파일도 메모리에 한꺼번에 올리지 않는다.
+# 사이트마다 파일 내용의 sha256 -> 미디어 ID 를 SQLite 에 저장해 같은 파일은 다시 올리지 않는다.
+# (워드프레스는 이어 올리기를 지원하지 않으므로, 중단된 작업은 다시 실행할 때 이미 올린 파일을 건너뛰는 방식으로 이어진다.)
+
+MEDIA_INDEX_FILE = 'media_index.sqlite3'
+HASH_CHUNK_SIZE = 1024 * 1024
+DEFAULT_UPLOAD_WORKERS = 4
+# 큰 파일은 업로드에 시간이 걸리므로 읽기 타임아웃을 길게 잡는다. (connect, read)
+UPLOAD_TIMEOUT = (10, 300)
+# 올릴 수 있는 이미지 확장자 -> MIME 형식. SVG 는 스크립트를 담을 수 있어 받지 않는다.
+IMAGE_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.avif': 'image/avif',
+    '.bmp': 'image/bmp',
+}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS media (
+    site TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    media_id INTEGER NOT NULL,
+    source_url TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    PRIMARY KEY (site, sha256)
+);
+'''
+
+IMG_SRC_RE = re.compile(r'''(<img\b[^>]*?\bsrc\s*=\s*)(["'])(.*?)\2''', re.IGNORECASE | re.DOTALL)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MediaRejected(PermissionError):
+    # 허용한 이미지 형식이 아니거나 허용된 폴더 밖의 파일
+    pass
+
+
+def image_type(path):
+    # 허용한 이미지 확장자이면 MIME 형식, 아니면 None
+    return IMAGE_TYPES.get(os.path.splitext(path)[1].lower())
+
+
+def _inside(path, base_dir):
+    base = os.path.realpath(base_dir)
+    return os.path.commonpath([path, base]) == base
+
+
+def local_path(src, base_dir=None, explicit=False):
+    # src 가 올려도 되는 로컬 이미지 파일이면 실제 경로를, 아니면 None 을 돌려준다.
+    # 사용자가 직접 고른 파일 (explicit) 이 아니면 심볼릭 링크를 따라간 실제 위치가 base_dir (입력 파일이 있는 폴더)
+    # 안이어야 한다. 절대 경로, ~, file:// 도 같다. base_dir 가 없으면 (GUI/Gemini 글) 본문의 경로는 올리지 않는다.
+    parsed = urlparse(src)
+    if parsed.scheme == 'file':
+        path = unquote(parsed.path)
+        if re.match(r'^/[A-Za-z]:', path):
+            path = path[1:]
+    elif parsed.scheme and len(parsed.scheme) > 1:
+        # http, https, data 등 (한 글자 scheme 은 윈도우 드라이브 문자)
+        return None
+    else:
+        path = os.path.expanduser(src)
+    if not os.path.isabs(path) and base_dir:
+        path = os.path.join(base_dir, path)
+    path = os.path.realpath(path)
+    if not explicit and not (base_dir and _inside(path, base_dir)):
+        return None
+    if image_type(path) is None or not os.path.isfile(path):
+        return None
+    return path
+
+
+def featured_path(featured_image, base_dir=None):
+    # 대표 이미지는 base_dir 가 없으면 사용자가 고른 파일로 보고, 있으면 (입력 파일의 열) 본문 이미지와 같은 규칙을 쓴다.
+    path = local_path(featured_image, base_dir, explicit=base_dir is None)
+    if path is None:
+        raise MediaRejected(f'올릴 수 없는 대표 이미지입니다 (없는 파일, 이미지가 아닌 파일 또는 허용된 폴더 밖): {featured_image}')
+    return path
+
+
+def media_paths(content, featured_image=None, base_dir=None):
+    # 본문과 대표 이미지에서 올려야 할 로컬 파일 경로 목록 (올릴 수 없는 파일은 제외)
+    paths = [local_path(match.group(3), base_dir) for match in IMG_SRC_RE.finditer(content)] if base_dir else []
+    if featured_image:
+        paths.append(local_path(featured_image, base_dir, explicit=base_dir is None))
+    return [path for path in paths if path]
+
+
+class MediaItem:
+    def __init__(self, media_id, source_url, uploaded=False):
+        self.id = media_id
+        self.source_url = source_url
+        self.uploaded = uploaded
+
+
+class MediaIndex:
+    def __init__(self, path=None):
+        self.path = path or data_path(MEDIA_INDEX_FILE)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def get(self, site, sha256):
+        with self._lock:
+            row = self._conn.execute('SELECT media_id, source_url FROM media WHERE site = ? AND sha256 = ?',
+                                     (normalize_domain(site), sha256)).fetchone()
+        return MediaItem(row[0], row[1]) if row else None
+
+    def put(self, site, sha256, media_id, source_url, filename):
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?)',
+                               (normalize_domain(site), sha256, media_id, source_url, filename))
+
+    def forget(self, site, media_id):
+        # 사이트에서 미디어가 지워졌을 때
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM media WHERE site = ? AND media_id = ?', (normalize_domain(site), media_id))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def upload_file(client, path):
+    filename = os.path.basename(path)
+    content_type = image_type(filename)
+    if content_type is None:
+        raise MediaRejected(f'이미지 파일이 아닙니다: {filename}')
+    headers = {
+        'Content-Type': content_type,
+        'Content-Disposition': f"attachment; filename*=UTF-8''{quote(filename)}",
+    }
+    with open(path, 'rb') as f:
+        response = client.post('wp/v2/media', data=f, headers=headers, timeout=UPLOAD_TIMEOUT,
+                               params={'_fields': 'id,source_url'})
+    if response.status_code != 201:
+        raise WordPressAPIError(response)
+    data = response.json()
+    return MediaItem(data['id'], data['source_url'], uploaded=True)
+
+
+class MediaUploader:
+    def __init__(self, index=None, max_workers=DEFAULT_UPLOAD_WORKERS):
+        self.index = index or get_media_index()
+        self.max_workers = max_workers
+        self._hashes = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _hash(self, path):
+        # 같은 실행 안에서는 (경로, 크기, 수정 시각) 이 같으면 다시 해시하지 않는다.
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        with self._guard:
+            digest = self._hashes.get(key)
+        if digest is None:
+            digest = file_sha256(path)
+            with self._guard:
+                self._hashes[key] = digest
+        return digest
+
+    def _key_lock(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def ensure(self, client, path):
+        # 이미 올린 파일이면 저장된 미디어를, 아니면 올린 뒤 돌려준다.
+        digest = self._hash(path)
+        with self._key_lock((client.domain, digest)):
+            item = self.index.get(client.domain, digest)
+            if item is not None:
+                return item
+            item = upload_file(client, path)
+            self.index.put(client.domain, digest, item.id, item.source_url, os.path.basename(path))
+            return item
+
+    def ensure_many(self, client, paths):
+        # {경로: MediaItem}. 파일들을 동시에 올린다.
+        paths = list(dict.fromkeys(paths))
+        if len(paths) <= 1:
+            return {path: self.ensure(client, path) for path in paths}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(paths)),
+                                thread_name_prefix='wpbot-media') as pool:
+            return dict(zip(paths, pool.map(lambda path: self.ensure(client, path), paths)))
+
+    def prepare_post(self, client, content, featured_image=None, base_dir=None):
+        # 본문의 로컬 <img src> 와 대표 이미지를 올리고 (바뀐 본문, featured_media ID 또는 None) 을 돌려준다.
+        # base_dir 가 없으면 (GUI/Gemini 로 만든 글) 본문은 건드리지 않고 대표 이미지만 올린다.
+        refs = {}
+        if base_dir:
+            for match in IMG_SRC_RE.finditer(content):
+                path = local_path(match.group(3), base_dir)
+                if path:
+                    refs[match.group(3)] = path
+        featured = featured_path(featured_image, base_dir) if featured_image else None
+        paths = list(refs.values()) + ([featured] if featured else [])
+        if not paths:
+            return content, None
+        items = self.ensure_many(client, paths)
+
+        def replace(match):
+            path = refs.get(match.group(3))
+            if path is None:
+                return match.group(0)
+            return f'{match.group(1)}{match.group(2)}{items[path].source_url}{match.group(2)}'
+
+        content = IMG_SRC_RE.sub(replace, content)
+        return content, items[featured].id if featured else None
+
+
+_default_index = None
+_default_uploader = None
+_defaults_lock = threading.Lock()
+
+
+def get_media_index():
+    global _default_index
+    with _defaults_lock:
+        if _default_index is None:
+            _default_index = MediaIndex()
+        return _default_index
+
+
+def get_media_uploader():
+    global _default_uploader
+    index = get_media_index()
+    with _defaults_lock:
+        if _default_uploader is None:
+            _default_uploader = MediaUploader(index)
+        return _default_uploader
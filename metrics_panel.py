@@ -0,0 +1,99 @@
+import tkinter as tk
+from tkinter import scrolledtext
+from wp_metrics import get_recorder, AutoExporter, DEFAULT_WINDOW
+from rate_limit import get_rate_limiter, CLOSED
+
+# 요청 통계 창: wp_metrics 링 버퍼의 최근 구간을 사이트별 백분위로 1초마다 다시 그린다.
+# 워커 스레드는 기록만 하고, 집계는 이 창이 열려 있을 때 UI 스레드에서 after() 로만 한다.
+
+REFRESH_MS = 1000
+AUTO_EXPORT_INTERVAL = 15.0
+HEADER = f"{'종류':<10}{'사이트':<32}{'건수':>6}{'오류':>5}{'새연결':>7}{'연결ms':>8}{'TTFBms':>8}{'p50ms':>8}{'p95ms':>8}{'p99ms':>8}{'KB':>8}"
+
+
+def format_summary(summary):
+    lines = [HEADER, '-' * len(HEADER)]
+    for (kind, domain), stats in sorted(summary.items()):
+        domain = domain if len(domain) <= 30 else '…' + domain[-29:]
+        lines.append(f"{kind:<10}{domain:<32}{stats['count']:>6}{stats['errors']:>5}{stats['new_connections']:>7}"
+                     f"{stats['connect_avg'] * 1000:>8.1f}{stats['ttfb_p50'] * 1000:>8.1f}{stats['p50'] * 1000:>8.1f}"
+                     f"{stats['p95'] * 1000:>8.1f}{stats['p99'] * 1000:>8.1f}{stats['bytes'] // 1024:>8}")
+    if len(lines) == 2:
+        lines.append('아직 기록된 요청이 없습니다.')
+    return '\n'.join(lines)
+
+
+def format_limiters(snapshots):
+    # 속도를 줄였거나 멈춘 사이트만 보여준다.
+    lines = []
+    for snap in snapshots:
+        if snap['state'] != CLOSED or snap['paused_for']:
+            lines.append(f"{snap['domain']}: 차단기 {snap['state']} (남은 시간 {snap['open_for']}s), "
+                         f"쉬는 중 {snap['paused_for']}s, 동시 {snap['limit']}, 연속 실패 {snap['failures']}")
+    return '\n'.join(['', '--- 속도 조절/차단 중인 사이트 ---'] + lines) if lines else ''
+
+
+class MetricsWindow(tk.Toplevel):
+    def __init__(self, master, recorder=None, window=DEFAULT_WINDOW):
+        super().__init__(master)
+        self.title('요청 통계')
+        self.recorder = recorder or get_recorder()
+        self.window = window
+        self.exporter = None
+        self._after_id = None
+        tk.Label(self, text=f'최근 {window // 60}분 기준 (사이트별, 시간은 ms)').pack(anchor='w', padx=10)
+        self.text = scrolledtext.ScrolledText(self, width=110, height=16, font=('Courier', 10))
+        self.text.pack(fill='both', expand=True, padx=10)
+        buttons = tk.Frame(self)
+        buttons.pack(fill='x', padx=10, pady=5)
+        tk.Button(buttons, text='JSON 내보내기', command=self.export_json).pack(side='left', padx=2)
+        tk.Button(buttons, text='Prometheus 내보내기', command=self.export_prometheus).pack(side='left', padx=2)
+        self.auto_var = tk.BooleanVar(self, value=False)
+        tk.Checkbutton(buttons, text=f'{int(AUTO_EXPORT_INTERVAL)}초마다 자동 내보내기', variable=self.auto_var,
+                       command=self.toggle_auto_export).pack(side='left', padx=5)
+        tk.Button(buttons, text='초기화', command=self.clear).pack(side='right')
+        self.status = tk.Label(self, text='', anchor='w')
+        self.status.pack(fill='x', padx=10)
+        self.protocol('WM_DELETE_WINDOW', self.close)
+        self.refresh()
+
+    def refresh(self):
+        self.text.delete('1.0', tk.END)
+        self.text.insert(tk.END, format_summary(self.recorder.summary(self.window)))
+        self.text.insert(tk.END, format_limiters(get_rate_limiter().snapshot()))
+        self._after_id = self.after(REFRESH_MS, self.refresh)
+
+    def export_json(self):
+        self._export(self.recorder.export_json)
+
+    def export_prometheus(self):
+        self._export(self.recorder.export_prometheus)
+
+    def _export(self, export):
+        try:
+            path = export(window=self.window)
+        except OSError as e:
+            self.status.config(text=f'내보내기 실패: {e}', fg='red')
+        else:
+            self.status.config(text=f'저장됨: {path}', fg='blue')
+
+    def toggle_auto_export(self):
+        if self.auto_var.get():
+            self.exporter = AutoExporter(self.recorder, AUTO_EXPORT_INTERVAL).start()
+            self.status.config(text='자동 내보내기 켜짐 (metrics.json, metrics.prom)', fg='blue')
+        elif self.exporter is not None:
+            self.exporter.stop()
+            self.exporter = None
+            self.status.config(text='자동 내보내기 꺼짐', fg='gray')
+
+    def clear(self):
+        self.recorder.clear()
+
+    def close(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+        if self.exporter is not None:
+            self.exporter.stop()
+            self.exporter = None
+        self.destroy()
@@ -0,0 +1,168 @@
+import html
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from app_paths import data_path
+from wp_client import WordPressAPIError, normalize_domain
+
+# 사이트별 게시물 목록(본문 제외)을 로컬 SQLite 에 저장하는 인덱스.
+# 처음에는 전체를, 이후에는 modified_after 로 바뀐 글만 받아온다 (증분 동기화).
+
+INDEX_FILE = 'post_index.sqlite3'
+POST_FIELDS = 'id,title,slug,status,categories,modified'
+# 로그인한 사용자가 볼 수 있는 모든 상태 (휴지통 제외)
+SYNC_STATUS = 'publish,future,draft,pending,private'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS posts (
+    site TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    status TEXT NOT NULL,
+    modified TEXT NOT NULL,
+    PRIMARY KEY (site, id)
+);
+CREATE INDEX IF NOT EXISTS posts_site_modified ON posts (site, modified);
+CREATE TABLE IF NOT EXISTS post_categories (
+    site TEXT NOT NULL,
+    category_id INTEGER NOT NULL,
+    post_id INTEGER NOT NULL,
+    PRIMARY KEY (site, category_id, post_id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    site TEXT PRIMARY KEY,
+    last_modified TEXT,
+    synced_at REAL
+);
+'''
+
+_LIKE_SPECIAL = re.compile(r'[\\%_]')
+
+
+class SyncResult:
+    def __init__(self, site, fetched, total, full, elapsed):
+        self.site = site
+        self.fetched = fetched
+        self.total = total
+        self.full = full
+        self.elapsed = elapsed
+
+
+class PostIndex:
+    def __init__(self, path=None):
+        self.path = path or data_path(INDEX_FILE)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def last_modified(self, site):
+        with self._lock:
+            row = self._conn.execute('SELECT last_modified FROM sync_state WHERE site = ?',
+                                     (normalize_domain(site),)).fetchone()
+        return row[0] if row else None
+
+    def count(self, site):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM posts WHERE site = ?',
+                                      (normalize_domain(site),)).fetchone()[0]
+
+    def clear(self, site):
+        site = normalize_domain(site)
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM posts WHERE site = ?', (site,))
+            self._conn.execute('DELETE FROM post_categories WHERE site = ?', (site,))
+            self._conn.execute('DELETE FROM sync_state WHERE site = ?', (site,))
+
+    def upsert(self, site, posts):
+        site = normalize_domain(site)
+        rows = [(site, post['id'], html.unescape(post['title']['rendered']), post['slug'], post['status'],
+                 post['modified']) for post in posts]
+        ids = [(site, post['id']) for post in posts]
+        links = [(site, cat_id, post['id']) for post in posts for cat_id in post.get('categories', [])]
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self._conn.executemany('DELETE FROM post_categories WHERE site = ? AND post_id = ?', ids)
+            self._conn.executemany('INSERT OR IGNORE INTO post_categories VALUES (?, ?, ?)', links)
+
+    def _finish_sync(self, site):
+        site = normalize_domain(site)
+        with self._lock, self._conn:
+            row = self._conn.execute('SELECT MAX(modified) FROM posts WHERE site = ?', (site,)).fetchone()
+            self._conn.execute('INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)', (site, row[0], time.time()))
+
+    def sync(self, client, full=False, on_page=None, should_cancel=None):
+        # full=True 이면 기존 인덱스를 지우고 다시 받는다 (삭제/휴지통 이동 반영용).
+        started = time.perf_counter()
+        site = client.domain
+        if full:
+            self.clear(site)
+        last = self.last_modified(site)
+        params = {'_fields': POST_FIELDS, 'orderby': 'modified', 'order': 'asc', 'status': SYNC_STATUS}
+        if last:
+            # modified_after 는 초 단위로 비교하므로 같은 초에 수정된 글을 놓치지 않도록 1초 앞에서 시작한다.
+            since = datetime.fromisoformat(last) - timedelta(seconds=1)
+            params['modified_after'] = since.isoformat()
+        fetched = [0]
+
+        def handle_page(page, items, total_pages):
+            self.upsert(site, items)
+            fetched[0] += len(items)
+            if on_page:
+                on_page(page, total_pages, fetched[0])
+
+        try:
+            client.fetch_pages('wp/v2/posts', params=params, on_page=handle_page, should_cancel=should_cancel)
+        except WordPressAPIError as e:
+            if e.status_code not in (400, 401, 403):
+                raise
+            # 비공개 상태를 볼 권한이 없으면 공개 글만 동기화한다.
+            del params['status']
+            client.fetch_pages('wp/v2/posts', params=params, on_page=handle_page, should_cancel=should_cancel)
+        self._finish_sync(site)
+        return SyncResult(site, fetched[0], self.count(site), full or not last, time.perf_counter() - started)
+
+    def search(self, site, text=None, category_id=None, status=None, limit=50):
+        # 최근 수정 순으로 돌려준다. text 는 제목/슬러그 부분 일치.
+        query = 'SELECT p.id, p.title, p.slug, p.status, p.modified FROM posts p'
+        args = []
+        if category_id is not None:
+            query += ' JOIN post_categories c ON c.site = p.site AND c.post_id = p.id AND c.category_id = ?'
+            args.append(category_id)
+        query += ' WHERE p.site = ?'
+        args.append(normalize_domain(site))
+        if text:
+            query += " AND (p.title LIKE ? ESCAPE '\\' OR p.slug LIKE ? ESCAPE '\\')"
+            # 검색어의 % 와 _ 는 와일드카드가 아니라 글자 그대로 찾는다.
+            pattern = '%' + _LIKE_SPECIAL.sub(r'\\\g<0>', text) + '%'
+            args.extend([pattern, pattern])
+        if status:
+            query += ' AND p.status = ?'
+            args.append(status)
+        query += ' ORDER BY p.modified DESC LIMIT ?'
+        args.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+        return [dict(zip(('id', 'title', 'slug', 'status', 'modified'), row)) for row in rows]
+
+    def recent(self, site, limit=20):
+        return self.search(site, limit=limit)
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_post_index():
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = PostIndex()
+        return _default_index
@@ -0,0 +1,514 @@
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from app_paths import data_path
+from wp_client import WordPressAPIError, normalize_domain
+from wp_batch import MAX_BATCH_SIZE, create_posts, known_batch_support
+from wpbot_core import attach_media, build_post_data, client_for, render_template, resolve_category_ids
+from rate_limit import CircuitOpenError
+from dedup_index import fingerprint_post, get_dedup_index, hamming, similarity
+
+# 발행 작업을 SQLite 에 저장해 두고 순서대로 처리하는 영구 작업 큐.
+# 각 작업은 멱등 키를 갖고, 키의 일부를 글 슬러그 끝에 붙여 발행한다.
+# 재시도할 때는 같은 슬러그의 글이 이미 있는지 먼저 확인하므로,
+# 서버가 글을 만든 뒤 응답만 놓친 경우에도 중복 글이 생기지 않는다.
+# 앱이 중간에 종료되면 다음 실행 때 recover() 가 실행 중이던 작업을 다시 대기 상태로 돌린다.
+# 같은 (도메인, 사용자) 의 대기 작업은 최대 25개씩 batch/v1 요청 하나로 묶어 보낸다.
+# payload 의 dedup 이 거짓이 아니면 발행 전에 그 사이트에 거의 같은 글이 있는지 (dedup_index) 확인한다.
+# 기준 거리는 payload 의 dedup_distance (없으면 인덱스 기본값).
+# 사이트의 기존 글은 백그라운드에서 받으므로, 첫 동기화가 끝나기 전에는 이미 모은 지문 (이 앱이 발행한 글 등) 과만 비교한다.
+
+QUEUE_FILE = 'publish_queue.sqlite3'
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 5.0
+BACKOFF_MAX = 3600.0
+# 계정 정보가 아직 없을 때 (재시작 직후 등) 다시 확인하는 간격
+ACCOUNT_WAIT = 30.0
+DEFAULT_WORKERS = 4
+DEFAULT_PER_DOMAIN_LIMIT = 2
+# 할 일이 없을 때 최대로 잠드는 시간. 새 작업/작업 종료/stop() 은 notify 로 바로 깨운다.
+MAX_IDLE_WAIT = 60.0
+KEY_SUFFIX_LENGTH = 12
+# WordPress 는 슬러그의 한글 등을 퍼센트 인코딩한 뒤 이 길이(바이트)에서 자른다.
+MAX_SLUG_BYTES = 200
+KEY_SUFFIX_PATTERN = re.compile(r'-([0-9a-f]{%d})(?:-\d+)?$' % KEY_SUFFIX_LENGTH)
+ANY_STATUS = 'publish,future,draft,pending,private'
+
+STATE_PENDING = 'pending'
+STATE_RUNNING = 'running'
+STATE_DONE = 'done'
+STATE_FAILED = 'failed'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    batch_id TEXT,
+    domain TEXT NOT NULL,
+    username TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    post_id INTEGER,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state_next ON jobs (state, next_attempt_at);
+'''
+
+
+class RetryableError(Exception):
+    pass
+
+
+class PermanentError(Exception):
+    pass
+
+
+class DuplicateContent(PermanentError):
+    pass
+
+
+class AccountUnavailable(Exception):
+    pass
+
+
+class SitePaused(Exception):
+    # 사이트 차단기가 열려 있거나 Retry-After 로 쉬는 중. 시도 횟수를 쓰지 않고 retry_at 에 다시 시도한다.
+    def __init__(self, error):
+        super().__init__(str(error))
+        self.retry_at = error.retry_at
+
+
+def _network_error(error):
+    return SitePaused(error) if isinstance(error, CircuitOpenError) else RetryableError(error)
+
+
+def make_idempotency_key(domain, username, payload, batch_id=None):
+    # 같은 묶음(batch_id) 안에서만 같은 글을 하나로 본다. 사용자가 같은 글을 다시 발행하면 새 묶음이므로 새 작업이 된다.
+    parts = [normalize_domain(domain), username, payload]
+    if batch_id is not None:
+        parts.append(batch_id)
+    data = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _encoded_length(char):
+    return 1 if char.isascii() else 3 * len(char.encode('utf-8'))
+
+
+def idempotent_slug(title, key):
+    # 제목(또는 사용자가 지정한 슬러그) 뒤에 멱등 키 일부를 붙인다. (WordPress 가 다시 sanitize 한다.)
+    # 한글 한 글자는 인코딩하면 9바이트이므로, 인코딩한 길이로 앞부분을 줄여 서버가 자를 때 키가 남게 한다.
+    suffix = key[:KEY_SUFFIX_LENGTH]
+    base = re.sub(r'[^\w]+', '-', title.lower()).strip('-')
+    budget = MAX_SLUG_BYTES - len(suffix) - 1
+    for end, char in enumerate(base):
+        budget -= _encoded_length(char)
+        if budget < 0:
+            base = base[:end].rstrip('-')
+            break
+    return f'{base}-{suffix}' if base else f'post-{suffix}'
+
+
+def backoff_delay(attempts):
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.5, 1.5)
+
+
+class Job:
+    COLUMNS = ('id', 'idempotency_key', 'batch_id', 'domain', 'username', 'payload', 'state', 'attempts',
+               'next_attempt_at', 'post_id', 'last_error', 'created_at', 'updated_at')
+
+    def __init__(self, row):
+        for name, value in zip(self.COLUMNS, row):
+            setattr(self, name, value)
+        self.payload = json.loads(self.payload)
+
+
+class PublishQueue:
+    def __init__(self, path=None):
+        self.path = path or data_path(QUEUE_FILE)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+        self._wakeup = threading.Condition()
+
+    def enqueue(self, domain, username, payload, idempotency_key=None, batch_id=None, run_at=None):
+        # payload: title, content, status 와 categories 또는 category_names.
+        # 같은 멱등 키의 작업이 이미 있으면 새로 추가하지 않고 기존 작업 ID 를 돌려준다.
+        # 멱등 키는 batch_id 를 포함하므로, 같은 묶음을 다시 넣을 때 (재시작 후 재시도 등) 만 합쳐진다.
+        domain = normalize_domain(domain)
+        key = idempotency_key or make_idempotency_key(domain, username, payload, batch_id)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO jobs (idempotency_key, batch_id, domain, username, payload, state, '
+                'next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, batch_id, domain, username, json.dumps(payload, ensure_ascii=False), STATE_PENDING,
+                 run_at or now, now, now))
+            job_id = self._conn.execute('SELECT id FROM jobs WHERE idempotency_key = ?', (key,)).fetchone()[0]
+        self.notify()
+        return job_id
+
+    def notify(self):
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def wait(self, timeout):
+        with self._wakeup:
+            self._wakeup.wait(timeout)
+
+    def recover(self):
+        # 비정상 종료로 running 상태에 남은 작업을 다시 대기 상태로 돌린다.
+        with self._lock, self._conn:
+            count = self._conn.execute('UPDATE jobs SET state = ?, updated_at = ? WHERE state = ?',
+                                       (STATE_PENDING, time.time(), STATE_RUNNING)).rowcount
+        return count
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(f'SELECT {", ".join(Job.COLUMNS)} FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return Job(row) if row else None
+
+    def due_jobs(self, limit, now=None, per_domain=None, exclude_domains=()):
+        # per_domain 을 주면 도메인마다 가장 먼저 처리할 작업을 그 수까지만 가져온다.
+        # 한 도메인에 작업이 많이 쌓여도 다른 도메인의 작업이 limit 밖으로 밀려나지 않는다.
+        # exclude_domains 는 동시 실행 한도에 걸려 지금 시작할 수 없는 도메인이다.
+        where = 'state = ? AND next_attempt_at <= ?'
+        args = [STATE_PENDING, now or time.time()]
+        if exclude_domains:
+            where += f' AND domain NOT IN ({", ".join("?" * len(exclude_domains))})'
+            args.extend(exclude_domains)
+        columns = ', '.join(Job.COLUMNS)
+        if per_domain is None:
+            query = f'SELECT {columns} FROM jobs WHERE {where} ORDER BY next_attempt_at, id LIMIT ?'
+        else:
+            query = (f'SELECT {columns} FROM (SELECT *, ROW_NUMBER() OVER '
+                     f'(PARTITION BY domain ORDER BY next_attempt_at, id) AS domain_rank FROM jobs WHERE {where}) '
+                     'WHERE domain_rank <= ? ORDER BY next_attempt_at, id LIMIT ?')
+            args.append(per_domain)
+        with self._lock:
+            rows = self._conn.execute(query, (*args, limit)).fetchall()
+        return [Job(row) for row in rows]
+
+    def next_due_at(self):
+        with self._lock:
+            row = self._conn.execute('SELECT MIN(next_attempt_at) FROM jobs WHERE state = ?',
+                                     (STATE_PENDING,)).fetchone()
+        return row[0]
+
+    def claim(self, job):
+        # 다른 워커가 먼저 가져가지 않았을 때만 running 으로 바꾼다.
+        with self._lock, self._conn:
+            return self._conn.execute(
+                'UPDATE jobs SET state = ?, attempts = attempts + 1, updated_at = ? WHERE id = ? AND state = ?',
+                (STATE_RUNNING, time.time(), job.id, STATE_PENDING)).rowcount == 1
+
+    def _update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id))
+
+    def mark_done(self, job_id, post_id):
+        self._update(job_id, state=STATE_DONE, post_id=post_id, last_error=None)
+
+    def mark_failed(self, job_id, error):
+        self._update(job_id, state=STATE_FAILED, last_error=str(error)[:500])
+
+    def reschedule(self, job_id, delay, error, count_attempt=True):
+        fields = {'state': STATE_PENDING, 'next_attempt_at': time.time() + delay, 'last_error': str(error)[:500]}
+        if not count_attempt:
+            with self._lock, self._conn:
+                self._conn.execute('UPDATE jobs SET attempts = attempts - 1 WHERE id = ?', (job_id,))
+        self._update(job_id, **fields)
+
+    def retry_failed(self):
+        with self._lock, self._conn:
+            count = self._conn.execute(
+                'UPDATE jobs SET state = ?, attempts = 0, next_attempt_at = ?, updated_at = ? WHERE state = ?',
+                (STATE_PENDING, time.time(), time.time(), STATE_FAILED)).rowcount
+        self.notify()
+        return count
+
+    def batch_summary(self, batch_id):
+        # (상태별 개수, 첫 작업 추가 시각, 마지막 갱신 시각)
+        with self._lock:
+            rows = self._conn.execute('SELECT state, COUNT(*) FROM jobs WHERE batch_id = ? GROUP BY state',
+                                      (batch_id,)).fetchall()
+            started, finished = self._conn.execute(
+                'SELECT MIN(created_at), MAX(updated_at) FROM jobs WHERE batch_id = ?', (batch_id,)).fetchone()
+        return dict(rows), started, finished
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def find_existing_posts(client, slugs):
+    # {멱등 키 접미사: 글 ID}. slug 파라미터는 여러 값을 받으므로 한 번의 요청으로 확인한다.
+    # 한글 슬러그는 서버가 퍼센트 인코딩해서 돌려주므로 끝에 붙인 키 접미사로 비교한다.
+    # 슬러그마다 키가 들어 있어 같은 슬러그는 같은 작업의 글뿐이다 (-2 가 붙은 글도 키로 알아본다).
+    params = {'slug': ','.join(slugs), 'status': ANY_STATUS, '_fields': 'id,slug', 'per_page': len(slugs)}
+    response = client.get('wp/v2/posts', params=params)
+    if response.status_code in (400, 401, 403):
+        # 비공개 상태를 볼 권한이 없으면 공개 글에서만 찾는다.
+        del params['status']
+        response = client.get('wp/v2/posts', params=params)
+    if response.status_code != 200:
+        raise RetryableError(f'중복 확인 실패: {response.status_code}')
+    existing = {}
+    for post in response.json():
+        match = KEY_SUFFIX_PATTERN.search(post['slug'])
+        if match:
+            existing.setdefault(match.group(1), post['id'])
+    return existing
+
+
+def _job_slug(job):
+    # payload 에 slug 가 있어도 키를 붙인다. 키가 없으면 재시도할 때 같은 작업의 글인지 알 수 없다.
+    return idempotent_slug(job.payload.get('slug') or job.payload['title'], job.idempotency_key)
+
+
+def _job_key(job):
+    return job.idempotency_key[:KEY_SUFFIX_LENGTH]
+
+
+def _error_for_status(status, message):
+    if status == 429 or status >= 500:
+        return RetryableError(message)
+    return PermanentError(message)
+
+
+def check_duplicate(dedup, domain, fingerprint, accepted, max_distance=None):
+    # 사이트의 기존 글과, 같은 배치에서 먼저 통과한 글 [(job, 지문)] 중 비슷한 것이 있으면 DuplicateContent
+    max_distance = dedup.max_distance if max_distance is None else max_distance
+    match = dedup.find_similar(domain, fingerprint, max_distance)
+    if match is not None:
+        return DuplicateContent(str(match))
+    for other, other_fingerprint in accepted:
+        distance = hamming(fingerprint, other_fingerprint)
+        if distance <= max_distance:
+            return DuplicateContent(f'같은 배치의 작업 #{other.id} 와 비슷한 글입니다 (유사도 {similarity(distance):.0%})')
+    return None
+
+
+def publish_jobs(jobs, account):
+    # 같은 (도메인, 사용자) 의 작업들을 batch/v1 로 한 번에 (지원하지 않으면 하나씩) 발행한다.
+    # 작업마다 (post_id, 이미 있던 글인지) 또는 RetryableError/PermanentError 를 입력 순서대로 돌려준다.
+    client = client_for(account)
+    outcomes = [None] * len(jobs)
+    dedup = get_dedup_index()
+    fingerprints = {}
+    try:
+        retried = [job for job in jobs if job.attempts > 1]
+        existing = find_existing_posts(client, [_job_slug(job) for job in retried]) if retried else {}
+        if any(job.payload.get('dedup', True) for job in jobs):
+            # 사이트의 기존 글 지문은 백그라운드에서 받는다. 첫 동기화 (글 전체) 가 발행을 붙잡지 않게 한다.
+            dedup.sync_in_background(client)
+        prepared = []
+        accepted = []
+        for index, job in enumerate(jobs):
+            if _job_key(job) in existing:
+                outcomes[index] = (existing[_job_key(job)], True)
+                continue
+            payload = job.payload
+            if payload.get('dedup', True):
+                # 사이트별로 치환된 제목/본문으로 비교한다 (미디어 업로드 전에 걸러 낸다).
+                fingerprint = fingerprint_post(render_template(payload['title'], account),
+                                               render_template(payload['content'], account))
+                if fingerprint is not None:
+                    duplicate = check_duplicate(dedup, job.domain, fingerprint, accepted, payload.get('dedup_distance'))
+                    if duplicate is not None:
+                        outcomes[index] = duplicate
+                        continue
+                    accepted.append((job, fingerprint))
+                    fingerprints[index] = fingerprint
+            try:
+                categories = payload.get('categories')
+                if categories is None:
+                    names = payload.get('category_names') or []
+                    categories = resolve_category_ids(client, names) if names else []
+                # 큐의 글(직접 쓴 글, Gemini 가 만든 글) 은 base_dir 가 없으므로 본문의 경로는 올리지 않고,
+                # 사용자가 고른 대표 이미지만 올린다.
+                content, featured_media = attach_media(client, payload['content'], payload.get('featured_image'))
+            except WordPressAPIError as e:
+                outcomes[index] = _error_for_status(e.status_code, f'카테고리/미디어 요청 실패: {e}')
+                continue
+            except requests.exceptions.RequestException as e:
+                outcomes[index] = _network_error(e)
+                continue
+            except OSError as e:
+                outcomes[index] = PermanentError(f'이미지 파일을 읽을 수 없습니다: {e}')
+                continue
+            post_data = build_post_data(account, payload['title'], content, categories,
+                                        payload.get('status', 'publish'), payload)
+            post_data['slug'] = _job_slug(job)
+            if featured_media:
+                post_data['featured_media'] = featured_media
+            prepared.append((index, post_data))
+        responses = create_posts(client, [post_data for _, post_data in prepared]) if prepared else []
+    except (requests.exceptions.RequestException, RetryableError) as e:
+        error = e if isinstance(e, RetryableError) else _network_error(e)
+        return [outcome if outcome is not None else error for outcome in outcomes]
+    except WordPressAPIError as e:
+        error = _error_for_status(e.status_code, f'{e.status_code}: {e.response.text[:200]}')
+        return [outcome if outcome is not None else error for outcome in outcomes]
+    for (index, _), response in zip(prepared, responses):
+        if response.status == 201:
+            outcomes[index] = (response.body.get('id'), False)
+        else:
+            outcomes[index] = _error_for_status(response.status, response.error_text[:200])
+    # 새로 발행한 글의 지문을 바로 넣어 다음 작업부터 비교 대상이 되게 한다.
+    published = [(outcomes[index][0], fingerprint) for index, fingerprint in fingerprints.items()
+                 if isinstance(outcomes[index], tuple) and outcomes[index][0]]
+    if published:
+        dedup.add_fingerprints(account['domain'], published)
+    return outcomes
+
+
+class PublishWorker:
+    def __init__(self, queue, resolve_account, max_workers=DEFAULT_WORKERS, per_domain_limit=DEFAULT_PER_DOMAIN_LIMIT,
+                 max_attempts=MAX_ATTEMPTS):
+        # resolve_account(domain, username) -> 계정 dict 또는 None
+        self.queue = queue
+        self.resolve_account = resolve_account
+        self.max_workers = max_workers
+        self.per_domain_limit = per_domain_limit
+        self.max_attempts = max_attempts
+        self._running = {}
+        self._running_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+        self.queue.notify()
+
+    def _slots(self):
+        with self._running_lock:
+            return self.max_workers - sum(self._running.values())
+
+    def _saturated_domains(self):
+        with self._running_lock:
+            return [domain for domain, count in self._running.items() if count >= self.per_domain_limit]
+
+    def _try_start(self, domain):
+        with self._running_lock:
+            if self._running.get(domain, 0) >= self.per_domain_limit:
+                return False
+            self._running[domain] = self._running.get(domain, 0) + 1
+            return True
+
+    def _finish(self, domain):
+        with self._running_lock:
+            self._running[domain] -= 1
+        self.queue.notify()
+
+    def process(self, jobs, on_event=None):
+        # jobs 는 같은 (도메인, 사용자) 의 작업 목록 (batch/v1 한 번에 보낸다)
+        domain = jobs[0].domain
+        try:
+            account = self.resolve_account(domain, jobs[0].username)
+            if account is None:
+                raise AccountUnavailable('계정 정보 없음')
+            outcomes = publish_jobs(jobs, account)
+        except AccountUnavailable as e:
+            outcomes = [e] * len(jobs)
+        except Exception as e:
+            outcomes = [PermanentError(e)] * len(jobs)
+        try:
+            for job, outcome in zip(jobs, outcomes):
+                event = self._record(job, outcome)
+                if on_event:
+                    on_event(job, event)
+        finally:
+            self._finish(domain)
+
+    def _record(self, job, outcome):
+        if isinstance(outcome, AccountUnavailable):
+            self.queue.reschedule(job.id, ACCOUNT_WAIT, outcome, count_attempt=False)
+            return ('waiting', str(outcome))
+        if isinstance(outcome, SitePaused):
+            self.queue.reschedule(job.id, max(1.0, outcome.retry_at - time.time()), outcome, count_attempt=False)
+            return ('paused', str(outcome))
+        if isinstance(outcome, RetryableError):
+            if job.attempts >= self.max_attempts:
+                self.queue.mark_failed(job.id, outcome)
+                return ('failed', str(outcome))
+            delay = backoff_delay(job.attempts)
+            self.queue.reschedule(job.id, delay, outcome)
+            return ('retry', f'{delay:.0f}초 후 재시도: {outcome}')
+        if isinstance(outcome, Exception):
+            self.queue.mark_failed(job.id, outcome)
+            return ('failed', str(outcome))
+        post_id, existed = outcome
+        self.queue.mark_done(job.id, post_id)
+        return ('done', post_id, existed)
+
+    def _group(self, jobs):
+        # (도메인, 사용자) 별로 묶는다. batch/v1 을 지원하지 않는 것으로 확인된 사이트는 하나씩.
+        groups = {}
+        order = []
+        for job in jobs:
+            key = (job.domain, job.username)
+            size = 1 if known_batch_support(job.domain) is False else MAX_BATCH_SIZE
+            group = groups.get(key)
+            if group is None or len(group) >= size:
+                group = groups[key] = []
+                order.append(group)
+            group.append(job)
+        return order
+
+    def run(self, should_stop=None, on_event=None):
+        # stop() 이 호출되거나 should_stop() 이 참이 될 때까지 due 작업을 처리한다.
+        # 할 일이 없으면 다음 작업 시각까지 잠든다 (예약 작업만 있을 때는 CPU 를 쓰지 않는다).
+        self.queue.recover()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='wpbot-queue') as pool:
+            while not self._stopped.is_set() and not (should_stop and should_stop()):
+                started = 0
+                slots = self._slots()
+                if slots > 0:
+                    # 도메인마다 한 번에 시작할 수 있는 만큼만 가져와, 한 사이트에 쌓인 작업이
+                    # 다른 사이트의 작업을 가리지 않게 한다.
+                    due = self.queue.due_jobs(limit=slots * MAX_BATCH_SIZE * 2,
+                                              per_domain=self.per_domain_limit * MAX_BATCH_SIZE,
+                                              exclude_domains=self._saturated_domains())
+                    for group in self._group(due):
+                        if started >= slots:
+                            break
+                        if not self._try_start(group[0].domain):
+                            continue
+                        claimed = [job for job in group if self.queue.claim(job)]
+                        if not claimed:
+                            self._finish(group[0].domain)
+                            continue
+                        for job in claimed:
+                            job.attempts += 1
+                            if on_event:
+                                on_event(job, ('running', job.attempts))
+                        pool.submit(self.process, claimed, on_event)
+                        started += 1
+                if started == 0:
+                    # 지금 처리할 수 있는 작업이 없으면 (없거나 도메인별 한도에 걸림) 다음 작업 시각까지 잔다.
+                    next_due = self.queue.next_due_at()
+                    now = time.time()
+                    if next_due is None or next_due <= now:
+                        timeout = MAX_IDLE_WAIT
+                    else:
+                        timeout = min(MAX_IDLE_WAIT, next_due - now)
+                    self.queue.wait(timeout)
@@ -0,0 +1,211 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import requests
+
+# 도메인별 요청 속도 조절과 차단기(circuit breaker).
+# - 동시 요청 수를 AIMD 로 조절한다: 정상 응답이면 조금씩(1/limit) 늘리고, 429/503/보안 플러그인 차단이나
+#   응답 시간이 평소의 몇 배로 늘어나면 절반으로 줄인다. Retry-After 가 오면 그 시각까지 해당 사이트 요청을 멈춘다.
+# - 연속 실패가 쌓이면 차단기를 열어 일정 시간 그 사이트로 요청을 보내지 않는다 (CircuitOpenError).
+#   시간이 지나면 요청 하나만 시험 삼아 보내 보고, 성공하면 다시 연다. 실패하면 대기 시간을 늘린다.
+# 사이트마다 따로 동작하므로 한 사이트가 느려지거나 막혀도 다른 사이트 작업은 그대로 진행된다.
+
+INITIAL_LIMIT = 4.0
+MIN_LIMIT = 1.0
+MAX_LIMIT = 16.0
+DECREASE_FACTOR = 0.5
+# 응답 시간(TTFB) EWMA 가 관측된 최소 응답 시간의 이 배수를 넘으면 서버가 밀리는 것으로 본다.
+# 글 25개짜리 배치와 카테고리 조회는 원래 걸리는 시간이 다르므로 (메서드, 엔드포인트) 별로 따로 본다.
+LATENCY_TOLERANCE = 4.0
+LATENCY_ALPHA = 0.2
+# 너무 짧은 응답 시간(캐시 적중 등) 을 기준으로 삼지 않도록 최소 기준을 둔다.
+MIN_BASELINE = 0.05
+
+FAILURE_THRESHOLD = 5
+OPEN_SECONDS = 30.0
+MAX_OPEN_SECONDS = 600.0
+# Retry-After 가 없는 429 후 쉬는 시간. (Retry-After 없는 503 은 쉬지 않고 동시 요청 수만 줄인다.
+# 쉬는 동안 워커가 붙잡혀 있으면 다른 사이트까지 느려지므로, 계속 실패하는 사이트는 차단기로 빨리 끊는다.)
+DEFAULT_THROTTLE_PAUSE = 5.0
+MAX_RETRY_AFTER = 3600.0
+# 이보다 긴 일시 정지는 스레드를 붙잡고 기다리지 않고 CircuitOpenError 로 돌려보낸다 (발행 큐는 그 시각에 다시 시도).
+MAX_INLINE_WAIT = 10.0
+
+THROTTLE_STATUSES = (429, 503)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    # 네트워크 오류와 같이 다뤄지도록 requests 예외를 상속한다 (발행 큐는 재시도, GUI 는 오류 표시).
+    def __init__(self, domain, retry_at):
+        self.domain = domain
+        self.retry_at = retry_at
+        super().__init__(f'{domain}: 오류가 계속되어 {max(0, retry_at - time.time()):.0f}초 동안 요청을 멈췄습니다.')
+
+
+def parse_retry_after(value, now=None):
+    # 초 또는 HTTP 날짜. 알 수 없으면 None.
+    if not value:
+        return None
+    now = now or time.time()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - now
+        except (TypeError, ValueError, IndexError):
+            return None
+    return min(MAX_RETRY_AFTER, max(0.0, seconds))
+
+
+def is_blocked_response(response):
+    # 보안 플러그인/WAF 차단: REST 경로인데 JSON 이 아닌 HTML 403 이 오는 경우
+    if response.status_code != 403:
+        return False
+    return 'json' not in response.headers.get('Content-Type', '')
+
+
+class DomainLimiter:
+    def __init__(self, domain, initial_limit=INITIAL_LIMIT, max_limit=MAX_LIMIT, failure_threshold=FAILURE_THRESHOLD,
+                 open_seconds=OPEN_SECONDS):
+        self.domain = domain
+        self.limit = initial_limit
+        self.max_limit = max_limit
+        self.failure_threshold = failure_threshold
+        self.base_open_seconds = open_seconds
+        self.in_flight = 0
+        self.paused_until = 0.0
+        # (메서드, 엔드포인트) -> [EWMA, 최소값]
+        self.latencies = {}
+        self.state = CLOSED
+        self.failures = 0
+        self.open_seconds = open_seconds
+        self.open_until = 0.0
+        self._trial_running = False
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        # 보낼 수 있을 때까지 기다린다. 차단기가 열려 있으면 기다리지 않고 CircuitOpenError.
+        with self._cond:
+            while True:
+                now = time.time()
+                if self.state == OPEN:
+                    if now < self.open_until:
+                        raise CircuitOpenError(self.domain, self.open_until)
+                    self.state = HALF_OPEN
+                if self.state == HALF_OPEN:
+                    # 시험 요청은 하나만 보낸다.
+                    if self._trial_running:
+                        raise CircuitOpenError(self.domain, now + 1)
+                    if self.in_flight == 0:
+                        self._trial_running = True
+                        self.in_flight += 1
+                        return
+                elif self.paused_until - now > MAX_INLINE_WAIT:
+                    raise CircuitOpenError(self.domain, self.paused_until)
+                elif now >= self.paused_until and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                wait = self.paused_until - now if now < self.paused_until else 1.0
+                self._cond.wait(min(wait, 1.0))
+
+    def release(self, status=None, elapsed=None, retry_after=None, blocked=False, error=None, key=None):
+        # status 가 None 이면 네트워크 오류 (error). elapsed 가 None 이면 (파일 업로드 등) 응답 시간은 보지 않는다.
+        with self._cond:
+            self.in_flight -= 1
+            self._trial_running = False
+            throttled = blocked or status in THROTTLE_STATUSES
+            failed = throttled or error is not None or (status is not None and status >= 500)
+            if throttled:
+                pause = retry_after
+                if pause is None and status == 429:
+                    pause = DEFAULT_THROTTLE_PAUSE
+                if pause:
+                    self.paused_until = max(self.paused_until, time.time() + pause)
+                self._decrease()
+            elif not failed and elapsed is not None:
+                self._observe_latency(key, elapsed)
+            if failed:
+                self._record_failure()
+            elif status is not None:
+                self._record_success()
+            self._cond.notify_all()
+
+    def _decrease(self):
+        self.limit = max(MIN_LIMIT, self.limit * DECREASE_FACTOR)
+
+    def _observe_latency(self, key, elapsed):
+        stats = self.latencies.get(key)
+        if stats is None:
+            stats = self.latencies[key] = [elapsed, elapsed]
+        stats[0] = (1 - LATENCY_ALPHA) * stats[0] + LATENCY_ALPHA * elapsed
+        stats[1] = min(stats[1], elapsed)
+        baseline = max(stats[1], MIN_BASELINE)
+        if stats[0] > baseline * LATENCY_TOLERANCE:
+            self._decrease()
+            # 줄인 뒤에는 새 기준으로 다시 관찰한다 (연속으로 계속 줄이지 않도록).
+            stats[0] = baseline
+        else:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def _record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.open_seconds = min(MAX_OPEN_SECONDS, self.open_seconds * 2)
+            self._open()
+        elif self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.open_until = time.time() + self.open_seconds
+        self.limit = MIN_LIMIT
+
+    def _record_success(self):
+        self.failures = 0
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self.open_seconds = self.base_open_seconds
+
+    def snapshot(self):
+        with self._cond:
+            return {'domain': self.domain, 'state': self.state, 'limit': round(self.limit, 2),
+                    'in_flight': self.in_flight, 'failures': self.failures,
+                    'paused_for': max(0.0, round(self.paused_until - time.time(), 1)),
+                    'open_for': max(0.0, round(self.open_until - time.time(), 1)) if self.state == OPEN else 0.0}
+
+
+class RateLimiter:
+    def __init__(self, **options):
+        self.options = options
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def for_domain(self, domain):
+        with self._lock:
+            limiter = self._limiters.get(domain)
+            if limiter is None:
+                limiter = self._limiters[domain] = DomainLimiter(domain, **self.options)
+            return limiter
+
+    def snapshot(self):
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return [limiter.snapshot() for limiter in limiters]
+
+    def reset(self, domain=None):
+        with self._lock:
+            if domain is None:
+                self._limiters.clear()
+            else:
+                self._limiters.pop(domain, None)
+
+
+_default_limiter = RateLimiter()
+
+
+def get_rate_limiter():
+    return _default_limiter
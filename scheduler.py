@@ -0,0 +1,126 @@
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from app_paths import data_path
+from wp_client import normalize_domain
+
+# 예약 발행: 사이트마다 발행 시각(슬롯)을 간격을 두고 배정해 한꺼번에 몰리지 않게 한다.
+#   future 모드 - 바로 발행 큐에 넣되 status=future, date_gmt=슬롯 으로 보내 워드프레스가 예약 발행한다.
+#   local 모드  - 발행 큐의 next_attempt_at 을 슬롯으로 두어 그 시각에 이 앱이 발행한다.
+# 발행 큐는 (state, next_attempt_at) 인덱스로 시간순 정렬된 SQLite 테이블이므로 재시작해도 예약이 유지되고,
+# 워커는 다음 작업 시각까지 잠들어 있다가 그때만 깨어난다.
+# 사이트별 마지막 슬롯도 저장해 두므로 여러 번 나눠 예약해도 간격이 유지된다.
+
+SCHEDULE_FILE = 'publish_schedule.sqlite3'
+MODE_FUTURE = 'future'
+MODE_LOCAL = 'local'
+DEFAULT_SPACING = 60 * 60
+# 슬롯마다 간격의 ±이 비율만큼 무작위로 흔든다 (모든 사이트가 정각에 발행하지 않도록).
+DEFAULT_JITTER = 0.1
+# 이보다 가까운 슬롯은 예약하지 않고 바로 발행한다 (워드프레스는 과거 날짜의 future 를 바로 발행한다).
+MIN_FUTURE_LEAD = 120
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS site_slots (
+    site TEXT PRIMARY KEY,
+    last_slot REAL NOT NULL
+);
+'''
+
+
+def to_gmt_iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def parse_local_time(text):
+    # 'YYYY-MM-DD HH:MM' (로컬 시간) -> epoch 초. 빈 문자열이면 지금.
+    text = text.strip()
+    if not text:
+        return time.time()
+    return datetime.strptime(text, '%Y-%m-%d %H:%M').timestamp()
+
+
+class SlotPlanner:
+    def __init__(self, path=None, spacing=DEFAULT_SPACING, jitter=DEFAULT_JITTER):
+        self.path = path or data_path(SCHEDULE_FILE)
+        self.spacing = spacing
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def last_slot(self, site):
+        with self._lock:
+            row = self._conn.execute('SELECT last_slot FROM site_slots WHERE site = ?',
+                                     (normalize_domain(site),)).fetchone()
+        return row[0] if row else None
+
+    def next_slot(self, site, earliest=None, spacing=None):
+        # 사이트의 마지막 슬롯에서 spacing 이상 떨어진, earliest 이후의 첫 시각을 배정하고 저장한다.
+        site = normalize_domain(site)
+        spacing = self.spacing if spacing is None else spacing
+        earliest = earliest or time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute('SELECT last_slot FROM site_slots WHERE site = ?', (site,)).fetchone()
+            slot = earliest if row is None else max(earliest, row[0] + spacing)
+            if self.jitter and spacing:
+                slot = max(earliest, slot + random.uniform(-self.jitter, self.jitter) * spacing)
+            self._conn.execute('INSERT OR REPLACE INTO site_slots VALUES (?, ?)', (site, slot))
+        return slot
+
+    def reset(self, site=None):
+        with self._lock, self._conn:
+            if site is None:
+                self._conn.execute('DELETE FROM site_slots')
+            else:
+                self._conn.execute('DELETE FROM site_slots WHERE site = ?', (normalize_domain(site),))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def scheduled_payload(payload, slot, mode):
+    # (발행 큐에 넣을 payload, run_at) 을 돌려준다.
+    payload = dict(payload)
+    if mode == MODE_LOCAL:
+        return payload, slot
+    if slot - time.time() >= MIN_FUTURE_LEAD:
+        payload['status'] = 'future'
+        payload['date_gmt'] = to_gmt_iso(slot)
+    return payload, None
+
+
+class PublishScheduler:
+    def __init__(self, queue, planner=None, mode=MODE_FUTURE):
+        # queue 는 publish_queue.PublishQueue
+        self.queue = queue
+        self.planner = planner or SlotPlanner()
+        self.mode = mode
+
+    def schedule(self, accounts, payload, earliest=None, spacing=None, batch_id=None):
+        # 계정마다 슬롯을 배정해 큐에 넣고 [(job_id, 도메인, 슬롯), ...] 을 돌려준다.
+        # payload 는 dict 또는 계정별 payload 를 돌려주는 함수.
+        scheduled = []
+        for account in accounts:
+            slot = self.planner.next_slot(account['domain'], earliest, spacing)
+            base = payload(account) if callable(payload) else payload
+            job_payload, run_at = scheduled_payload(base, slot, self.mode)
+            job_id = self.queue.enqueue(account['domain'], account['username'], job_payload,
+                                        batch_id=batch_id, run_at=run_at)
+            scheduled.append((job_id, account['domain'], slot))
+        return scheduled
+
+
+_default_planner = None
+_default_planner_lock = threading.Lock()
+
+
+def get_slot_planner():
+    global _default_planner
+    with _default_planner_lock:
+        if _default_planner is None:
+            _default_planner = SlotPlanner()
+        return _default_planner
@@ -0,0 +1,279 @@
+import gzip
+import html
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlparse
+from wp_client import DEFAULT_PAGE_WORKERS, MAX_PER_PAGE, WordPressAPIError, get_client
+from term_resolver import TermIndex
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 사이트 전체(글, 카테고리, 태그, 미디어 정보)를 압축된 JSONL 로 내보내고 다시 가져온다 (백업/이전용).
+# 페이지는 여러 개를 동시에 받지만 한 번에 처리 중인 페이지 수를 제한하고, 받은 페이지는 바로 압축해 파일 끝에
+# 붙이므로 사이트 크기와 관계없이 메모리 사용량이 일정하다. 페이지마다 독립된 gzip 멤버(zstd 프레임)로 쓰고
+# 끝난 페이지 번호와 파일 길이를 checkpoint.json 에 남긴다. 중간에 끊기면 파일을 마지막 체크포인트 길이로 자르고
+# 남은 페이지만 이어서 받는다. 출력 구조: <출력 폴더>/<사이트>/{posts,categories,tags,media}.jsonl.gz
+# (페이지가 도착한 순서대로 쓰므로 파일 안의 순서는 ID 순이 아닐 수 있다.)
+
+CODEC_GZIP = 'gzip'
+CODEC_ZSTD = 'zstd'
+EXTENSIONS = {CODEC_GZIP: '.jsonl.gz', CODEC_ZSTD: '.jsonl.zst'}
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+CHECKPOINT_FILE = 'checkpoint.json'
+MEDIA_FIELDS = 'id,date,slug,status,title,alt_text,caption,mime_type,source_url,media_details,post'
+
+# (이름, 경로, 권장 파라미터). 권장 파라미터가 거절되면 (권한 부족 등) 기본 파라미터로 받는다.
+# 가져오기에서 카테고리 경로를 만들 수 있도록 분류를 글보다 먼저 받는다.
+RESOURCES = (
+    ('categories', 'wp/v2/categories', {'context': 'edit'}),
+    ('tags', 'wp/v2/tags', {'context': 'edit'}),
+    ('media', 'wp/v2/media', {'_fields': MEDIA_FIELDS}),
+    ('posts', 'wp/v2/posts', {'context': 'edit', 'status': 'any'}),
+)
+RESOURCE_NAMES = tuple(name for name, _, _ in RESOURCES)
+# 새 글이 뒤쪽 페이지에 붙도록 ID 순으로 받는다 (이어받기 중에 글이 늘어도 앞 페이지가 밀리지 않는다).
+ORDER_PARAMS = {'orderby': 'id', 'order': 'asc', 'per_page': MAX_PER_PAGE}
+
+
+def available_codecs():
+    return [CODEC_GZIP] + ([CODEC_ZSTD] if zstandard is not None else [])
+
+
+def site_dir_name(domain):
+    parsed = urlparse(domain)
+    return re.sub(r'[^\w.-]+', '_', (parsed.netloc + parsed.path) or domain).strip('_')
+
+
+def compress(data, codec):
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, GZIP_LEVEL)
+
+
+def find_export_file(site_dir, name):
+    for codec, extension in EXTENSIONS.items():
+        path = os.path.join(site_dir, name + extension)
+        if os.path.exists(path):
+            return path, codec
+    return None, None
+
+
+def read_jsonl(site_dir, name):
+    # 내보낸 파일을 한 줄씩 읽는다 (파일이 없으면 아무것도 없다).
+    path, codec = find_export_file(site_dir, name)
+    if path is None:
+        return
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError('zstd 로 압축된 파일을 읽으려면 zstandard 패키지가 필요합니다.')
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True)
+        stream = io.TextIOWrapper(raw, encoding='utf-8')
+    else:
+        stream = gzip.open(path, 'rt', encoding='utf-8')
+    with stream:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ExportSummary:
+    def __init__(self, domain, site_dir):
+        self.domain = domain
+        self.site_dir = site_dir
+        self.counts = {}
+        self.pages = 0
+        self.resumed = False
+        self.complete = False
+        self.elapsed = 0.0
+
+    def as_dict(self):
+        return {'domain': self.domain, 'dir': self.site_dir, 'complete': self.complete, 'resumed': self.resumed,
+                'counts': self.counts, 'pages': self.pages, 'elapsed': round(self.elapsed, 1)}
+
+
+class SiteExporter:
+    def __init__(self, client, out_dir, codec=CODEC_GZIP, workers=DEFAULT_PAGE_WORKERS, resources=RESOURCE_NAMES,
+                 restart=False):
+        if codec not in available_codecs():
+            raise ValueError(f'지원하지 않는 압축 형식입니다: {codec}')
+        self.client = client
+        self.codec = codec
+        self.workers = workers
+        self.resources = [item for item in RESOURCES if item[0] in resources]
+        self.site_dir = os.path.join(out_dir, site_dir_name(client.domain))
+        self.checkpoint_path = os.path.join(self.site_dir, CHECKPOINT_FILE)
+        os.makedirs(self.site_dir, exist_ok=True)
+        self.checkpoint = self._load_checkpoint(restart)
+
+    def _load_checkpoint(self, restart):
+        checkpoint = None
+        if not restart:
+            try:
+                with open(self.checkpoint_path, encoding='utf-8') as f:
+                    checkpoint = json.load(f)
+            except (OSError, ValueError):
+                pass
+        if not checkpoint or checkpoint.get('codec') != self.codec:
+            # 처음이거나 restart, 압축 형식이 바뀐 경우 처음부터 받는다.
+            checkpoint = {'domain': self.client.domain, 'codec': self.codec, 'resources': {}}
+        return checkpoint
+
+    def _save_checkpoint(self):
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.checkpoint, f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def run(self, on_page=None, should_cancel=None):
+        # on_page(resource, page, total_pages, items) 는 이 스레드에서 불린다.
+        started = time.perf_counter()
+        summary = ExportSummary(self.client.domain, self.site_dir)
+        summary.resumed = bool(self.checkpoint['resources'])
+        for name, path, params in self.resources:
+            if should_cancel and should_cancel():
+                break
+            self._export_resource(name, path, params, summary, on_page, should_cancel)
+        states = self.checkpoint['resources']
+        summary.counts = {name: states.get(name, {}).get('items', 0) for name, _, _ in self.resources}
+        summary.complete = all(states.get(name, {}).get('complete') for name, _, _ in self.resources)
+        summary.elapsed = time.perf_counter() - started
+        return summary
+
+    def _choose_params(self, path, preferred):
+        # (파라미터, 전체 페이지 수). 1페이지를 id 만 받아 보며 권장 파라미터가 되는지 확인한다.
+        params = {**ORDER_PARAMS, **preferred}
+        response = self.client.get(path, params={**params, '_fields': 'id', 'page': 1})
+        if response.status_code in (400, 401, 403) and preferred:
+            params = dict(ORDER_PARAMS)
+            response = self.client.get(path, params={**params, '_fields': 'id', 'page': 1})
+        if response.status_code != 200:
+            raise WordPressAPIError(response)
+        return params, int(response.headers.get('X-WP-TotalPages') or 1)
+
+    def _get_page(self, path, params, page):
+        response = self.client.get(path, params={**params, 'page': page})
+        if response.status_code == 400 and 'invalid_page_number' in response.text:
+            # 이어받는 사이 글이 지워져 페이지 수가 줄었다.
+            return []
+        if response.status_code != 200:
+            raise WordPressAPIError(response)
+        return response.json()
+
+    def _export_resource(self, name, path, preferred, summary, on_page, should_cancel):
+        states = self.checkpoint['resources']
+        state = states.get(name)
+        if state is not None and state.get('complete'):
+            return
+        if state is None:
+            state = states[name] = {'file': name + EXTENSIONS[self.codec], 'offset': 0, 'done': [], 'items': 0}
+        chosen, total_pages = self._choose_params(path, state.get('params') or preferred)
+        state['params'] = {key: value for key, value in chosen.items() if key not in ORDER_PARAMS}
+        state['total_pages'] = total_pages
+        done = set(state['done'])
+        todo = iter([page for page in range(1, total_pages + 1) if page not in done])
+        file_path = os.path.join(self.site_dir, state['file'])
+        mode = 'r+b' if os.path.exists(file_path) else 'wb'
+        with open(file_path, mode) as out, ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # 마지막 체크포인트 뒤에 쓰다 만 부분은 버린다.
+            out.truncate(state['offset'])
+            out.seek(state['offset'])
+            pending = {}
+            cancelled = False
+            while True:
+                # 받는 중이거나 쓰기를 기다리는 페이지를 워커 수의 2배까지만 둔다.
+                while not cancelled and len(pending) < self.workers * 2:
+                    page = next(todo, None)
+                    if page is None:
+                        break
+                    pending[pool.submit(self._get_page, path, chosen, page)] = page
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    page = pending.pop(future)
+                    items = future.result()
+                    self._write_page(out, state, page, items)
+                    summary.pages += 1
+                    if on_page:
+                        on_page(name, page, total_pages, len(items))
+                if should_cancel and should_cancel() and not cancelled:
+                    # 이미 요청한 페이지는 받아서 쓰고 멈춘다.
+                    cancelled = True
+            if not cancelled:
+                state['complete'] = True
+                state['done'] = []
+                self._save_checkpoint()
+
+    def _write_page(self, out, state, page, items):
+        if items:
+            data = ''.join(json.dumps(item, ensure_ascii=False) + '\n' for item in items).encode('utf-8')
+            out.write(compress(data, self.codec))
+            out.flush()
+            os.fsync(out.fileno())
+        state['offset'] = out.tell()
+        state['done'].append(page)
+        state['items'] += len(items)
+        self._save_checkpoint()
+
+
+def export_sites(accounts, out_dir, codec=CODEC_GZIP, workers=DEFAULT_PAGE_WORKERS, site_workers=4,
+                 resources=RESOURCE_NAMES, restart=False, on_page=None, on_site=None, should_cancel=None):
+    # 여러 사이트를 동시에 내보낸다. on_page(domain, resource, page, total_pages, items) 와
+    # on_site(domain, ExportSummary 또는 예외) 는 워커 스레드에서 불린다. {도메인: 요약 또는 예외}
+    results = {}
+
+    def export(account):
+        client = get_client(account['domain'], account['username'], account['password'])
+        exporter = SiteExporter(client, out_dir, codec, workers, resources, restart)
+        page_callback = None
+        if on_page:
+            def page_callback(resource, page, total_pages, items):
+                on_page(account['domain'], resource, page, total_pages, items)
+        try:
+            result = exporter.run(page_callback, should_cancel)
+        except Exception as e:
+            result = e
+        results[account['domain']] = result
+        if on_site:
+            on_site(account['domain'], result)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(site_workers, len(accounts))),
+                            thread_name_prefix='wpbot-export') as pool:
+        list(pool.map(export, accounts))
+    return results
+
+
+def _text(value):
+    # context=edit 이면 {'raw', 'rendered'}, 아니면 {'rendered'}
+    if isinstance(value, dict):
+        return value.get('raw', value.get('rendered', ''))
+    return value or ''
+
+
+def iter_export_rows(site_dir):
+    # 내보낸 글을 wpbot_core.PostSpec.from_row 가 받는 행으로 바꿔 (번호, dict) 로 돌려준다.
+    # 카테고리는 "부모/자식" 경로, 태그는 이름으로 넘기므로 ID 가 다른 사이트에서도 같은 분류에 들어간다.
+    # 대표 이미지(featured_media) 는 원래 사이트의 ID 이므로 넘기지 않는다 (본문 이미지는 원래 주소 그대로).
+    categories = TermIndex(list(read_jsonl(site_dir, 'categories')))
+    tags = {tag['id']: html.unescape(tag['name']) for tag in read_jsonl(site_dir, 'tags')}
+    for number, post in enumerate(read_jsonl(site_dir, 'posts'), 1):
+        title = _text(post.get('title'))
+        row = {
+            'title': title if 'raw' in (post.get('title') or {}) else html.unescape(title),
+            'content': _text(post.get('content')),
+            'excerpt': _text(post.get('excerpt')),
+            'status': post.get('status'),
+            'slug': post.get('slug'),
+            'date': post.get('date'),
+            'categories': [categories.path_of(i) for i in post.get('categories', []) if i in categories.by_id],
+            'tags': [tags[i] for i in post.get('tags', []) if i in tags],
+        }
+        yield number, row
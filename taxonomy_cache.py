@@ -0,0 +1,220 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app_paths import data_path
+from background_executor import TaskCancelled
+from wp_client import (CATEGORY_FIELDS, DEFAULT_PAGE_WORKERS, MAX_PER_PAGE, TAG_FIELDS, WordPressAPIError,
+                       normalize_domain)
+
+# 도메인별 카테고리/태그 목록을 디스크에 저장해 두고, 시작/계정 전환 시 바로 보여준다.
+# TTL 이 지나면 페이지마다 저장해 둔 ETag/Last-Modified 로 모든 페이지에 조건부 요청을 보내
+# 바뀐 페이지만 다시 받는다 (1페이지만 확인하면 2페이지 이후의 변경을 놓친다).
+# 전체 크기가 max_bytes 를 넘으면 가장 오래 사용하지 않은 (도메인, 분류) 항목부터 지운다.
+
+DEFAULT_TTL = 6 * 3600
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+CACHE_FILE = 'taxonomy_cache.json'
+
+TAXONOMY_FIELDS = {
+    'categories': CATEGORY_FIELDS,
+    'tags': TAG_FIELDS,
+}
+
+
+class TaxonomyCache:
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or data_path(CACHE_FILE)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._load()
+
+    def _key(self, domain, taxonomy):
+        return f'{normalize_domain(domain)}|{taxonomy}'
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # 파일에는 최근 사용 순서대로 저장되어 있다.
+        for key, entry in data.get('entries', []):
+            self._entries[key] = entry
+
+    def save(self):
+        # 여러 스레드가 동시에 저장하면 같은 임시 파일을 덮어쓰므로 저장은 한 번에 하나씩 한다.
+        with self._save_lock:
+            with self._lock:
+                data = {'entries': list(self._entries.items())}
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def entry(self, domain, taxonomy):
+        with self._lock:
+            key = self._key(domain, taxonomy)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def get(self, domain, taxonomy):
+        entry = self.entry(domain, taxonomy)
+        return entry['items'] if entry is not None else None
+
+    def is_fresh(self, entry):
+        return entry is not None and time.time() - entry['fetched_at'] < self.ttl
+
+    def put(self, domain, taxonomy, items, pages=None):
+        # pages: 페이지마다 {'etag', 'last_modified', 'count'}. 없으면 다음 재검증 때 전체를 다시 받는다.
+        entry = {
+            'items': items,
+            'pages': pages,
+            'fetched_at': time.time(),
+            'size': len(json.dumps(items, ensure_ascii=False).encode('utf-8')),
+        }
+        with self._lock:
+            key = self._key(domain, taxonomy)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+        self.save()
+        return entry
+
+    def touch(self, domain, taxonomy):
+        # 모든 페이지가 304: 내용은 그대로이고 유효 기간만 연장한다.
+        with self._lock:
+            entry = self._entries.get(self._key(domain, taxonomy))
+            if entry is not None:
+                entry['fetched_at'] = time.time()
+        self.save()
+        return entry
+
+    def invalidate(self, domain=None):
+        with self._lock:
+            if domain is None:
+                self._entries.clear()
+            else:
+                prefix = normalize_domain(domain) + '|'
+                for key in [k for k in self._entries if k.startswith(prefix)]:
+                    del self._entries[key]
+        self.save()
+
+    def _evict(self):
+        total = sum(entry['size'] for entry in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            total -= evicted['size']
+
+
+def validator_headers(page):
+    headers = {}
+    if page.get('etag'):
+        headers['If-None-Match'] = page['etag']
+    if page.get('last_modified'):
+        headers['If-Modified-Since'] = page['last_modified']
+    return headers
+
+
+def page_validators(response, count):
+    return {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified'),
+            'count': count}
+
+
+def _total_pages(response):
+    value = response.headers.get('X-WP-TotalPages')
+    return int(value) if value else None
+
+
+def _revalidate(client, path, params, entry, should_cancel=None):
+    # 저장된 페이지를 모두 각자의 검증값으로 동시에 확인한다. (items, pages, 바뀌었는지) 를 돌려주고,
+    # 페이지 수가 달라졌으면 None 을 돌려준다 (304 페이지를 그대로 이어 붙일 수 없으므로 전체를 다시 받는다).
+    pages = entry['pages']
+
+    def get_page(page):
+        return client.get(path, params={**params, 'page': page}, headers=validator_headers(pages[page - 1]))
+
+    responses = {}
+    with ThreadPoolExecutor(max_workers=min(DEFAULT_PAGE_WORKERS, len(pages))) as pool:
+        futures = {pool.submit(get_page, page): page for page in range(1, len(pages) + 1)}
+        for future in as_completed(futures):
+            if should_cancel and should_cancel():
+                for pending in futures:
+                    pending.cancel()
+                raise TaskCancelled()
+            responses[futures[future]] = future.result()
+    items, validators = [], []
+    changed = False
+    known_total = False
+    offset = 0
+    for page, cached in enumerate(pages, 1):
+        response = responses[page]
+        if response.status_code == 400 and page > 1:
+            # 항목이 줄어 페이지가 없어졌다.
+            return None
+        if response.status_code not in (200, 304):
+            raise WordPressAPIError(response)
+        total = _total_pages(response)
+        if total is not None:
+            if total != len(pages):
+                return None
+            known_total = True
+        if response.status_code == 304:
+            items.extend(entry['items'][offset:offset + cached['count']])
+            validators.append(cached)
+        else:
+            page_items = response.json()
+            items.extend(page_items)
+            validators.append(page_validators(response, len(page_items)))
+            changed = True
+        offset += cached['count']
+    if not known_total and validators[-1]['count'] >= params['per_page']:
+        # 304 응답에 X-WP-TotalPages 가 없으면 마지막 페이지가 가득 찼을 때 다음 페이지가 생겼는지 확인한다.
+        response = client.get(path, params={**params, 'page': len(pages) + 1, '_fields': 'id'})
+        if response.status_code == 200 and response.json():
+            return None
+    return items, validators, changed
+
+
+def load_terms(client, taxonomy, cache, refresh=False, on_page=None, should_cancel=None):
+    # (items, source) 를 돌려준다. source 는 'cache' / 'revalidated' / 'network'.
+    # refresh=True 이면 TTL 과 관계없이 서버에 확인한다 (변경이 없으면 모든 페이지가 304 로 끝난다).
+    entry = cache.entry(client.domain, taxonomy)
+    if not refresh and cache.is_fresh(entry):
+        return entry['items'], 'cache'
+    path = f'wp/v2/{taxonomy}'
+    params = {'_fields': TAXONOMY_FIELDS[taxonomy], 'per_page': MAX_PER_PAGE}
+    if entry is not None and entry.get('pages'):
+        result = _revalidate(client, path, params, entry, should_cancel)
+        if result is not None:
+            items, pages, changed = result
+            if not changed:
+                cache.touch(client.domain, taxonomy)
+                return entry['items'], 'revalidated'
+            cache.put(client.domain, taxonomy, items, pages)
+            return items, 'network'
+    items, responses = client.fetch_pages(path, params=params, on_page=on_page, should_cancel=should_cancel)
+    # 마지막 페이지를 뺀 나머지는 per_page 개씩 차 있다.
+    counts = [params['per_page']] * (len(responses) - 1) + [len(items) - params['per_page'] * (len(responses) - 1)]
+    pages = [page_validators(response, count) for response, count in zip(responses, counts)]
+    cache.put(client.domain, taxonomy, items, pages)
+    return items, 'network'
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_taxonomy_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TaxonomyCache()
+        return _default_cache
@@ -0,0 +1,177 @@
+import html
+import threading
+from wp_client import normalize_domain
+from taxonomy_cache import get_taxonomy_cache, load_terms
+from wp_batch import send_requests
+
+# 카테고리 경로("뉴스/IT/AI") 와 태그 이름을 ID 로 바꾼다.
+# 사이트마다 (부모 ID, 이름) -> ID 색인을 한 번만 만들어 두므로 같은 이름의 하위 카테고리가 서로 섞이지 않는다.
+# 경로가 아닌 이름 하나는 최상위 카테고리를 먼저 찾고, 없으면 같은 이름의 하위 카테고리를 쓴다 (기존 동작).
+# ensure() 는 여러 글에 필요한 카테고리/태그 중 없는 것을 중복 없이 모아, 깊이별로 한 번씩(batch/v1) 만든다.
+
+PATH_SEPARATOR = '/'
+HIERARCHICAL = {'categories': True, 'tags': False}
+
+
+def term_key(name):
+    # 워드프레스는 이름을 HTML 이스케이프해서 돌려준다 ("뉴스 &amp; IT").
+    return ' '.join(html.unescape(name).split()).casefold()
+
+
+def split_path(path):
+    return [part.strip() for part in path.split(PATH_SEPARATOR) if part.strip()]
+
+
+class TermIndex:
+    def __init__(self, items, hierarchical=True):
+        self.items = items
+        self.hierarchical = hierarchical
+        self.by_id = {}
+        self.children = {}
+        self.by_name = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        parent = item.get('parent', 0) if self.hierarchical else 0
+        key = term_key(item['name'])
+        self.by_id[item['id']] = item
+        self.children.setdefault((parent, key), item['id'])
+        self.by_name.setdefault(key, []).append(item['id'])
+
+    def parts(self, name):
+        return split_path(name) if self.hierarchical else [name.strip()]
+
+    def walk(self, parts):
+        # (찾은 깊이, 마지막으로 찾은 ID). 깊이가 len(parts) 이면 전부 있다.
+        parent = 0
+        for depth, part in enumerate(parts):
+            found = self.children.get((parent, term_key(part)))
+            if found is None:
+                return depth, parent
+            parent = found
+        return len(parts), parent
+
+    def lookup(self, name):
+        parts = self.parts(name)
+        if not parts:
+            return None
+        depth, term_id = self.walk(parts)
+        if depth == len(parts):
+            return term_id
+        if len(parts) == 1:
+            ids = self.by_name.get(term_key(parts[0]))
+            return ids[0] if ids else None
+        return None
+
+    def path_of(self, term_id):
+        names = []
+        seen = set()
+        while term_id and term_id in self.by_id and term_id not in seen:
+            seen.add(term_id)
+            item = self.by_id[term_id]
+            names.append(html.unescape(item['name']))
+            term_id = item.get('parent', 0) if self.hierarchical else 0
+        return PATH_SEPARATOR.join(reversed(names))
+
+
+class TermResolver:
+    def __init__(self, cache=None):
+        self.cache = cache or get_taxonomy_cache()
+        self._indexes = {}
+        self._lock = threading.Lock()
+        self._site_locks = {}
+
+    def _site_lock(self, key):
+        with self._lock:
+            return self._site_locks.setdefault(key, threading.Lock())
+
+    def _index(self, client, taxonomy):
+        # 캐시 목록이 바뀌었을 때만 (새로고침/만료 후 재조회) 색인을 다시 만든다.
+        key = (normalize_domain(client.domain), taxonomy)
+        items, _ = load_terms(client, taxonomy, self.cache)
+        index = self._indexes.get(key)
+        if index is None or index.items is not items:
+            index = self._indexes[key] = TermIndex(items, HIERARCHICAL[taxonomy])
+        return index
+
+    def index(self, client, taxonomy='categories'):
+        with self._site_lock((normalize_domain(client.domain), taxonomy)):
+            return self._index(client, taxonomy)
+
+    def resolve(self, client, names, taxonomy='categories'):
+        # (찾은 ID 목록, 사이트에 없는 이름 목록)
+        index = self.index(client, taxonomy)
+        ids, missing = [], []
+        for name in names:
+            term_id = index.lookup(name)
+            if term_id is None:
+                missing.append(name)
+            elif term_id not in ids:
+                ids.append(term_id)
+        return ids, missing
+
+    def ensure(self, client, names, taxonomy='categories', on_request=None):
+        # 없는 카테고리/태그를 만든다. (만든 항목 목록, {이름: 오류}) 를 돌려준다.
+        # 깊이마다 한 번씩 보내므로 "A/B/C" 처럼 여러 단계가 없어도 요청은 최대 깊이만큼만 나간다.
+        if not names:
+            return [], {}
+        with self._site_lock((normalize_domain(client.domain), taxonomy)):
+            index = self._index(client, taxonomy)
+            paths = {tuple(index.parts(name)): name for name in names if index.parts(name)}
+            created, errors = [], {}
+            while True:
+                pending = {}
+                for parts, name in paths.items():
+                    if name in errors:
+                        continue
+                    depth, parent = index.walk(parts)
+                    if depth == len(parts) or (len(parts) == 1 and index.lookup(name) is not None):
+                        continue
+                    pending.setdefault((parent, term_key(parts[depth])), (parts[depth], parent, []))[2].append(name)
+                if not pending:
+                    break
+                requests_list = []
+                for term_name, parent, _ in pending.values():
+                    body = {'name': term_name, 'parent': parent} if index.hierarchical else {'name': term_name}
+                    requests_list.append(('POST', f'/wp/v2/{taxonomy}', body))
+                responses = send_requests(client, requests_list, on_request=on_request)
+                for (term_name, parent, wanted), response in zip(pending.values(), responses):
+                    body = response.body if isinstance(response.body, dict) else {}
+                    if response.ok:
+                        item = {'id': body['id'], 'name': body.get('name', term_name), 'parent': parent}
+                    elif body.get('code') == 'term_exists':
+                        # 다른 작업이 먼저 만들었거나 캐시가 오래된 경우
+                        item = {'id': body['data']['term_id'], 'name': term_name, 'parent': parent}
+                    else:
+                        for name in wanted:
+                            errors[name] = response.error_text
+                        continue
+                    if not index.hierarchical:
+                        item.pop('parent')
+                    index.add(item)
+                    # 서버가 이름을 바꿔 저장해도 (공백/특수문자 정리) 요청한 이름으로 다시 찾을 수 있게 한다.
+                    index.children.setdefault((parent, term_key(term_name)), item['id'])
+                    created.append(item)
+            if created:
+                self._store(client, taxonomy, index, created)
+            return created, errors
+
+    def _store(self, client, taxonomy, index, created):
+        # 캐시 목록에 새 항목을 붙인다. 페이지 구성이 서버와 달라졌으므로 페이지 검증값은 버리고,
+        # 다음 재검증 때 전체를 다시 받는다.
+        items = list(index.items) + created
+        entry = self.cache.put(client.domain, taxonomy, items)
+        index.items = entry['items']
+
+
+_default_resolver = None
+_default_resolver_lock = threading.Lock()
+
+
+def get_term_resolver():
+    global _default_resolver
+    with _default_resolver_lock:
+        if _default_resolver is None:
+            _default_resolver = TermResolver()
+        return _default_resolver
@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# 캐시/큐 파일이 사용자 디렉터리(~/.wpbot) 에 생기지 않게 한다.
+os.environ['WPBOT_HOME'] = tempfile.mkdtemp(prefix='wpbot-tests-')
+
+from fake_wp_server import FakeConfig, FakeWordPressServer  # noqa: E402
+
+
+@pytest.fixture
+def fake_server():
+    # fake_server(**FakeConfig 인자) -> 시작된 서버. 서버마다 포트(도메인) 가 달라 도메인별 캐시가 섞이지 않는다.
+    servers = []
+
+    def start(**options):
+        server = FakeWordPressServer(FakeConfig(**options)).start()
+        servers.append(server)
+        return server
+
+    yield start
+    # shutdown() 은 서버마다 최대 0.5초 기다리므로 한꺼번에 멈춘다.
+    if servers:
+        with ThreadPoolExecutor(max_workers=len(servers)) as pool:
+            list(pool.map(FakeWordPressServer.stop, servers))
+
+
+@pytest.fixture
+def account_for():
+    def account(server):
+        config = server.state.config
+        return {'domain': server.url, 'username': config.username, 'password': config.password}
+    return account
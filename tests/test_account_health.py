@@ -0,0 +1,29 @@
+import time
+
+from account_health import STATUS_OK, STATUS_TIMEOUT, sweep
+
+
+def test_hung_host_is_cut_off_at_deadline(fake_server, account_for):
+    fast = fake_server()
+    slow = fake_server(latency_ms=200)
+    hung = fake_server(latency_ms=5000)
+    arrived = []
+    started = time.perf_counter()
+    results = sweep([account_for(server) for server in (fast, hung, slow)], deadline=1.0,
+                    on_result=lambda index, result: arrived.append(index))
+    elapsed = time.perf_counter() - started
+    assert 1.0 <= elapsed < 1.5
+    assert [result.status for result in results] == [STATUS_OK, STATUS_TIMEOUT, STATUS_OK]
+    # 응답한 사이트는 도착한 순서대로, 시간 초과는 마지막에 전달된다.
+    assert arrived == [0, 2, 1]
+
+
+def test_many_sites_finish_in_about_the_slowest_host_time(fake_server, account_for):
+    servers = [fake_server(latency_ms=100 + 10 * i) for i in range(20)]
+    started = time.perf_counter()
+    results = sweep([account_for(server) for server in servers], deadline=5.0)
+    elapsed = time.perf_counter() - started
+    slowest = max(result.elapsed for result in results)
+    assert all(result.status == STATUS_OK for result in results)
+    # 하나씩 점검하면 20곳 * (요청 2번 * 약 0.2초) = 8초 가까이 걸린다.
+    assert elapsed < slowest + 0.5
@@ -0,0 +1,72 @@
+import random
+import time
+
+from dedup_index import DEFAULT_MAX_DISTANCE, DedupIndex, fingerprint_post, hamming
+from wpbot_core import client_for
+
+ARTICLE = ('워드프레스 자동 발행 도구는 여러 사이트에 글을 나누어 올릴 때 사용한다. '
+           '각 사이트의 카테고리와 태그를 미리 받아 두고, 글마다 알맞은 분류를 골라 붙인다. '
+           '발행이 실패하면 작업 큐에 남겨 두었다가 정해진 간격으로 다시 시도한다. '
+           '같은 글이 두 번 올라가지 않도록 멱등 키와 본문 지문을 함께 확인한다. '
+           '사이트가 느리거나 요청을 제한하면 도메인별로 속도를 낮추고 잠시 쉬었다가 이어서 보낸다.')
+EDITED = ARTICLE.replace('정해진 간격으로 다시 시도한다', '조금씩 늘어나는 간격으로 다시 시도한다')
+UNRELATED = ('오늘은 제철 채소로 만드는 간단한 저녁 반찬을 소개한다. 애호박과 두부를 깍둑썰기 해서 '
+             '들기름에 볶다가 간장과 다진 마늘을 넣고 약한 불에서 졸인다. 마지막에 쪽파와 깨를 뿌리면 '
+             '밥 한 그릇이 금방 비워진다. 남은 재료는 된장찌개에 넣어도 잘 어울린다.')
+
+
+def test_threshold_boundary(tmp_path):
+    index = DedupIndex(str(tmp_path / 'dedup.sqlite3'))
+    stored = random.getrandbits(64)
+    index.add_fingerprints('https://a.example', [(1, stored)])
+    at_limit = stored ^ ((1 << DEFAULT_MAX_DISTANCE) - 1)
+    beyond = stored ^ ((1 << (DEFAULT_MAX_DISTANCE + 1)) - 1)
+    assert index.find_similar('https://a.example', at_limit).distance == DEFAULT_MAX_DISTANCE
+    assert index.find_similar('https://a.example', beyond) is None
+    assert index.find_similar('https://b.example', stored) is None
+    index.close()
+
+
+def test_edited_copy_is_a_near_duplicate(tmp_path):
+    index = DedupIndex(str(tmp_path / 'dedup.sqlite3'))
+    index.add('https://a.example', 7, '자동 발행 도구', ARTICLE)
+    assert hamming(fingerprint_post('자동 발행 도구', ARTICLE),
+                   fingerprint_post('자동 발행 도구', EDITED)) <= DEFAULT_MAX_DISTANCE
+    match = index.check('https://a.example', '자동 발행 도구', EDITED)
+    assert match is not None and match.post_id == 7
+    assert index.check('https://a.example', '저녁 반찬', UNRELATED) is None
+    index.close()
+
+
+def test_lookup_among_100k_posts_takes_milliseconds(tmp_path):
+    index = DedupIndex(str(tmp_path / 'dedup.sqlite3'))
+    rng = random.Random(1)
+    index.add_fingerprints('https://a.example', [(post_id, rng.getrandbits(64)) for post_id in range(1, 100001)])
+    probes = [rng.getrandbits(64) for _ in range(50)]
+    index.find_similar('https://a.example', probes[0])
+    started = time.perf_counter()
+    for probe in probes:
+        index.find_similar('https://a.example', probe)
+    per_check = (time.perf_counter() - started) / len(probes)
+    # numpy 로는 1ms 안쪽, int.bit_count 로도 20ms 정도다.
+    assert per_check < 0.05, f'{per_check * 1000:.1f}ms per check'
+    index.close()
+
+
+def test_first_sync_runs_in_background(tmp_path, fake_server, account_for):
+    server = fake_server(latency_ms=200)
+    server.state.posts.append({'id': 1, 'title': {'rendered': '자동 발행 도구'}, 'content': {'rendered': ARTICLE},
+                               'slug': 'post-1', 'status': 'publish', 'categories': [], 'modified': '2026-01-01T00:00:00'})
+    index = DedupIndex(str(tmp_path / 'dedup.sqlite3'))
+    client = client_for(account_for(server))
+
+    started = time.perf_counter()
+    thread = index.sync_in_background(client)
+    assert time.perf_counter() - started < 0.1
+    assert index.sync_in_background(client) is thread
+    thread.join(10)
+    assert index.count(server.url) == 1
+    assert index.check(server.url, '자동 발행 도구', EDITED).post_id == 1
+    # 방금 동기화했으므로 다시 받지 않는다.
+    assert index.sync_in_background(client) is None
+    index.close()
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from gemini_stream import stream_generate
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class Usage:
+    total_token_count = 42
+
+
+class FakeStream:
+    # 조각을 내보낸 뒤 release 가 설정될 때까지 (또는 close() 될 때까지) 멈춰 있는 응답
+    def __init__(self, texts, block=False):
+        self.texts = texts
+        self.release = threading.Event()
+        self.closed = threading.Event()
+        self.usage_metadata = Usage()
+        if not block:
+            self.release.set()
+
+    def __iter__(self):
+        for text in self.texts:
+            yield Chunk(text)
+        self.release.wait(10)
+
+    def close(self):
+        self.closed.set()
+        self.release.set()
+
+
+class FakeModel:
+    model_name = 'models/fake-model'
+
+    def __init__(self, response):
+        self.response = response
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        return self.response
+
+
+def test_stream_delivers_chunks_in_order():
+    received = []
+    result = stream_generate(FakeModel(FakeStream(['제목\n', '본문 ', '끝'])), '주제', received.append)
+    assert received == ['제목\n', '본문 ', '끝']
+    assert result.text == '제목\n본문 끝'
+    assert result.tokens == 42
+    assert not result.cancelled
+
+
+def test_cancel_interrupts_a_stalled_stream_and_closes_it():
+    response = FakeStream(['첫 조각'], block=True)
+    received = []
+    cancel_at = time.perf_counter() + 0.3
+    started = time.perf_counter()
+    result = stream_generate(FakeModel(response), '주제', received.append,
+                             should_cancel=lambda: time.perf_counter() >= cancel_at)
+    assert time.perf_counter() - started < 2
+    assert result.cancelled
+    assert received == ['첫 조각']
+    assert response.closed.wait(2)
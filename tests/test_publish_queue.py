@@ -0,0 +1,117 @@
+import threading
+import time
+from urllib.parse import quote
+
+import publish_queue
+from publish_queue import (BACKOFF_BASE, BACKOFF_MAX, KEY_SUFFIX_LENGTH, MAX_SLUG_BYTES, STATE_DONE, STATE_PENDING,
+                           PublishQueue, PublishWorker, backoff_delay, idempotent_slug, make_idempotency_key)
+
+KOREAN_TITLE = '워드프레스자동발행테스트' * 5
+
+
+def payload(title, **extra):
+    return {'title': title, 'content': '본문입니다.', 'categories': [], 'dedup': False, **extra}
+
+
+def run_due(queue, worker):
+    # 재시도 대기 시간을 기다리지 않고 지금 처리할 수 있는 것처럼 한 번 처리한다.
+    events = []
+    for job in queue.due_jobs(10, now=time.time() + BACKOFF_MAX * 2):
+        assert queue.claim(job)
+        job.attempts += 1
+        worker._try_start(job.domain)
+        worker.process([job], lambda job, event: events.append(event))
+    return events
+
+
+def test_idempotent_slug_keeps_key_within_encoded_limit():
+    key = make_idempotency_key('https://example.com', 'admin', payload(KOREAN_TITLE))
+    slug = idempotent_slug(KOREAN_TITLE, key)
+    assert slug.endswith('-' + key[:KEY_SUFFIX_LENGTH])
+    assert len(quote(slug, safe='-_')) <= MAX_SLUG_BYTES
+
+
+def test_payload_slug_also_gets_key():
+    key = make_idempotency_key('https://example.com', 'admin', payload('제목', slug='my-post'))
+    assert idempotent_slug('my-post', key) == 'my-post-' + key[:KEY_SUFFIX_LENGTH]
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    for attempts in (1, 2, 5):
+        base = BACKOFF_BASE * 2 ** (attempts - 1)
+        delays = [backoff_delay(attempts) for _ in range(200)]
+        assert all(base * 0.5 <= delay <= base * 1.5 for delay in delays)
+        # 지터가 없으면 동시에 실패한 작업이 같은 순간에 다시 몰린다.
+        assert len({round(delay, 6) for delay in delays}) > 100
+    assert all(backoff_delay(40) <= BACKOFF_MAX * 1.5 for _ in range(50))
+
+
+def test_recover_resumes_jobs_left_running(tmp_path, fake_server, account_for):
+    server = fake_server()
+    path = str(tmp_path / 'queue.sqlite3')
+    queue = PublishQueue(path)
+    job_id = queue.enqueue(server.url, 'admin', payload('중단된 작업'))
+    assert queue.claim(queue.get(job_id))
+    queue.close()
+
+    # 앱이 다시 시작된 것처럼 새로 연다. run() 이 recover() 로 running 작업을 되살려 발행한다.
+    queue = PublishQueue(path)
+    worker = PublishWorker(queue, lambda domain, username: account_for(server))
+    done = threading.Event()
+    thread = threading.Thread(target=worker.run,
+                              kwargs={'on_event': lambda job, event: event[0] == 'done' and done.set()})
+    thread.start()
+    try:
+        assert done.wait(10)
+    finally:
+        worker.stop()
+        thread.join(10)
+    job = queue.get(job_id)
+    assert job.state == STATE_DONE
+    assert job.attempts == 2
+    assert len(server.state.posts) == 1
+    queue.close()
+
+
+def test_lost_response_is_not_published_twice(fake_server, account_for):
+    # 서버는 글을 만들었지만 응답이 끊겼다. 재시도는 키로 기존 글을 찾아 완료 처리해야 한다.
+    server = fake_server(drop_responses=1)
+    queue = PublishQueue(':memory:')
+    worker = PublishWorker(queue, lambda domain, username: account_for(server))
+    job_id = queue.enqueue(server.url, 'admin', payload('Lost response'))
+
+    first = run_due(queue, worker)
+    assert first[0][0] == 'retry'
+    assert queue.get(job_id).state == STATE_PENDING
+    second = run_due(queue, worker)
+    assert second == [('done', 1, True)]
+    assert len(server.state.posts) == 1
+    queue.close()
+
+
+def test_korean_title_retry_finds_truncated_slug(fake_server, account_for):
+    server = fake_server(drop_responses=1)
+    queue = PublishQueue(':memory:')
+    worker = PublishWorker(queue, lambda domain, username: account_for(server))
+    job_id = queue.enqueue(server.url, 'admin', payload(KOREAN_TITLE))
+
+    assert run_due(queue, worker)[0][0] == 'retry'
+    assert run_due(queue, worker) == [('done', 1, True)]
+    post = server.state.posts[0]
+    assert len(post['slug']) <= MAX_SLUG_BYTES
+    assert post['slug'].endswith(queue.get(job_id).idempotency_key[:KEY_SUFFIX_LENGTH])
+    assert len(server.state.posts) == 1
+    queue.close()
+
+
+def test_retry_matches_renamed_slug(fake_server, account_for):
+    # 같은 슬러그가 이미 있어 서버가 -2 를 붙인 경우에도 키로 알아본다.
+    server = fake_server()
+    job = publish_queue.Job((1, 'a' * 64, None, server.url, 'admin', '{"title": "x"}', STATE_PENDING, 2,
+                             0, None, None, 0, 0))
+    client = publish_queue.client_for(account_for(server))
+    slug = publish_queue._job_slug(job)
+    client.post('wp/v2/posts', json={'title': 'other', 'slug': slug})
+    client.post('wp/v2/posts', json={'title': 'x', 'slug': slug})
+    assert server.state.posts[1]['slug'] == slug + '-2'
+    assert publish_queue.find_existing_posts(client, [slug + '-2']) == {'a' * KEY_SUFFIX_LENGTH: 2}
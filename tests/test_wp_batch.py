@@ -0,0 +1,49 @@
+from wp_batch import MAX_BATCH_SIZE, create_posts, known_batch_support
+from wpbot_core import client_for
+
+
+def posts(count):
+    return [{'title': f'글 {i}', 'content': '본문', 'status': 'draft'} for i in range(count)]
+
+
+def test_batch_maps_each_sub_response_in_order(fake_server, account_for):
+    server = fake_server()
+    data = posts(3)
+    data[1] = {'content': '제목 없는 글'}
+    requests_sent = []
+    results = create_posts(client_for(account_for(server)), data, on_request=lambda: requests_sent.append(1))
+    assert len(requests_sent) == 1
+    assert [result.status for result in results] == [201, 400, 201]
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[1].error_text.startswith('400: ')
+    assert [result.body['title']['raw'] for result in (results[0], results[2])] == ['글 0', '글 2']
+
+
+def test_batch_splits_at_max_size(fake_server, account_for):
+    server = fake_server()
+    requests_sent = []
+    results = create_posts(client_for(account_for(server)), posts(MAX_BATCH_SIZE + 5),
+                           on_request=lambda: requests_sent.append(1))
+    assert len(requests_sent) == 2
+    assert all(result.status == 201 for result in results)
+    assert [result.body['id'] for result in results] == list(range(1, MAX_BATCH_SIZE + 6))
+
+
+def test_sites_without_batch_get_single_posts(fake_server, account_for):
+    server = fake_server(batch=False)
+    requests_sent = []
+    results = create_posts(client_for(account_for(server)), posts(4), on_request=lambda: requests_sent.append(1))
+    assert len(requests_sent) == 4
+    assert all(result.status == 201 for result in results)
+    assert known_batch_support(server.url) is False
+
+
+def test_rejected_batch_falls_back_to_single_posts(fake_server, account_for):
+    # 최대 크기를 줄인 사이트는 batch 요청 자체를 400 으로 거절한다. 그 묶음부터 하나씩 보낸다.
+    server = fake_server(max_batch_size=10)
+    requests_sent = []
+    results = create_posts(client_for(account_for(server)), posts(12), on_request=lambda: requests_sent.append(1))
+    assert len(requests_sent) == 1 + 12
+    assert all(result.status == 201 for result in results)
+    assert len(server.state.posts) == 12
+    assert known_batch_support(server.url) is False
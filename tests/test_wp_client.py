@@ -0,0 +1,142 @@
+import time
+
+import pytest
+import requests
+
+from rate_limit import (CLOSED, HALF_OPEN, MAX_INLINE_WAIT, MIN_LIMIT, OPEN, CircuitOpenError, DomainLimiter,
+                        get_rate_limiter)
+from wp_client import WordPressClient
+
+
+def client_for_server(server):
+    config = server.state.config
+    return WordPressClient(server.url, config.username, config.password)
+
+
+def test_get_waits_out_short_retry_after_and_retries(fake_server):
+    server = fake_server(rate_limit=1, retry_after=1)
+    client = client_for_server(server)
+    assert client.get('wp/v2/users/me').status_code == 200
+    started = time.perf_counter()
+    assert client.get('wp/v2/users/me').status_code == 200
+    assert time.perf_counter() - started >= 0.9
+    assert server.state.snapshot()['status_counts'] == {200: 2, 429: 1}
+
+
+def test_post_is_not_resent_on_429(fake_server):
+    server = fake_server(rate_limit=1, retry_after=1)
+    client = client_for_server(server)
+    client.get('wp/v2/users/me')
+    response = client.post('wp/v2/posts', json={'title': '한 번만'})
+    assert response.status_code == 429
+    assert server.state.snapshot()['requests'] == 2
+
+
+def test_post_is_not_resent_on_503(fake_server):
+    # 503 은 서버가 글을 만든 뒤에도 올 수 있다. 짧은 Retry-After 가 있어도 POST 는 다시 보내지 않는다.
+    server = fake_server(error_rate=1.0, error_retry_after=1)
+    client = client_for_server(server)
+    assert client.post('wp/v2/posts', json={'title': '한 번만'}).status_code == 503
+    assert server.state.snapshot()['requests'] == 1
+    # GET 은 같은 응답에 기다렸다가 다시 보낸다 (THROTTLE_RETRIES 번까지).
+    assert client.get('wp/v2/users/me').status_code == 503
+    assert server.state.snapshot()['requests'] == 4
+
+
+def test_long_retry_after_is_not_waited_inline(fake_server):
+    server = fake_server(rate_limit=1, retry_after=int(MAX_INLINE_WAIT) + 20)
+    client = client_for_server(server)
+    client.get('wp/v2/users/me')
+    started = time.perf_counter()
+    assert client.get('wp/v2/users/me').status_code == 429
+    assert time.perf_counter() - started < 1
+    # 이후 요청은 보내지 않고 재개 시각과 함께 바로 실패한다.
+    with pytest.raises(CircuitOpenError) as raised:
+        client.get('wp/v2/users/me')
+    assert raised.value.retry_at - time.time() > MAX_INLINE_WAIT
+    assert server.state.snapshot()['requests'] == 2
+
+
+def test_429_halves_the_domain_limit(fake_server):
+    server = fake_server(rate_limit=1, retry_after=1)
+    client = client_for_server(server)
+    limiter = get_rate_limiter().for_domain(client.domain)
+    client.get('wp/v2/users/me')
+    before = limiter.limit
+    client.get('wp/v2/users/me')
+    # 429 에 절반으로 줄고, 기다렸다가 다시 보낸 요청이 성공해 조금 늘어난다.
+    halved = before / 2
+    assert limiter.limit == pytest.approx(halved + 1.0 / halved)
+    assert limiter.in_flight == 0
+
+
+def test_repeated_5xx_opens_the_circuit(fake_server):
+    server = fake_server(error_rate=1.0)
+    client = client_for_server(server)
+    limiter = get_rate_limiter().for_domain(client.domain)
+    for _ in range(limiter.failure_threshold):
+        assert client.get('wp/v2/users/me').status_code == 503
+    assert limiter.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        client.get('wp/v2/users/me')
+    assert server.state.snapshot()['requests'] == limiter.failure_threshold
+
+
+def test_network_error_releases_the_slot(fake_server):
+    server = fake_server()
+    client = client_for_server(server)
+    server.stop()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get('wp/v2/users/me')
+    limiter = get_rate_limiter().for_domain(client.domain)
+    assert limiter.in_flight == 0
+    assert limiter.failures == 1
+
+
+def test_limit_grows_additively_and_halves_on_throttle():
+    limiter = DomainLimiter('https://a.example', initial_limit=4.0)
+    limiter.acquire()
+    limiter.release(200, elapsed=0.1)
+    assert limiter.limit == pytest.approx(4.25)
+    limiter.acquire()
+    limiter.release(429, retry_after=0.0)
+    assert limiter.limit == pytest.approx(4.25 / 2)
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(200, elapsed=0.1)
+    # 응답 시간이 기준의 몇 배로 늘면 (서버가 버거워하면) 줄인다.
+    grown = limiter.limit
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(200, elapsed=5.0)
+    assert limiter.limit < grown
+    assert limiter.limit >= MIN_LIMIT
+
+
+def test_half_open_allows_one_trial_and_closes_on_success():
+    limiter = DomainLimiter('https://a.example', failure_threshold=2, open_seconds=0.1)
+    for _ in range(2):
+        limiter.acquire()
+        limiter.release(500)
+    assert limiter.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        limiter.acquire()
+    time.sleep(0.15)
+    limiter.acquire()
+    assert limiter.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        limiter.acquire()
+    limiter.release(200, elapsed=0.1)
+    assert limiter.state == CLOSED
+    assert limiter.failures == 0
+
+
+def test_failed_trial_reopens_for_longer():
+    limiter = DomainLimiter('https://a.example', failure_threshold=1, open_seconds=0.1)
+    limiter.acquire()
+    limiter.release(500)
+    time.sleep(0.15)
+    limiter.acquire()
+    limiter.release(500)
+    assert limiter.state == OPEN
+    assert limiter.open_seconds == pytest.approx(0.2)
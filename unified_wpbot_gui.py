@@ -1,7 +1,22 @@
 import tkinter as tk
-from tkinter import scrolledtext
-import requests
-from requests.auth import HTTPBasicAuth
+from tkinter import scrolledtext, filedialog
+import time
+import uuid
+from background_executor import BackgroundExecutor
+from wp_client import get_client, close_all_clients, WordPressAPIError
+from publish_queue import PublishQueue, PublishWorker
+from scheduler import PublishScheduler, get_slot_planner, parse_local_time, MODE_FUTURE, MODE_LOCAL
+from taxonomy_cache import get_taxonomy_cache, load_terms
+from wp_probe import get_probe_cache
+from gemini_batch import BatchGenerator, quota_for, DEFAULT_CONCURRENCY, PROMPT_TEMPLATE
+from gemini_cache import get_response_cache, validate_api_key
+from gemini_stream import ArticleStream, stream_generate, MARKDOWN_PROMPT_TEMPLATE
+from metrics_panel import MetricsWindow
+from category_picker import CategoryPicker
+from wpbot_core import describe_error
+from account_store import get_account_store, encryption_available
+from account_health import sweep, STATUS_LABELS, STATUS_OK, STATUS_NO_PASSWORD
+from dedup_index import DEFAULT_MAX_DISTANCE
 try:
     import google.generativeai as genai
 except ImportError:
@@ -11,7 +26,9 @@ class UnifiedWPBotGUI(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title('Gemini & WordPress 통합 관리')
-        self.geometry('600x700')
+        self.geometry('640x960')
+        self.executor = BackgroundExecutor(self)
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
 
         # Gemini API 인증 영역
         frame_gemini = tk.LabelFrame(self, text='Gemini API 인증', padx=10, pady=10)
@@ -24,7 +41,9 @@ class UnifiedWPBotGUI(tk.Tk):
         self.gemini_model_entry.insert(0, 'gemini-2.5-flash')
         self.gemini_model_entry.grid(row=1, column=1)
         self.gemini_btn = tk.Button(frame_gemini, text='Gemini 인증', command=self.check_gemini_api)
-        self.gemini_btn.grid(row=2, column=0, columnspan=2, pady=5)
+        self.gemini_btn.grid(row=2, column=0, pady=5)
+        self.gemini_batch_btn = tk.Button(frame_gemini, text='주제 목록 일괄 생성/발행', command=self.open_batch_window, state='disabled')
+        self.gemini_batch_btn.grid(row=2, column=1, pady=5)
         self.gemini_result = tk.Label(frame_gemini, text='', fg='blue')
         self.gemini_result.grid(row=3, column=0, columnspan=2)
 
@@ -44,32 +63,166 @@ class UnifiedWPBotGUI(tk.Tk):
         self.wp_add_btn.grid(row=3, column=0, columnspan=2, pady=5)
         self.wp_result = tk.Label(frame_wp, text='', fg='blue')
         self.wp_result.grid(row=4, column=0, columnspan=2)
-        tk.Label(frame_wp, text='추가된 계정 목록').grid(row=5, column=0, columnspan=2)
-        self.wp_listbox = tk.Listbox(frame_wp, width=50, height=4)
+        tk.Label(frame_wp, text='추가된 계정 목록 (Ctrl/Shift 로 여러 개 선택)').grid(row=5, column=0, columnspan=2)
+        self.wp_listbox = tk.Listbox(frame_wp, width=70, height=4, selectmode=tk.EXTENDED, exportselection=False)
         self.wp_listbox.grid(row=6, column=0, columnspan=2, pady=5)
+        account_buttons = tk.Frame(frame_wp)
+        account_buttons.grid(row=7, column=0, columnspan=2)
+        tk.Button(account_buttons, text='전체 계정 점검', command=self.check_all_accounts).pack(side='left', padx=2)
+        tk.Button(account_buttons, text='선택 계정 삭제', command=self.remove_selected_accounts).pack(side='left', padx=2)
         self.wp_accounts = []
+        self.health_task = None
+        # 계정을 선택하면 캐시된 카테고리를 바로 보여준다.
+        self.wp_listbox.bind('<<ListboxSelect>>', self.on_account_selected)
 
         # 카테고리 및 글 작성 영역 (이제 __init__에서만 생성)
         frame_cat = tk.LabelFrame(self, text='카테고리 조회 및 글 작성', padx=10, pady=10)
         frame_cat.pack(fill='both', expand=True, padx=10, pady=5)
         tk.Label(frame_cat, text='계정 선택 후 카테고리 조회').grid(row=0, column=0, columnspan=2)
         self.cat_btn = tk.Button(frame_cat, text='선택 계정의 카테고리 조회', command=self.fetch_categories)
-        self.cat_btn.grid(row=1, column=0, columnspan=2, pady=5)
-        self.category_vars = []
-        self.category_checks_frame = tk.Frame(frame_cat)
-        self.category_checks_frame.grid(row=6, column=0, columnspan=2, pady=5)
+        self.cat_btn.grid(row=1, column=0, pady=5)
+        self.cat_refresh_btn = tk.Button(frame_cat, text='카테고리/태그 새로고침', command=lambda: self.fetch_categories(refresh=True))
+        self.cat_refresh_btn.grid(row=1, column=1, pady=5)
+        # 보이는 줄만 그리는 카테고리 목록 (선택은 ID 집합으로 유지)
+        self.category_picker = CategoryPicker(frame_cat)
+        self.category_picker.grid(row=6, column=0, columnspan=2, pady=5, sticky='ew')
         self.cat_result = scrolledtext.ScrolledText(frame_cat, width=60, height=8)
         self.cat_result.grid(row=2, column=0, columnspan=2)
         tk.Label(frame_cat, text='글 제목').grid(row=3, column=0, sticky='e')
         self.post_title_entry = tk.Entry(frame_cat, width=40)
         self.post_title_entry.grid(row=3, column=1)
-        tk.Label(frame_cat, text='글 내용').grid(row=4, column=0, sticky='e')
-        self.post_content_entry = tk.Entry(frame_cat, width=40)
-        self.post_content_entry.grid(row=4, column=1)
-        self.post_btn = tk.Button(frame_cat, text='선택 카테고리에 글 작성', command=self.create_post_to_category)
+        tk.Label(frame_cat, text='글 내용').grid(row=4, column=0, sticky='ne')
+        self.post_content_text = scrolledtext.ScrolledText(frame_cat, width=52, height=10, undo=True)
+        self.post_content_text.grid(row=4, column=1, sticky='ew')
+        # Gemini 로 본문 생성: 응답을 스트리밍으로 받아 위 편집기에 바로 채운다.
+        generate_frame = tk.Frame(frame_cat)
+        generate_frame.grid(row=9, column=0, columnspan=2, pady=2)
+        tk.Label(generate_frame, text='주제').pack(side='left')
+        self.article_topic_entry = tk.Entry(generate_frame, width=24)
+        self.article_topic_entry.pack(side='left')
+        self.article_generate_btn = tk.Button(generate_frame, text='Gemini 로 본문 생성', command=self.generate_article,
+                                              state='disabled')
+        self.article_generate_btn.pack(side='left', padx=2)
+        self.article_stop_btn = tk.Button(generate_frame, text='중지', command=self.cancel_article_generation,
+                                          state='disabled')
+        self.article_stop_btn.pack(side='left')
+        self.article_markdown_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(generate_frame, text='Markdown → HTML', variable=self.article_markdown_var).pack(side='left')
+        self.article_status = tk.Label(frame_cat, text='', fg='gray')
+        self.article_status.grid(row=10, column=0, columnspan=2)
+        self.article_task = None
+        self.article_stream = None
+        self._article_after = None
+        self.post_btn = tk.Button(frame_cat, text='선택 계정/카테고리에 글 작성', command=self.create_post_to_category)
         self.post_btn.grid(row=5, column=0, columnspan=2, pady=5)
+        # 대표 이미지 (본문의 로컬 <img src="..."> 도 발행할 때 함께 업로드된다)
+        media_frame = tk.Frame(frame_cat)
+        media_frame.grid(row=8, column=0, columnspan=2, pady=2)
+        tk.Button(media_frame, text='대표 이미지 선택', command=self.choose_featured_image).pack(side='left')
+        tk.Button(media_frame, text='지우기', command=lambda: self.set_featured_image(None)).pack(side='left', padx=2)
+        self.featured_image_label = tk.Label(media_frame, text='대표 이미지 없음', fg='gray')
+        self.featured_image_label.pack(side='left', padx=5)
+        self.featured_image = None
+        # 같은 사이트에 거의 같은 글을 다시 발행하지 않는다 (64비트 지문 중 허용 차이 이하이면 중복).
+        self.dedup_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(media_frame, text='비슷한 글 발행 막기', variable=self.dedup_var).pack(side='left')
+        tk.Label(media_frame, text='허용 차이').pack(side='left')
+        self.dedup_distance_spin = tk.Spinbox(media_frame, from_=0, to=16, width=3)
+        self.dedup_distance_spin.delete(0, tk.END)
+        self.dedup_distance_spin.insert(0, str(DEFAULT_MAX_DISTANCE))
+        self.dedup_distance_spin.pack(side='left')
+        # 예약 발행: 시작 시각부터 사이트마다 간격을 두고 발행한다.
+        schedule_frame = tk.Frame(frame_cat)
+        schedule_frame.grid(row=7, column=0, columnspan=2, pady=2)
+        self.schedule_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(schedule_frame, text='예약 발행', variable=self.schedule_var).pack(side='left')
+        tk.Label(schedule_frame, text='시작(YYYY-MM-DD HH:MM)').pack(side='left')
+        self.schedule_start_entry = tk.Entry(schedule_frame, width=16)
+        self.schedule_start_entry.pack(side='left')
+        tk.Label(schedule_frame, text='사이트별 간격(분)').pack(side='left')
+        self.schedule_spacing_entry = tk.Entry(schedule_frame, width=5)
+        self.schedule_spacing_entry.insert(0, '60')
+        self.schedule_spacing_entry.pack(side='left')
+        self.schedule_mode_var = tk.StringVar(value=MODE_FUTURE)
+        tk.Radiobutton(schedule_frame, text='워드프레스 예약', variable=self.schedule_mode_var, value=MODE_FUTURE).pack(side='left')
+        tk.Radiobutton(schedule_frame, text='이 앱에서 발행', variable=self.schedule_mode_var, value=MODE_LOCAL).pack(side='left')
         self.categories = []
+        self.categories_domain = None
+        self._streaming_categories = False
+
+        # 백그라운드 요청 진행 상황
+        frame_tasks = tk.LabelFrame(self, text='진행 중인 요청', padx=10, pady=5)
+        frame_tasks.pack(fill='x', padx=10, pady=5)
+        self.task_listbox = tk.Listbox(frame_tasks, width=70, height=4)
+        self.task_listbox.pack(side='left', fill='x', expand=True)
+        self.task_cancel_btn = tk.Button(frame_tasks, text='선택 요청 취소', command=self.cancel_selected_task)
+        self.task_cancel_btn.pack(side='left', padx=5)
+        self.task_ids = []
+        self._task_refresh_pending = False
+        self.executor.add_listener(self.schedule_task_refresh)
+
+        # 영구 발행 큐: 이전 실행에서 끝나지 않은 작업도 이어서 처리한다.
+        queue_frame = tk.Frame(self)
+        queue_frame.pack(fill='x', padx=10)
+        self.queue_status = tk.Label(queue_frame, text='', anchor='w')
+        self.queue_status.pack(side='left', fill='x', expand=True)
+        tk.Button(queue_frame, text='실패 작업 재시도', command=self.retry_failed_jobs).pack(side='left', padx=2)
+        tk.Button(queue_frame, text='발행 큐 시작', command=self.start_publish_queue).pack(side='left', padx=2)
+        tk.Button(queue_frame, text='요청 통계', command=self.open_metrics_window).pack(side='left', padx=2)
+        self.metrics_window = None
+        # 저장된 계정을 불러와 (발행 큐가 이전 작업의 계정을 찾을 수 있도록 큐 시작 전에) 한꺼번에 점검한다.
+        self.load_saved_accounts()
+        self.publish_queue = PublishQueue()
+        self.queue_task = None
+        self.queue_worker = None
+        self._waiting_jobs = set()
+        self.start_publish_queue()
         # ...existing code...
+
+    def on_close(self):
+        if self._article_after is not None:
+            self.after_cancel(self._article_after)
+        if self.queue_worker is not None:
+            self.queue_worker.stop()
+        self.executor.close()
+        # 발행 큐는 디스크에 남아 있으므로 다음 실행 때 이어서 처리된다.
+        close_all_clients()
+        self.destroy()
+
+    def schedule_task_refresh(self, task=None):
+        # 이벤트마다 리스트를 다시 그리지 않고 여러 변경을 모아서 한 번에 갱신한다.
+        if self._task_refresh_pending:
+            return
+        self._task_refresh_pending = True
+        self.after(100, self.refresh_task_list)
+
+    def refresh_task_list(self):
+        self._task_refresh_pending = False
+        selection = self.task_listbox.curselection()
+        selected_id = self.task_ids[selection[0]] if selection else None
+        tasks = sorted(self.executor.tasks.values(), key=lambda t: (t.finished, -t.id))
+        self.task_ids = [t.id for t in tasks]
+        self.task_listbox.delete(0, tk.END)
+        for t in tasks:
+            self.task_listbox.insert(tk.END, t.describe())
+        if selected_id in self.task_ids:
+            self.task_listbox.selection_set(self.task_ids.index(selected_id))
+        if self.executor.running_tasks():
+            # 실행 중인 요청이 있으면 경과 시간 표시를 주기적으로 갱신한다.
+            self.schedule_task_refresh()
+
+    def cancel_selected_task(self):
+        selection = self.task_listbox.curselection()
+        if not selection:
+            return
+        task = self.executor.tasks.get(self.task_ids[selection[0]])
+        if task and not task.finished:
+            task.cancel()
+            if task is self.queue_task:
+                # 다음 예약 시각까지 잠들어 있는 발행 큐 워커를 깨운다.
+                self.queue_worker.stop()
+            self.refresh_task_list()
+
     def add_wp_account(self):
         domain = self.domain_entry.get().strip().rstrip('/')
         username = self.user_entry.get().strip()
@@ -80,36 +233,116 @@ class UnifiedWPBotGUI(tk.Tk):
             return
         display = f"{domain} | {username}"
 
-        # 1. Basic Auth 플러그인 활성화 및 REST API 접근 체크
-        plugin_check_url = f"{domain}/wp-json/"
-        try:
-            plugin_resp = requests.get(plugin_check_url, auth=HTTPBasicAuth(username, password))
-            if plugin_resp.status_code == 200:
-                # 2. 계정 권한(글 작성 가능 여부) 체크
-                post_check_url = f"{domain}/wp-json/wp/v2/posts"
-                post_resp = requests.post(post_check_url, auth=HTTPBasicAuth(username, password), json={"title": "권한 체크", "content": "테스트", "status": "draft"})
-                if post_resp.status_code == 201:
-                    self.wp_result.config(text=f'계정이 추가되었습니다: {display}\n플러그인/REST API/권한 정상 (글 작성 가능)', fg='blue')
-                elif post_resp.status_code == 401:
-                    self.wp_result.config(text=f'계정이 추가되었습니다: {display}\n플러그인 정상, 글 작성 권한 없음 (401)', fg='orange')
-                else:
-                    self.wp_result.config(text=f'계정이 추가되었습니다: {display}\n플러그인 정상, 글 작성 권한 오류: {post_resp.status_code}', fg='orange')
-            elif plugin_resp.status_code == 401:
-                self.wp_result.config(text=f'플러그인/REST API 인증 실패 (401): 아이디/비밀번호 또는 플러그인 설정 확인 필요', fg='red')
-                return
+        self.wp_result.config(text=f'계정 확인 중: {display}', fg='gray')
+        self.executor.submit(
+            f'계정 확인 {domain}', self._probe_wp_account, domain, username, password,
+            on_success=lambda result: self._on_wp_account_probed(result, domain, username, password),
+            on_error=lambda e: self.wp_result.config(text=f'플러그인/REST API 네트워크 오류: {e}', fg='red'),
+        )
+
+    def _probe_wp_account(self, task, domain, username, password):
+        # 워커 스레드에서 실행: 위젯에 접근하지 않는다.
+        # REST API 접근(/wp-json/)과 계정 권한(users/me?context=edit)을 동시에 확인한다.
+        # 글을 실제로 만들지 않으며, 최근에 확인한 계정은 요청 없이 캐시 결과를 쓴다.
+        task.progress('REST API/권한 확인')
+        probe, cached = get_probe_cache().probe(get_client(domain, username, password))
+        return probe, cached
+
+    def _on_wp_account_probed(self, result, domain, username, password):
+        probe, cached = result
+        display = f"{domain} | {username}"
+        suffix = ' (캐시)' if cached else ''
+        if probe.supports_batch:
+            suffix = ', 일괄 발행 지원' + suffix
+        if probe.error:
+            self.wp_result.config(text=f'{probe.error}: {domain}', fg='red')
+            return
+        if probe.index_status == 200:
+            if probe.can_write:
+                self.wp_result.config(text=f'계정이 추가되었습니다: {display}\n플러그인/REST API/권한 정상 (글 작성 가능){suffix}', fg='blue')
+            elif probe.user_status == 401:
+                self.wp_result.config(text=f'계정이 추가되었습니다: {display}\n플러그인 정상, 글 작성 권한 없음 (401){suffix}', fg='orange')
+            elif probe.authenticated:
+                self.wp_result.config(text=f'계정이 추가되었습니다: {display}\n플러그인 정상, 글 작성 권한 없음 (역할: {", ".join(probe.user.get("roles", []))}){suffix}', fg='orange')
             else:
-                self.wp_result.config(text=f'플러그인/REST API 오류: {plugin_resp.status_code}', fg='red')
-                return
-        except Exception as e:
-            self.wp_result.config(text=f'플러그인/REST API 네트워크 오류: {e}', fg='red')
+                self.wp_result.config(text=f'계정이 추가되었습니다: {display}\n플러그인 정상, 글 작성 권한 오류: {probe.user_status}{suffix}', fg='orange')
+        elif probe.index_status == 401:
+            self.wp_result.config(text=f'플러그인/REST API 인증 실패 (401): 아이디/비밀번호 또는 플러그인 설정 확인 필요', fg='red')
+            return
+        else:
+            self.wp_result.config(text=f'플러그인/REST API 오류: {probe.index_status}', fg='red')
             return
 
-        self.wp_accounts.append({'domain': domain, 'username': username, 'password': password})
-        self.wp_listbox.insert(tk.END, display)
+        account = {'domain': domain, 'username': username, 'password': password}
+        existing = self.find_account(domain, username)
+        if existing is not None:
+            # 이미 있는 계정이면 비밀번호만 바꾼다.
+            existing['password'] = password
+            index = self.wp_accounts.index(existing)
+        else:
+            self.wp_accounts.append(account)
+            self.wp_listbox.insert(tk.END, display)
+            index = len(self.wp_accounts) - 1
+        self.set_account_status(index, '정상' if probe.can_write else STATUS_LABELS['no_write'],
+                                'black' if probe.can_write else 'orange')
+        get_account_store().upsert(account)
+        if not encryption_available():
+            self.wp_result.config(text=self.wp_result.cget('text') + '\n(cryptography 가 없어 비밀번호는 저장하지 않습니다)')
         self.domain_entry.delete(0, tk.END)
         self.user_entry.delete(0, tk.END)
         self.pw_entry.delete(0, tk.END)
 
+    def load_saved_accounts(self):
+        for account in get_account_store().load():
+            self.wp_accounts.append(account)
+            self.wp_listbox.insert(tk.END, f"{account['domain']} | {account['username']}")
+        if self.wp_accounts:
+            self.check_all_accounts()
+
+    def set_account_status(self, index, label, color='black'):
+        # 목록 줄의 글자만 바꾼다 (선택 상태 유지).
+        account = self.wp_accounts[index]
+        selected = index in self.wp_listbox.curselection()
+        self.wp_listbox.delete(index)
+        self.wp_listbox.insert(index, f"{account['domain']} | {account['username']} - {label}")
+        self.wp_listbox.itemconfig(index, fg=color)
+        if selected:
+            self.wp_listbox.selection_set(index)
+
+    def check_all_accounts(self):
+        if self.health_task is not None and not self.health_task.finished:
+            return
+        accounts = list(self.wp_accounts)
+        for index in range(len(accounts)):
+            self.set_account_status(index, '확인 중...', 'gray')
+        self.health_task = self.executor.submit(
+            f'계정 {len(accounts)}개 점검', self._sweep_accounts, accounts,
+            on_progress=self._on_account_health,
+            on_success=lambda results: self.wp_result.config(
+                text=f"계정 점검 완료: 정상 {sum(1 for r in results if r and r.ok)} / {len(results)}", fg='blue'),
+        )
+
+    def _sweep_accounts(self, task, accounts):
+        # 워커 스레드에서 실행: 모든 계정을 동시에 점검하고, 결과는 도착하는 대로 UI 로 보낸다.
+        return sweep(accounts, on_result=lambda index, result: task.progress(result.label, result),
+                     should_cancel=lambda: task.cancelled)
+
+    def _on_account_health(self, message, result):
+        # 점검 도중 계정이 삭제/추가되었을 수 있으므로 위치가 아니라 계정 객체로 찾는다.
+        index = next((i for i, a in enumerate(self.wp_accounts) if a is result.account), None)
+        if index is None:
+            return
+        color = 'black' if result.status == STATUS_OK else ('gray' if result.status == STATUS_NO_PASSWORD else 'red')
+        self.set_account_status(index, f'{message} {result.elapsed:.1f}s' if result.elapsed else message, color)
+
+    def remove_selected_accounts(self):
+        for index in reversed(self.wp_listbox.curselection()):
+            account = self.wp_accounts.pop(index)
+            self.wp_listbox.delete(index)
+            get_account_store().remove(account['domain'], account['username'])
+            if account['domain'] == self.categories_domain:
+                self._clear_categories()
+
     def check_gemini_api(self):
         api_key = self.gemini_entry.get().strip()
         model_name = self.gemini_model_entry.get().strip()
@@ -120,122 +353,520 @@ class UnifiedWPBotGUI(tk.Tk):
         if not genai:
             self.gemini_result.config(text='google-generativeai 라이브러리가 없습니다.', fg='red')
             return
-        try:
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel(model_name)
-            response = model.generate_content("Explain how AI works in a few words")
-            self.gemini_result.config(text=f"Gemini 인증 성공! 응답: {getattr(response, 'text', str(response))}", fg='blue')
-            self.gemini_entry.config(state='disabled')
-            self.gemini_model_entry.config(state='disabled')
-            self.gemini_btn.config(state='disabled')
-        except Exception as e:
-            self.gemini_result.config(text=f"Gemini 인증 실패: {e}", fg='red')
+        self.gemini_result.config(text='Gemini 인증 확인 중...', fg='gray')
+        self.gemini_btn.config(state='disabled')
+        self.executor.submit(
+            'Gemini 인증', self._probe_gemini, api_key, model_name,
+            on_success=self._on_gemini_ok,
+            on_error=lambda e: self.gemini_result.config(text=f"Gemini 인증 실패: {e}", fg='red'),
+            on_finally=self._on_gemini_finished,
+        )
+
+    def _probe_gemini(self, task, api_key, model_name):
+        # 과금되는 생성 호출 대신 모델 메타데이터 조회로 키를 확인하고, 키 지문별로 결과를 캐시한다.
+        return validate_api_key(genai, api_key, model_name)
+
+    def _on_gemini_ok(self, result):
+        model_info, cached = result
+        suffix = ' (캐시)' if cached else ''
+        self.gemini_result.config(text=f"Gemini 인증 성공! 모델: {model_info['display_name']}{suffix}", fg='blue')
+        self.gemini_entry.config(state='disabled')
+        self.gemini_model_entry.config(state='disabled')
+        self.gemini_authenticated = True
+        self.gemini_model_name = self.gemini_model_entry.get().strip()
+        self.gemini_batch_btn.config(state='normal')
+        self.article_generate_btn.config(state='normal')
+
+    def _on_gemini_finished(self):
+        if not getattr(self, 'gemini_authenticated', False):
+            self.gemini_btn.config(state='normal')
 
     def check_wp_login(self):
         domain = self.domain_entry.get().strip().rstrip('/')
         username = self.user_entry.get().strip()
         password = self.pw_entry.get().strip()
-        api_url = f"{domain}/wp-json/wp/v2/posts"
         self.wp_result.config(text='')
         if not domain or not username or not password:
             self.wp_result.config(text='도메인, 아이디, 비밀번호를 모두 입력하세요.', fg='red')
             return
-        try:
-            response = requests.get(api_url, auth=HTTPBasicAuth(username, password))
-            if response.status_code == 200:
-                self.wp_result.config(text=f'워드프레스 인증 성공! ({domain} | {username})', fg='blue')
-            elif response.status_code == 401:
-                self.wp_result.config(text='인증 실패: 사용자 이름 또는 비밀번호가 올바르지 않습니다.', fg='red')
-            else:
-                self.wp_result.config(text=f"오류 발생: {response.status_code}", fg='red')
-        except Exception as e:
-            self.wp_result.config(text=f"네트워크 또는 요청 오류 발생: {e}", fg='red')
+        self.executor.submit(
+            f'로그인 확인 {domain}', self._get_status, get_client(domain, username, password), 'wp/v2/posts',
+            on_success=lambda status: self._on_wp_login_checked(status, domain, username),
+            on_error=lambda e: self.wp_result.config(text=f"네트워크 또는 요청 오류 발생: {e}", fg='red'),
+        )
+
+    def _get_status(self, task, client, path):
+        return client.get(path).status_code
+
+    def _on_wp_login_checked(self, status, domain, username):
+        if status == 200:
+            self.wp_result.config(text=f'워드프레스 인증 성공! ({domain} | {username})', fg='blue')
+        elif status == 401:
+            self.wp_result.config(text='인증 실패: 사용자 이름 또는 비밀번호가 올바르지 않습니다.', fg='red')
+        else:
+            self.wp_result.config(text=f"오류 발생: {status}", fg='red')
+
+    def on_account_selected(self, event=None):
+        selection = self.wp_listbox.curselection()
+        if not selection:
+            return
+        domain = self.wp_accounts[selection[0]]['domain']
+        if domain == self.categories_domain:
+            return
+        cached = get_taxonomy_cache().get(domain, 'categories')
+        if cached is not None:
+            self.cat_result.delete('1.0', tk.END)
+            self._show_categories(cached, domain)
+            self.cat_result.insert(tk.END, '(캐시에서 불러옴)\n')
 
-    def fetch_categories(self):
+    def fetch_categories(self, refresh=False):
         selection = self.wp_listbox.curselection()
         self.cat_result.delete('1.0', tk.END)
         if not selection:
             self.cat_result.insert(tk.END, '계정을 선택하세요.\n')
-            if self.category_menu:
-                self.category_menu.pack_forget()
             return
         idx = selection[0]
         account = self.wp_accounts[idx]
         domain = account['domain']
         username = account['username']
         password = account['password']
-        categories_url = f"{domain}/wp-json/wp/v2/categories"
         if not domain or not username or not password:
             self.cat_result.insert(tk.END, '도메인, 아이디, 비밀번호를 모두 입력하세요.\n')
-            if self.category_menu:
-                self.category_menu.pack_forget()
             return
-        try:
-            response = requests.get(categories_url, auth=HTTPBasicAuth(username, password))
-            if response.status_code == 200:
-                categories = response.json()
-                self.categories = categories
-                # 기존 체크박스 제거
-                for widget in self.category_checks_frame.winfo_children():
-                    widget.destroy()
-                self.category_vars = []
-                self.cat_result.insert(tk.END, '\n--- 카테고리 목록 ---\n')
-                for cat in categories:
-                    var = tk.BooleanVar()
-                    chk = tk.Checkbutton(self.category_checks_frame, text=f"{cat['name']} (ID:{cat['id']})", variable=var)
-                    chk.pack(anchor='w')
-                    self.category_vars.append((var, cat['id']))
-                    self.cat_result.insert(tk.END, f"ID: {cat['id']} | 이름: {cat['name']}\n")
-            elif response.status_code == 401:
-                self.cat_result.insert(tk.END, '인증 실패: 사용자 이름 또는 비밀번호가 올바르지 않습니다.\n')
-                self.cat_result.insert(tk.END, f"[디버그] 응답 헤더: {response.headers}\n")
-                self.cat_result.insert(tk.END, f"[디버그] 응답 본문: {response.text}\n")
-            else:
-                self.cat_result.insert(tk.END, f"오류 발생: {response.status_code}\n{response.text}\n")
-        except Exception as e:
-            self.cat_result.insert(tk.END, f"네트워크 또는 요청 오류 발생: {e}\n")
+        cache = get_taxonomy_cache()
+        entry = cache.entry(domain, 'categories')
+        if entry is not None:
+            # 캐시된 목록을 먼저 보여주고, 오래되었거나 새로고침이면 백그라운드에서 재검증한다.
+            self._show_categories(entry['items'], domain)
+            if cache.is_fresh(entry) and not refresh:
+                self.cat_result.insert(tk.END, '(캐시에서 불러옴)\n')
+                return
+            self.cat_result.insert(tk.END, '(캐시 표시 중, 서버와 비교 중...)\n')
+            self._streaming_categories = False
+        else:
+            self.cat_result.insert(tk.END, f'카테고리 조회 중: {domain}\n')
+            # 기존 목록을 비우고 페이지가 도착할 때마다 이어 붙인다.
+            self._clear_categories()
+            self._streaming_categories = True
+        self.executor.submit(
+            f'카테고리 조회 {domain}', self._load_taxonomies, get_client(domain, username, password), refresh,
+            on_progress=self._on_category_page,
+            on_success=lambda result: self._on_categories_fetched(result, domain),
+            on_error=self._on_categories_error,
+        )
+
+    def _load_taxonomies(self, task, client, refresh):
+        cache = get_taxonomy_cache()
+
+        def on_page(page, items, total_pages):
+            task.progress(f'{page}/{total_pages} 페이지', items)
+        categories, source = load_terms(client, 'categories', cache, refresh=refresh, on_page=on_page,
+                                        should_cancel=lambda: task.cancelled)
+        task.check_cancelled()
+        # 태그도 같은 방식으로 캐시를 갱신해 둔다 (글 발행 시 사용).
+        task.progress('태그 확인')
+        load_terms(client, 'tags', cache, refresh=refresh, should_cancel=lambda: task.cancelled)
+        return categories, source
+
+    def _clear_categories(self):
+        self.category_picker.clear()
+        self.categories = []
+        self.categories_domain = None
+
+    def _show_categories(self, categories, domain):
+        if domain != self.categories_domain:
+            self.category_picker.clear()
+        self.cat_result.insert(tk.END, f'카테고리 {len(categories)}개 (아래 목록에서 검색/선택)\n')
+        self.category_picker.set_categories(categories)
+        self.categories = categories
+        self.categories_domain = domain
+
+    def _on_category_page(self, message, categories):
+        if categories and self._streaming_categories:
+            self.category_picker.append(categories)
+
+    def _on_categories_fetched(self, result, domain):
+        categories, source = result
+        if source == 'network' and not self._streaming_categories:
+            # 캐시와 달라진 경우에만 목록을 다시 그린다.
+            self.cat_result.delete('1.0', tk.END)
+            self._show_categories(categories, domain)
+        self.categories = categories
+        self.categories_domain = domain
+        label = {'cache': '캐시', 'revalidated': '변경 없음 (304)', 'network': '서버'}[source]
+        self.cat_result.insert(tk.END, f'총 {len(categories)}개 카테고리 ({label})\n')
+
+    def _on_categories_error(self, error):
+        if isinstance(error, WordPressAPIError):
+            self.cat_result.insert(tk.END, f"오류 발생: {describe_error(error)}\n")
+        else:
+            self.cat_result.insert(tk.END, f"네트워크 또는 요청 오류 발생: {error}\n")
 
     def create_post_to_category(self):
         selection = self.wp_listbox.curselection()
         if not selection:
             self.cat_result.insert(tk.END, '계정을 선택하세요.\n')
             return
-        idx = selection[0]
-        account = self.wp_accounts[idx]
-        domain = account['domain']
-        username = account['username']
-        password = account['password']
+        accounts = [self.wp_accounts[idx] for idx in selection]
         if not self.categories:
             self.cat_result.insert(tk.END, '카테고리 정보를 먼저 조회하세요.\n')
             return
-        selected_ids = [cat_id for var, cat_id in self.category_vars if var.get()]
+        selected_ids = self.category_picker.selected_ids()
         if not selected_ids:
             self.cat_result.insert(tk.END, '카테고리를 하나 이상 선택하세요.\n')
             return
+        selected_names = [cat['name'] for cat in self.categories if cat['id'] in selected_ids]
         title = self.post_title_entry.get().strip()
-        content = self.post_content_entry.get().strip()
+        content = self.post_content_text.get('1.0', 'end-1c').strip()
         if not title or not content:
             self.cat_result.insert(tk.END, '글 제목과 내용을 입력하세요.\n')
             return
-        post_url = f"{domain}/wp-json/wp/v2/posts"
-        post_data = {
-            "title": title,
-            "content": content,
-            "categories": selected_ids,
-            "status": "publish"
-        }
         try:
-            response = requests.post(post_url, auth=HTTPBasicAuth(username, password), json=post_data)
-            if response.status_code == 201:
-                self.cat_result.insert(tk.END, f"✅ 글이 성공적으로 등록되었습니다! (ID: {response.json().get('id')})\n")
-            elif response.status_code == 401:
-                self.cat_result.insert(tk.END, '❌ 인증 실패: 사용자 이름 또는 비밀번호가 올바르지 않습니다.\n')
-                self.cat_result.insert(tk.END, f"[디버그] 응답 헤더: {response.headers}\n")
-                self.cat_result.insert(tk.END, f"[디버그] 응답 본문: {response.text}\n")
+            schedule = self.schedule_settings()
+        except ValueError:
+            self.cat_result.insert(tk.END, '예약 시작 시각(YYYY-MM-DD HH:MM)과 간격(분)을 확인하세요.\n')
+            return
+        try:
+            dedup = self.dedup_settings()
+        except ValueError:
+            self.cat_result.insert(tk.END, '허용 차이는 0~64 사이의 숫자로 입력하세요.\n')
+            return
+        batch_id, slots = self.enqueue_posts(accounts, title, content, selected_ids, selected_names, schedule=schedule,
+                                             featured_image=self.featured_image, dedup=dedup)
+        self.cat_result.insert(tk.END, f"--- {len(accounts)}개 사이트 발행 작업을 큐에 추가했습니다 ({batch_id}) ---\n")
+        for _, domain, slot in slots:
+            self.cat_result.insert(tk.END, f"  ⏰ {domain}: {time.strftime('%Y-%m-%d %H:%M', time.localtime(slot))} 예약\n")
+
+    def generate_article(self):
+        if self.article_task is not None and not self.article_task.finished:
+            return
+        topic = self.article_topic_entry.get().strip()
+        if not topic:
+            self.article_status.config(text='생성할 글의 주제를 입력하세요.', fg='red')
+            return
+        convert = self.article_markdown_var.get()
+        prompt = (MARKDOWN_PROMPT_TEMPLATE if convert else PROMPT_TEMPLATE).format(topic=topic)
+        self.post_title_entry.delete(0, tk.END)
+        self.post_content_text.delete('1.0', tk.END)
+        self.article_stream = ArticleStream(convert_markdown=convert)
+        self.article_status.config(text='생성 요청 중...', fg='gray')
+        self.article_generate_btn.config(state='disabled')
+        self.article_stop_btn.config(state='normal')
+        self.article_task = self.executor.submit(
+            f'Gemini 본문 생성: {topic}', self._stream_article, prompt, self.article_stream,
+            on_success=self._on_article_finished,
+            on_error=lambda e: self.article_status.config(text=f'생성 실패: {e}', fg='red'),
+            on_finally=self._on_article_closed,
+        )
+        self._drain_article_stream()
+
+    def _stream_article(self, task, prompt, stream):
+        model = genai.GenerativeModel(self.gemini_model_name)
+        try:
+            return stream_generate(model, prompt, stream.feed, should_cancel=lambda: task.cancelled,
+                                   cache=get_response_cache())
+        finally:
+            stream.finish()
+
+    def _drain_article_stream(self):
+        # 한 프레임 동안 쌓인 조각을 한 번에 편집기에 넣는다.
+        self._article_after = None
+        stream = self.article_stream
+        if stream is None:
+            return
+        title, body, tail, finished = stream.drain()
+        if title is not None:
+            self.post_title_entry.delete(0, tk.END)
+            self.post_title_entry.insert(0, title)
+        editor = self.post_content_text
+        tail_range = editor.tag_ranges('stream_tail')
+        if tail_range:
+            editor.delete(tail_range[0], tail_range[-1])
+        if body:
+            editor.insert('end-1c', body)
+        if tail:
+            editor.insert('end-1c', tail, 'stream_tail')
+        if body or tail:
+            editor.see(tk.END)
+        if stream.ttft is not None:
+            self.article_status.config(
+                text=f'첫 응답 {stream.ttft:.2f}s · {stream.chars}자 · {time.perf_counter() - stream.started:.1f}s',
+                fg='gray')
+        if finished:
+            self.article_stream = None
+            return
+        self._article_after = self.after(BackgroundExecutor.POLL_INTERVAL_MS, self._drain_article_stream)
+
+    def cancel_article_generation(self):
+        if self.article_task is not None and not self.article_task.finished:
+            self.article_task.cancel()
+            self.article_status.config(text='중지하는 중...', fg='gray')
+
+    def _on_article_finished(self, result):
+        source = '캐시' if result.cached else f'첫 응답 {result.ttft or 0:.2f}s'
+        self.article_status.config(text=f'생성 완료 ({source}, {len(result.text)}자, {result.elapsed:.1f}s)', fg='blue')
+
+    def _on_article_closed(self):
+        self.article_generate_btn.config(state='normal')
+        self.article_stop_btn.config(state='disabled')
+        if self.article_task is not None and self.article_task.cancelled:
+            self.article_status.config(text='생성을 중지했습니다. 받은 부분까지 편집기에 남겨 두었습니다.', fg='gray')
+        # 남은 조각을 마저 넣는다.
+        if self.article_stream is not None and self._article_after is None:
+            self._drain_article_stream()
+
+    def choose_featured_image(self):
+        path = filedialog.askopenfilename(title='대표 이미지 선택',
+                                          filetypes=[('이미지', '*.jpg *.jpeg *.png *.gif *.webp'), ('모든 파일', '*.*')])
+        if path:
+            self.set_featured_image(path)
+
+    def set_featured_image(self, path):
+        self.featured_image = path
+        self.featured_image_label.config(text=path or '대표 이미지 없음', fg='black' if path else 'gray')
+
+    def schedule_settings(self):
+        # 예약 발행을 켜지 않았으면 None, 아니면 (시작 시각, 간격(초), 모드). 잘못된 입력은 ValueError.
+        if not self.schedule_var.get():
+            return None
+        earliest = parse_local_time(self.schedule_start_entry.get())
+        spacing = float(self.schedule_spacing_entry.get()) * 60
+        return earliest, spacing, self.schedule_mode_var.get()
+
+    def dedup_settings(self):
+        # 중복 검사를 끄면 None, 켜면 허용 차이(비트 수). 잘못된 입력은 ValueError.
+        if not self.dedup_var.get():
+            return None
+        distance = int(self.dedup_distance_spin.get())
+        if not 0 <= distance <= 64:
+            raise ValueError(distance)
+        return distance
+
+    def enqueue_posts(self, accounts, title, content, selected_ids, selected_names, batch_id=None, schedule=None,
+                      featured_image=None, dedup=DEFAULT_MAX_DISTANCE):
+        # 카테고리를 조회한 사이트는 선택한 ID 를 그대로 쓰고, 다른 사이트는 같은 이름의 카테고리를 찾아 쓴다.
+        # 제목/내용의 {domain}, {host}, {username} 은 발행 시점에 사이트별로 치환된다.
+        # 워커 스레드에서도 호출되므로 위젯에 접근하지 않는다. (batch_id, 예약된 [(job_id, 도메인, 슬롯)]) 를 돌려준다.
+        batch_id = batch_id or uuid.uuid4().hex[:8]
+
+        def payload_for(account):
+            payload = {'title': title, 'content': content, 'status': 'publish'}
+            if dedup is None:
+                payload['dedup'] = False
+            else:
+                payload['dedup_distance'] = dedup
+            if featured_image:
+                payload['featured_image'] = featured_image
+            if account['domain'] == self.categories_domain:
+                payload['categories'] = selected_ids
+            else:
+                payload['category_names'] = selected_names
+            return payload
+
+        if schedule is not None:
+            earliest, spacing, mode = schedule
+            scheduler = PublishScheduler(self.publish_queue, get_slot_planner(), mode)
+            return batch_id, scheduler.schedule(accounts, payload_for, earliest, spacing, batch_id)
+        for account in accounts:
+            self.publish_queue.enqueue(account['domain'], account['username'], payload_for(account), batch_id=batch_id)
+        return batch_id, []
+
+    def find_account(self, domain, username):
+        # 비밀번호를 불러오지 못한 계정은 다시 입력할 때까지 없는 것으로 본다.
+        return next((a for a in self.wp_accounts
+                     if a['domain'] == domain and a['username'] == username and a.get('password')), None)
+
+    def start_publish_queue(self):
+        if self.queue_task is not None and not self.queue_task.finished:
+            return
+        worker = self.queue_worker = PublishWorker(self.publish_queue, self.find_account)
+        self.queue_task = self.executor.submit(
+            '발행 큐', lambda task: worker.run(should_stop=lambda: task.cancelled,
+                                               on_event=lambda job, event: task.progress(event[0], (job, event))),
+            on_progress=self._on_queue_event,
+            on_error=lambda e: self.cat_result.insert(tk.END, f"발행 큐 오류: {e}\n"),
+            on_finally=self.refresh_queue_status,
+        )
+        self.refresh_queue_status()
+
+    def retry_failed_jobs(self):
+        count = self.publish_queue.retry_failed()
+        self.cat_result.insert(tk.END, f"실패 작업 {count}개를 다시 대기열에 넣었습니다.\n")
+        self.refresh_queue_status()
+
+    def refresh_queue_status(self):
+        counts = self.publish_queue.counts()
+        running = self.queue_task is not None and not self.queue_task.finished
+        self.queue_status.config(
+            text=f"발행 큐 {'실행 중' if running else '중지됨'}: 대기 {counts.get('pending', 0)} / "
+                 f"진행 {counts.get('running', 0)} / 완료 {counts.get('done', 0)} / 실패 {counts.get('failed', 0)}")
+
+    def _on_queue_event(self, message, data):
+        job, event = data
+        kind = event[0]
+        domain = job.domain
+        if kind == 'done':
+            _, post_id, existed = event
+            if existed:
+                self.cat_result.insert(tk.END, f"✅ {domain}: 이미 등록된 글을 확인했습니다 (ID: {post_id}, 중복 생성 안 함)\n")
             else:
-                self.cat_result.insert(tk.END, f"⚠️ 오류 발생: {response.status_code}\n{response.text}\n")
-        except Exception as e:
-            self.cat_result.insert(tk.END, f"네트워크 또는 요청 오류 발생: {e}\n")
+                self.cat_result.insert(tk.END, f"✅ {domain}: 글이 성공적으로 등록되었습니다! (ID: {post_id})\n")
+        elif kind == 'retry':
+            self.cat_result.insert(tk.END, f"🔁 {domain}: {event[1]}\n")
+        elif kind == 'failed':
+            self.cat_result.insert(tk.END, f"❌ {domain}: 발행 실패: {event[1]}\n")
+        elif kind == 'paused' and job.id not in self._waiting_jobs:
+            self._waiting_jobs.add(job.id)
+            self.cat_result.insert(tk.END, f"⏸ {event[1]} (다른 사이트는 계속 발행합니다)\n")
+        elif kind == 'waiting' and job.id not in self._waiting_jobs:
+            self._waiting_jobs.add(job.id)
+            self.cat_result.insert(tk.END, f"⏳ {domain} | {job.username}: 계정을 추가하면 이어서 발행합니다.\n")
+        if kind in ('done', 'failed'):
+            self._waiting_jobs.discard(job.id)
+            self._report_batch(job.batch_id)
+        self.cat_result.see(tk.END)
+        self.refresh_queue_status()
+
+    def _report_batch(self, batch_id):
+        if not batch_id:
+            return
+        counts, started, finished = self.publish_queue.batch_summary(batch_id)
+        if counts.get('pending', 0) or counts.get('running', 0):
+            return
+        elapsed = finished - started if started is not None else 0.0
+        self.cat_result.insert(tk.END, f"--- 발행 완료 ({batch_id}): 성공 {counts.get('done', 0)} / "
+                                       f"실패 {counts.get('failed', 0)}, 소요 시간 {elapsed:.1f}s ---\n")
+
+    def open_metrics_window(self):
+        if self.metrics_window is not None and self.metrics_window.winfo_exists():
+            self.metrics_window.lift()
+            return
+        self.metrics_window = MetricsWindow(self)
+
+    def open_batch_window(self):
+        if getattr(self, 'batch_window', None) is not None and self.batch_window.winfo_exists():
+            self.batch_window.lift()
+            return
+        rpm, _ = quota_for(self.gemini_model_name)
+        win = tk.Toplevel(self)
+        win.title('Gemini 일괄 생성/발행')
+        self.batch_window = win
+        tk.Label(win, text='주제/키워드 (한 줄에 하나)').pack()
+        self.batch_topics_text = scrolledtext.ScrolledText(win, width=60, height=8)
+        self.batch_topics_text.pack(padx=10)
+        options = tk.Frame(win)
+        options.pack(pady=5)
+        tk.Label(options, text='RPM').pack(side='left')
+        self.batch_rpm_entry = tk.Entry(options, width=6)
+        self.batch_rpm_entry.insert(0, str(rpm))
+        self.batch_rpm_entry.pack(side='left')
+        tk.Label(options, text='동시 실행').pack(side='left')
+        self.batch_concurrency_entry = tk.Entry(options, width=4)
+        self.batch_concurrency_entry.insert(0, str(DEFAULT_CONCURRENCY))
+        self.batch_concurrency_entry.pack(side='left')
+        self.batch_publish_var = tk.BooleanVar(win, value=True)
+        tk.Checkbutton(options, text='생성 즉시 선택 계정/카테고리에 발행', variable=self.batch_publish_var).pack(side='left')
+        buttons = tk.Frame(win)
+        buttons.pack()
+        tk.Button(buttons, text='일괄 생성 시작', command=self.start_batch_generation).pack(side='left', padx=5)
+        tk.Button(buttons, text='중지', command=self.cancel_batch_generation).pack(side='left', padx=5)
+        self.batch_log = scrolledtext.ScrolledText(win, width=60, height=12)
+        self.batch_log.pack(padx=10, pady=5)
+        self.batch_task = None
+        win.protocol('WM_DELETE_WINDOW', self.close_batch_window)
+
+    def close_batch_window(self):
+        self.cancel_batch_generation()
+        self.batch_window.destroy()
+        self.batch_window = None
+
+    def cancel_batch_generation(self):
+        if self.batch_task is not None and not self.batch_task.finished:
+            self.batch_task.cancel()
+
+    def _batch_log(self, text):
+        if getattr(self, 'batch_window', None) is not None and self.batch_window.winfo_exists():
+            self.batch_log.insert(tk.END, text)
+            self.batch_log.see(tk.END)
+
+    def start_batch_generation(self):
+        if self.batch_task is not None and not self.batch_task.finished:
+            self._batch_log('이미 실행 중입니다.\n')
+            return
+        topics = [line.strip() for line in self.batch_topics_text.get('1.0', tk.END).splitlines() if line.strip()]
+        if not topics:
+            self._batch_log('주제를 한 줄에 하나씩 입력하세요.\n')
+            return
+        try:
+            rpm = int(self.batch_rpm_entry.get())
+            concurrency = int(self.batch_concurrency_entry.get())
+        except ValueError:
+            self._batch_log('RPM 과 동시 실행 수는 숫자로 입력하세요.\n')
+            return
+        accounts, selected_ids, selected_names = [], [], []
+        if self.batch_publish_var.get():
+            accounts = [self.wp_accounts[idx] for idx in self.wp_listbox.curselection()]
+            selected_ids = self.category_picker.selected_ids()
+            selected_names = [cat['name'] for cat in self.categories if cat['id'] in selected_ids]
+            if not accounts or not selected_ids:
+                self._batch_log('발행할 계정과 카테고리를 메인 창에서 선택하세요.\n')
+                return
+        try:
+            # 메인 창에서 예약 발행을 켜면 생성된 글을 사이트별 간격에 맞춰 예약한다.
+            schedule = self.schedule_settings()
+        except ValueError:
+            self._batch_log('예약 시작 시각(YYYY-MM-DD HH:MM)과 간격(분)을 확인하세요.\n')
+            return
+        try:
+            dedup = self.dedup_settings()
+        except ValueError:
+            self._batch_log('허용 차이는 0~64 사이의 숫자로 입력하세요.\n')
+            return
+        self._batch_log(f'--- {len(topics)}개 주제 생성 시작 (RPM {rpm}, 동시 {concurrency}) ---\n')
+        self.batch_task = self.executor.submit(
+            f'Gemini 일괄 생성 {len(topics)}개', self._generate_and_publish,
+            topics, rpm, concurrency, accounts, selected_ids, selected_names, schedule, dedup,
+            on_progress=self._on_batch_event,
+            on_success=self._on_batch_finished,
+            on_error=lambda e: self._batch_log(f'❌ 일괄 생성 오류: {e}\n'),
+        )
+
+    def _generate_and_publish(self, task, topics, rpm, concurrency, accounts, selected_ids, selected_names, schedule,
+                              dedup):
+        model = genai.GenerativeModel(self.gemini_model_name)
+        generator = BatchGenerator(model, rpm=rpm, max_concurrency=concurrency, cache=get_response_cache())
+        counts = {'generated': 0}
+        batch_id = uuid.uuid4().hex[:8]
+
+        def on_result(result):
+            counts['generated'] += 1
+            task.progress(f"{counts['generated']}/{len(topics)} 생성", ('generated', result))
+            if result.ok and accounts and not task.cancelled:
+                # 생성이 끝난 글은 전체 배치를 기다리지 않고 바로 발행 큐에 넣는다.
+                self.enqueue_posts(accounts, result.title, result.content, selected_ids, selected_names, batch_id, schedule,
+                                   dedup=dedup)
+                task.progress('발행 큐 추가', ('queued', result))
+
+        return generator.run(topics, on_result=on_result, should_cancel=lambda: task.cancelled)
+
+    def _on_batch_event(self, message, event):
+        if event is None:
+            return
+        kind, result = event
+        if kind == 'generated':
+            if result.ok and result.cached:
+                self._batch_log(f"✅ 생성(캐시): {result.topic} → {result.title}\n")
+            elif result.ok:
+                self._batch_log(f"✅ 생성: {result.topic} → {result.title} ({result.elapsed:.1f}s, 시도 {result.attempts}회)\n")
+            else:
+                self._batch_log(f"❌ 생성 실패: {result.topic}: {result.error}\n")
+        else:
+            self._batch_log(f"  📤 {result.title}: 선택 계정 발행 큐에 추가\n")
+
+    def _on_batch_finished(self, summary):
+        self._batch_log(f"--- 생성 완료: 성공 {summary.succeeded} / 실패 {summary.failed}, 캐시 {summary.cached}, 토큰 {summary.tokens}, 소요 시간 {summary.elapsed:.1f}s ---\n")
+        stats = get_response_cache().stats()
+        self._batch_log(f"응답 캐시: 적중 {stats['hits']} / 미스 {stats['misses']}, {stats['entries']}개 ({stats['bytes'] // 1024}KB)\n")
 
 if __name__ == '__main__':
     app = UnifiedWPBotGUI()
@@ -1,12 +1,20 @@
 import tkinter as tk
 from tkinter import scrolledtext
-import requests
+from gemini_cache import validate_api_key
+from wp_client import get_client, WordPressAPIError
+from taxonomy_cache import get_taxonomy_cache, load_terms
+from post_index import get_post_index
+from background_executor import BackgroundExecutor
+from wpbot_core import PostSpec, publish_post, describe_error
+from term_resolver import TermIndex
 
 class WordPressAuthGUI(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title('WordPress & Gemini 인증')
         self.geometry('500x500')
+        self.executor = BackgroundExecutor(self)
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
 
         # Gemini API Key
         tk.Label(self, text='Gemini API Key').pack()
@@ -35,25 +43,43 @@ class WordPressAuthGUI(tk.Tk):
         tk.Label(self, text='추가된 워드프레스 계정 목록').pack()
         self.wp_listbox = tk.Listbox(self, width=60, height=5)
         self.wp_listbox.pack()
+        # 계정을 선택하면 캐시된 카테고리를 바로 보여준다.
+        self.wp_listbox.bind('<<ListboxSelect>>', self.on_account_selected)
         self.check_wp_btn = tk.Button(self, text='선택 계정 인증 및 게시물 조회', command=self.fetch_selected_wp_data)
         self.check_wp_btn.pack(pady=5)
+        self.refresh_cat_btn = tk.Button(self, text='카테고리/태그 새로고침', command=self.refresh_taxonomies)
+        self.refresh_cat_btn.pack(pady=2)
 
-    self.result_text = scrolledtext.ScrolledText(self, width=60, height=15)
-    self.result_text.pack()
+        # 로컬 게시물 인덱스 검색
+        search_frame = tk.Frame(self)
+        search_frame.pack(pady=3)
+        self.post_search_entry = tk.Entry(search_frame, width=25)
+        self.post_search_entry.pack(side='left')
+        self.post_search_entry.bind('<Return>', lambda event: self.search_posts())
+        self.search_by_category_var = tk.BooleanVar(self)
+        tk.Checkbutton(search_frame, text='선택 카테고리만', variable=self.search_by_category_var).pack(side='left')
+        tk.Button(search_frame, text='게시물 검색', command=self.search_posts).pack(side='left', padx=2)
+        tk.Button(search_frame, text='최근 게시물', command=self.show_recent_posts).pack(side='left', padx=2)
 
-    # 카테고리 선택 옵션
-    self.category_var = tk.StringVar(self)
-    self.category_menu = None
+        self.result_text = scrolledtext.ScrolledText(self, width=60, height=15)
+        self.result_text.pack()
 
-    # 글 작성 영역
-    tk.Label(self, text='글 제목').pack()
-    self.post_title_entry = tk.Entry(self, width=50)
-    self.post_title_entry.pack()
-    tk.Label(self, text='글 내용').pack()
-    self.post_content_entry = tk.Entry(self, width=50)
-    self.post_content_entry.pack()
-    self.post_btn = tk.Button(self, text='선택 카테고리에 글 작성', command=self.create_post_to_category)
-    self.post_btn.pack(pady=5)
+        # 카테고리 선택 옵션
+        self.category_var = tk.StringVar(self)
+        self.category_menu = None
+        self.category_labels = {}
+        self.categories = []
+        self.categories_domain = None
+
+        # 글 작성 영역
+        tk.Label(self, text='글 제목').pack()
+        self.post_title_entry = tk.Entry(self, width=50)
+        self.post_title_entry.pack()
+        tk.Label(self, text='글 내용').pack()
+        self.post_content_entry = tk.Entry(self, width=50)
+        self.post_content_entry.pack()
+        self.post_btn = tk.Button(self, text='선택 카테고리에 글 작성', command=self.create_post_to_category)
+        self.post_btn.pack(pady=5)
 
     def check_gemini_api(self):
         api_key = self.gemini_entry.get().strip()
@@ -62,20 +88,34 @@ class WordPressAuthGUI(tk.Tk):
         if not api_key or not model_name:
             self.result_text.insert(tk.END, 'Gemini API 키와 모델명을 입력하세요.\n')
             return
-        try:
-            import google.generativeai as genai
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel(model_name)
-            response = model.generate_content("Explain how AI works in a few words")
-            self.result_text.insert(tk.END, f"✅ Gemini API 인증 성공!\n응답: {getattr(response, 'text', str(response))}\n")
-            # 인증 성공 시 입력란과 버튼 비활성화
-            self.gemini_entry.config(state='disabled')
-            self.gemini_model_entry.config(state='disabled')
-            self.gemini_btn.config(state='disabled')
-        except ImportError:
+        self.result_text.insert(tk.END, 'Gemini 인증 확인 중...\n')
+        self.gemini_btn.config(state='disabled')
+        self.executor.submit(
+            'Gemini 인증', self._probe_gemini, api_key, model_name,
+            on_success=self._on_gemini_ok,
+            on_error=self._on_gemini_error,
+        )
+
+    def _probe_gemini(self, task, api_key, model_name):
+        import google.generativeai as genai
+        # 과금되는 생성 호출 대신 모델 메타데이터 조회로 확인한다 (키 지문별로 캐시).
+        return validate_api_key(genai, api_key, model_name)
+
+    def _on_gemini_ok(self, result):
+        model_info, cached = result
+        suffix = ' (캐시)' if cached else ''
+        self.result_text.insert(tk.END, f"✅ Gemini API 인증 성공!{suffix}\n모델: {model_info['display_name']}\n")
+        # 인증 성공 시 입력란과 버튼 비활성화
+        self.gemini_entry.config(state='disabled')
+        self.gemini_model_entry.config(state='disabled')
+
+    def _on_gemini_error(self, error):
+        self.gemini_btn.config(state='normal')
+        if isinstance(error, ImportError):
             self.result_text.insert(tk.END, "❌ google-generativeai 라이브러리가 없습니다.\npip install google-generativeai\n")
-        except Exception as e:
-            self.result_text.insert(tk.END, f"❌ Gemini API 인증 실패: {e}\n")
+        else:
+            self.result_text.insert(tk.END, f"❌ Gemini API 인증 실패: {error}\n")
+
     def add_wp_account(self):
         domain = self.domain_entry.get().strip().rstrip('/')
         username = self.user_entry.get().strip()
@@ -106,40 +146,151 @@ class WordPressAuthGUI(tk.Tk):
         domain = account['domain']
         username = account['username']
         password = account['password']
-        api_url = f"{domain}/wp-json/wp/v2/posts"
-        categories_url = f"{domain}/wp-json/wp/v2/categories"
+        client = get_client(domain, username, password)
         self.result_text.delete('1.0', tk.END)
+        self.result_text.insert(tk.END, f'게시물 인덱스 동기화 중: {domain}\n')
+        # 게시물 전체를 받지 않고 바뀐 글의 목록 필드만 받아 로컬 인덱스에 반영한다.
+        self.executor.submit(
+            f'게시물 동기화 {domain}', self._sync_site, client,
+            on_success=lambda result: self._on_site_synced(result, domain, username),
+            on_error=self._on_sync_error,
+        )
+
+    def _sync_site(self, task, client):
+        def on_page(page, total_pages, fetched):
+            task.progress(f'{page}/{total_pages} 페이지, {fetched}개')
+        sync_result = get_post_index().sync(client, on_page=on_page, should_cancel=lambda: task.cancelled)
         try:
-            response = requests.get(api_url, auth=(username, password))
-            if response.status_code == 200:
-                self.result_text.insert(tk.END, f'✅ 워드프레스 인증 성공! ({domain} | {username})\n')
-                post_data = response.json()
-                self.result_text.insert(tk.END, '--- 게시물 목록 (일부) ---\n')
-                for post in post_data[:2]:
-                    self.result_text.insert(tk.END, f"제목: {post['title']['rendered']}\nID: {post['id']}\n\n")
-                # 카테고리 조회
-                cat_response = requests.get(categories_url, auth=(username, password))
-                if cat_response.status_code == 200:
-                    categories = cat_response.json()
-                    self.result_text.insert(tk.END, '\n--- 카테고리 목록 ---\n')
-                    self.categories = categories
-                    cat_names = [f"{cat['name']} (ID:{cat['id']})" for cat in categories]
-                    if self.category_menu:
-                        self.category_menu.destroy()
-                    if cat_names:
-                        self.category_var.set(cat_names[0])
-                        self.category_menu = tk.OptionMenu(self, self.category_var, *cat_names)
-                        self.category_menu.pack()
-                    for cat in categories:
-                        self.result_text.insert(tk.END, f"ID: {cat['id']} | 이름: {cat['name']}\n")
-                else:
-                    self.result_text.insert(tk.END, f"카테고리 조회 실패: {cat_response.status_code}\n{cat_response.text}\n")
-            elif response.status_code == 401:
+            categories, _ = load_terms(client, 'categories', get_taxonomy_cache())
+            category_error = None
+        except WordPressAPIError as e:
+            categories, category_error = None, e
+        return sync_result, categories, category_error
+
+    def _on_site_synced(self, result, domain, username):
+        sync_result, categories, category_error = result
+        self.result_text.insert(tk.END, f'✅ 워드프레스 인증 성공! ({domain} | {username})\n')
+        kind = '전체' if sync_result.full else '증분'
+        self.result_text.insert(tk.END, f'{kind} 동기화: {sync_result.fetched}개 갱신, 총 {sync_result.total}개 ({sync_result.elapsed:.1f}s)\n')
+        self.result_text.insert(tk.END, '--- 게시물 목록 (최근) ---\n')
+        self.insert_posts(get_post_index().recent(domain, limit=5))
+        if category_error is not None:
+            self.result_text.insert(tk.END, f"카테고리 조회 실패: {category_error.status_code}\n{category_error.response.text}\n")
+        elif categories is not None:
+            self.show_categories(categories, domain)
+
+    def _on_sync_error(self, error):
+        if isinstance(error, WordPressAPIError):
+            if error.status_code == 401:
                 self.result_text.insert(tk.END, '❌ 인증 실패: 사용자 이름 또는 비밀번호가 올바르지 않습니다.\n')
             else:
-                self.result_text.insert(tk.END, f"⚠️ 오류 발생: {response.status_code}\n{response.text}\n")
-        except Exception as e:
-            self.result_text.insert(tk.END, f"🌐 네트워크 또는 요청 오류 발생: {e}\n")
+                self.result_text.insert(tk.END, f"⚠️ 오류 발생: {error.status_code}\n{error.response.text}\n")
+        else:
+            self.result_text.insert(tk.END, f"🌐 네트워크 또는 요청 오류 발생: {error}\n")
+
+    def insert_posts(self, posts):
+        if not posts:
+            self.result_text.insert(tk.END, '(게시물 없음)\n')
+        for post in posts:
+            self.result_text.insert(tk.END, f"제목: {post['title']}\nID: {post['id']} | {post['status']} | {post['modified']}\n\n")
+
+    def selected_category_id(self):
+        return self.category_labels.get(self.category_var.get())
+
+    def search_posts(self):
+        selection = self.wp_listbox.curselection()
+        if not selection:
+            self.result_text.insert(tk.END, '계정을 선택하세요.\n')
+            return
+        domain = self.wp_accounts[selection[0]]['domain']
+        text = self.post_search_entry.get().strip()
+        category_id = None
+        if self.search_by_category_var.get():
+            category_id = self.selected_category_id() if self.categories_domain == domain else None
+            if category_id is None:
+                self.result_text.insert(tk.END, '카테고리를 선택하세요.\n')
+                return
+        posts = get_post_index().search(domain, text=text or None, category_id=category_id)
+        self.result_text.delete('1.0', tk.END)
+        self.result_text.insert(tk.END, f"--- 검색 결과: {len(posts)}개 (로컬 인덱스) ---\n")
+        self.insert_posts(posts)
+
+    def show_recent_posts(self):
+        selection = self.wp_listbox.curselection()
+        if not selection:
+            self.result_text.insert(tk.END, '계정을 선택하세요.\n')
+            return
+        domain = self.wp_accounts[selection[0]]['domain']
+        self.result_text.delete('1.0', tk.END)
+        self.result_text.insert(tk.END, '--- 최근 게시물 (로컬 인덱스) ---\n')
+        self.insert_posts(get_post_index().recent(domain))
+
+    def on_close(self):
+        self.executor.close()
+        self.destroy()
+
+    def show_categories(self, categories, domain):
+        self.result_text.insert(tk.END, '\n--- 카테고리 목록 ---\n')
+        self.categories = categories
+        self.categories_domain = domain
+        # 같은 이름의 하위 카테고리를 구분할 수 있도록 "부모/자식" 경로로 보여준다. 라벨 -> ID 는 한 번만 만든다.
+        index = TermIndex(categories)
+        self.category_labels = {f"{index.path_of(cat['id'])} (ID:{cat['id']})": cat['id'] for cat in categories}
+        cat_names = list(self.category_labels)
+        if self.category_menu:
+            self.category_menu.destroy()
+            self.category_menu = None
+        if cat_names:
+            self.category_var.set(cat_names[0])
+            self.category_menu = tk.OptionMenu(self, self.category_var, *cat_names)
+            self.category_menu.pack()
+        self.result_text.insert(tk.END, ''.join(f"ID: {cat['id']} | 이름: {cat['name']}\n" for cat in categories))
+
+    def on_account_selected(self, event=None):
+        selection = self.wp_listbox.curselection()
+        if not selection:
+            return
+        domain = self.wp_accounts[selection[0]]['domain']
+        if domain == self.categories_domain:
+            return
+        cached = get_taxonomy_cache().get(domain, 'categories')
+        if cached is not None:
+            self.show_categories(cached, domain)
+
+    def refresh_taxonomies(self):
+        selection = self.wp_listbox.curselection()
+        if not selection:
+            self.result_text.insert(tk.END, '계정을 선택하세요.\n')
+            return
+        account = self.wp_accounts[selection[0]]
+        client = get_client(account['domain'], account['username'], account['password'])
+        self.refresh_cat_btn.config(state='disabled')
+        self.executor.submit(
+            f"카테고리/태그 새로고침 {account['domain']}", self._load_taxonomies, client,
+            on_success=lambda result: self._on_taxonomies_loaded(result, account['domain']),
+            on_error=self._on_taxonomies_error,
+            on_finally=lambda: self.refresh_cat_btn.config(state='normal'),
+        )
+
+    def _load_taxonomies(self, task, client):
+        cache = get_taxonomy_cache()
+        should_cancel = lambda: task.cancelled
+        categories, source = load_terms(client, 'categories', cache, refresh=True, should_cancel=should_cancel)
+        tags, _ = load_terms(client, 'tags', cache, refresh=True, should_cancel=should_cancel)
+        return categories, source, tags
+
+    def _on_taxonomies_loaded(self, result, domain):
+        categories, source, tags = result
+        self.show_categories(categories, domain)
+        state = '변경 없음' if source == 'revalidated' else '갱신됨'
+        self.result_text.insert(tk.END, f"카테고리 {len(categories)}개 / 태그 {len(tags)}개 ({state})\n")
+
+    def _on_taxonomies_error(self, error):
+        if isinstance(error, WordPressAPIError):
+            self.result_text.insert(tk.END, f"⚠️ 카테고리/태그 새로고침 실패: {error.status_code}\n")
+        else:
+            self.result_text.insert(tk.END, f"🌐 네트워크 또는 요청 오류 발생: {error}\n")
+
     def create_post_to_category(self):
         selection = self.wp_listbox.curselection()
         if not selection:
@@ -148,49 +299,42 @@ class WordPressAuthGUI(tk.Tk):
         idx = selection[0]
         account = self.wp_accounts[idx]
         domain = account['domain']
-        username = account['username']
-        password = account['password']
-        # 카테고리 ID 추출
-        if not hasattr(self, 'categories') or not self.categories:
+        # 카테고리 ID 추출 (이번 세션에 조회하지 않았으면 캐시를 사용한다)
+        if self.categories_domain != domain:
+            cached = get_taxonomy_cache().get(domain, 'categories')
+            if cached is not None:
+                self.show_categories(cached, domain)
+        if not self.categories or self.categories_domain != domain:
             self.result_text.insert(tk.END, '카테고리 정보를 먼저 조회하세요.\n')
             return
-        selected_name = self.category_var.get()
-        selected_cat = next((cat for cat in self.categories if f"{cat['name']} (ID:{cat['id']})" == selected_name), None)
-        if not selected_cat:
+        cat_id = self.selected_category_id()
+        if cat_id is None:
             self.result_text.insert(tk.END, '카테고리를 선택하세요.\n')
             return
-        cat_id = selected_cat['id']
         title = self.post_title_entry.get().strip()
         content = self.post_content_entry.get().strip()
         if not title or not content:
             self.result_text.insert(tk.END, '글 제목과 내용을 입력하세요.\n')
             return
-        post_url = f"{domain}/wp-json/wp/v2/posts"
-        post_data = {
-            "title": title,
-            "content": content,
-            "categories": [cat_id],
-            "status": "publish"
-        }
-        try:
-            response = requests.post(post_url, auth=(username, password), json=post_data)
-            if response.status_code == 201:
-                self.result_text.insert(tk.END, f"✅ 글이 성공적으로 등록되었습니다! (ID: {response.json().get('id')})\n")
-            elif response.status_code == 401:
-                self.result_text.insert(tk.END, '❌ 인증 실패: 사용자 이름 또는 비밀번호가 올바르지 않습니다.\n')
-            else:
-                self.result_text.insert(tk.END, f"⚠️ 오류 발생: {response.status_code}\n{response.text}\n")
-        except Exception as e:
-            self.result_text.insert(tk.END, f"🌐 네트워크 또는 요청 오류 발생: {e}\n")
+        spec = PostSpec(title, content, category_ids=[cat_id])
+        self.executor.submit(f'글 작성 {domain}', lambda task: publish_post(account, spec),
+                             on_success=self._on_post_created)
+
+    def _on_post_created(self, result):
+        if result.ok:
+            self.result_text.insert(tk.END, f"✅ 글이 성공적으로 등록되었습니다! (ID: {result.post_id})\n")
+        elif isinstance(result.error, WordPressAPIError):
+            self.result_text.insert(tk.END, f"❌ {describe_error(result.error)}\n")
+        else:
+            self.result_text.insert(tk.END, f"🌐 네트워크 또는 요청 오류 발생: {result.error}\n")
 
     def fetch_authenticated_data(self):
         domain = self.domain_entry.get().strip().rstrip('/')
         username = self.user_entry.get().strip()
         password = self.pw_entry.get().strip()
-        api_url = f"{domain}/wp-json/wp/v2/posts"
         self.result_text.delete('1.0', tk.END)
         try:
-            response = requests.get(api_url, auth=(username, password))
+            response = get_client(domain, username, password).get('wp/v2/posts', params={'per_page': 2, '_fields': 'id,title'})
             if response.status_code == 200:
                 self.result_text.insert(tk.END, '✅ 워드프레스 인증 성공!\n')
                 post_data = response.json()
@@ -1,12 +1,12 @@
 import tkinter as tk
 from tkinter import scrolledtext
-import requests
+from wp_client import get_client, WordPressAPIError
+from background_executor import BackgroundExecutor
 
-class WordPressCategoryGUI(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title('워드프레스 카테고리 조회')
-        self.geometry('400x350')
+class WordPressCategoryPanel(tk.Frame):
+    def __init__(self, master, executor):
+        super().__init__(master)
+        self.executor = executor
 
         tk.Label(self, text='도메인 주소 (예: https://example.com)').pack()
         self.domain_entry = tk.Entry(self, width=50)
@@ -28,31 +28,52 @@ class WordPressCategoryGUI(tk.Tk):
         domain = self.domain_entry.get().strip().rstrip('/')
         username = self.user_entry.get().strip()
         password = self.pw_entry.get().strip()
-        categories_url = f"{domain}/wp-json/wp/v2/categories"
         self.result_text.delete('1.0', tk.END)
         if not domain or not username or not password:
             self.result_text.insert(tk.END, '도메인, 아이디, 비밀번호를 모두 입력하세요.\n')
             return
-        try:
-            response = requests.get(categories_url, auth=(username, password))
-            if response.status_code == 200:
-                categories = response.json()
-                self.result_text.insert(tk.END, '\n--- 카테고리 목록 ---\n')
-                cat_names = [f"{cat['name']} (ID:{cat['id']})" for cat in categories]
-                if self.category_menu:
-                    self.category_menu.destroy()
-                if cat_names:
-                    self.category_var.set(cat_names[0])
-                    self.category_menu = tk.OptionMenu(self, self.category_var, *cat_names)
-                    self.category_menu.pack()
-                for cat in categories:
-                    self.result_text.insert(tk.END, f"ID: {cat['id']} | 이름: {cat['name']}\n")
-            elif response.status_code == 401:
+        self.cat_btn.config(state='disabled')
+        self.executor.submit(
+            f'카테고리 조회 {domain}',
+            lambda task: get_client(domain, username, password).fetch_categories(should_cancel=lambda: task.cancelled),
+            on_success=self.show_categories,
+            on_error=self._on_fetch_error,
+            on_finally=lambda: self.cat_btn.config(state='normal'),
+        )
+
+    def show_categories(self, categories):
+        self.result_text.insert(tk.END, '\n--- 카테고리 목록 ---\n')
+        cat_names = [f"{cat['name']} (ID:{cat['id']})" for cat in categories]
+        if self.category_menu:
+            self.category_menu.destroy()
+        if cat_names:
+            self.category_var.set(cat_names[0])
+            self.category_menu = tk.OptionMenu(self, self.category_var, *cat_names)
+            self.category_menu.pack()
+        self.result_text.insert(tk.END, ''.join(f"ID: {cat['id']} | 이름: {cat['name']}\n" for cat in categories))
+
+    def _on_fetch_error(self, error):
+        if isinstance(error, WordPressAPIError):
+            if error.status_code == 401:
                 self.result_text.insert(tk.END, '❌ 인증 실패: 사용자 이름 또는 비밀번호가 올바르지 않습니다.\n')
             else:
-                self.result_text.insert(tk.END, f"⚠️ 오류 발생: {response.status_code}\n{response.text}\n")
-        except Exception as e:
-            self.result_text.insert(tk.END, f"🌐 네트워크 또는 요청 오류 발생: {e}\n")
+                self.result_text.insert(tk.END, f"⚠️ 오류 발생: {error.status_code}\n{error.response.text}\n")
+        else:
+            self.result_text.insert(tk.END, f"🌐 네트워크 또는 요청 오류 발생: {error}\n")
+
+class WordPressCategoryGUI(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title('워드프레스 카테고리 조회')
+        self.geometry('400x350')
+        self.executor = BackgroundExecutor(self)
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
+        self.panel = WordPressCategoryPanel(self, self.executor)
+        self.panel.pack(fill='both', expand=True)
+
+    def on_close(self):
+        self.executor.close()
+        self.destroy()
 
 if __name__ == '__main__':
     app = WordPressCategoryGUI()
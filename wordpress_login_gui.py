@@ -1,12 +1,12 @@
 import tkinter as tk
 from tkinter import scrolledtext
-import requests
+from wp_client import get_client
+from background_executor import BackgroundExecutor
 
-class WordPressLoginGUI(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title('워드프레스 로그인')
-        self.geometry('400x300')
+class WordPressLoginPanel(tk.Frame):
+    def __init__(self, master, executor):
+        super().__init__(master)
+        self.executor = executor
 
         tk.Label(self, text='도메인 주소 (예: https://example.com)').pack()
         self.domain_entry = tk.Entry(self, width=50)
@@ -26,21 +26,44 @@ class WordPressLoginGUI(tk.Tk):
         domain = self.domain_entry.get().strip().rstrip('/')
         username = self.user_entry.get().strip()
         password = self.pw_entry.get().strip()
-        api_url = f"{domain}/wp-json/wp/v2/posts"
         self.result_text.delete('1.0', tk.END)
         if not domain or not username or not password:
             self.result_text.insert(tk.END, '도메인, 아이디, 비밀번호를 모두 입력하세요.\n')
             return
-        try:
-            response = requests.get(api_url, auth=(username, password))
-            if response.status_code == 200:
-                self.result_text.insert(tk.END, f'✅ 워드프레스 인증 성공! ({domain} | {username})\n')
-            elif response.status_code == 401:
-                self.result_text.insert(tk.END, '❌ 인증 실패: 사용자 이름 또는 비밀번호가 올바르지 않습니다.\n')
-            else:
-                self.result_text.insert(tk.END, f"⚠️ 오류 발생: {response.status_code}\n{response.text}\n")
-        except Exception as e:
-            self.result_text.insert(tk.END, f"🌐 네트워크 또는 요청 오류 발생: {e}\n")
+        self.login_btn.config(state='disabled')
+        self.executor.submit(
+            f'로그인 확인 {domain}', self._check_login, domain, username, password,
+            on_success=lambda result: self._on_login_checked(result, domain, username),
+            on_error=lambda e: self.result_text.insert(tk.END, f"🌐 네트워크 또는 요청 오류 발생: {e}\n"),
+            on_finally=lambda: self.login_btn.config(state='normal'),
+        )
+
+    def _check_login(self, task, domain, username, password):
+        response = get_client(domain, username, password).get('wp/v2/posts', params={'per_page': 1, '_fields': 'id'})
+        return response.status_code, response.text
+
+    def _on_login_checked(self, result, domain, username):
+        status, text = result
+        if status == 200:
+            self.result_text.insert(tk.END, f'✅ 워드프레스 인증 성공! ({domain} | {username})\n')
+        elif status == 401:
+            self.result_text.insert(tk.END, '❌ 인증 실패: 사용자 이름 또는 비밀번호가 올바르지 않습니다.\n')
+        else:
+            self.result_text.insert(tk.END, f"⚠️ 오류 발생: {status}\n{text}\n")
+
+class WordPressLoginGUI(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title('워드프레스 로그인')
+        self.geometry('400x300')
+        self.executor = BackgroundExecutor(self)
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
+        self.panel = WordPressLoginPanel(self, self.executor)
+        self.panel.pack(fill='both', expand=True)
+
+    def on_close(self):
+        self.executor.close()
+        self.destroy()
 
 if __name__ == '__main__':
     app = WordPressLoginGUI()
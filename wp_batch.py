@@ -0,0 +1,106 @@
+import threading
+from wp_client import WordPressAPIError, normalize_domain
+from wp_probe import get_probe_cache
+
+# WordPress 5.6+ 의 /wp-json/batch/v1 로 여러 글 생성/수정 요청을 한 번에 보낸다.
+# 지원 여부는 /wp-json/ 인덱스의 namespaces (계정 확인 시 이미 받아 둔 probe) 로 판단하고,
+# 지원하지 않는 사이트나 배치 요청 자체가 거절된 사이트는 하나씩 보내는 방식으로 돌아간다.
+
+# 서버 기본 최대값 (rest_get_max_batch_size 필터로 바뀔 수 있다)
+MAX_BATCH_SIZE = 25
+# 배치 요청 자체가 이 코드로 실패하면 해당 사이트는 배치를 쓰지 않는다.
+UNSUPPORTED_STATUS = (400, 404, 405, 501)
+
+_support = {}
+_support_lock = threading.Lock()
+
+
+class SubResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    @property
+    def error_text(self):
+        if isinstance(self.body, dict):
+            return f"{self.status}: {self.body.get('message') or self.body.get('code') or self.body}"
+        return f'{self.status}: {str(self.body)[:300]}'
+
+
+def known_batch_support(domain):
+    # True/False, 아직 확인하지 않았으면 None
+    with _support_lock:
+        return _support.get(normalize_domain(domain))
+
+
+def _set_support(domain, supported):
+    with _support_lock:
+        _support[normalize_domain(domain)] = supported
+
+
+def supports_batch(client):
+    supported = known_batch_support(client.domain)
+    if supported is None:
+        probe, _ = get_probe_cache().probe(client)
+        supported = probe.supports_batch
+        if probe.reachable:
+            _set_support(client.domain, supported)
+    return supported
+
+
+def _response_body(response):
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+def _send_one(client, method, path, body):
+    response = client.request(method, path.lstrip('/'), json=body)
+    return SubResponse(response.status_code, _response_body(response))
+
+
+def send_requests(client, requests_list, batch_size=MAX_BATCH_SIZE, on_request=None):
+    # requests_list: [(method, path, body), ...] (path 는 '/wp/v2/posts' 형식)
+    # 입력 순서대로 SubResponse 목록을 돌려준다. 네트워크 오류는 requests 예외가 그대로 올라간다.
+    # on_request() 는 실제 HTTP 요청을 보낼 때마다 호출된다 (요청 수 집계용).
+    results = []
+    use_batch = len(requests_list) > 1 and supports_batch(client)
+    step = batch_size if use_batch else 1
+    for start in range(0, len(requests_list), step):
+        chunk = requests_list[start:start + step]
+        if use_batch and len(chunk) > 1:
+            if on_request:
+                on_request()
+            response = client.post('batch/v1', json={
+                'validation': 'normal',
+                'requests': [{'method': method, 'path': path, 'body': body} for method, path, body in chunk],
+            })
+            if response.status_code in (200, 207):
+                data = response.json()
+                results.extend(SubResponse(item.get('status', 500), item.get('body')) for item in data['responses'])
+                continue
+            if response.status_code not in UNSUPPORTED_STATUS:
+                raise WordPressAPIError(response)
+            # 배치가 꺼져 있거나 최대 크기가 더 작은 사이트: 이후에는 하나씩 보낸다.
+            _set_support(client.domain, False)
+            use_batch = False
+        for method, path, body in chunk:
+            if on_request:
+                on_request()
+            results.append(_send_one(client, method, path, body))
+    return results
+
+
+def create_posts(client, posts_data, on_request=None):
+    return send_requests(client, [('POST', '/wp/v2/posts', data) for data in posts_data], on_request=on_request)
+
+
+def update_posts(client, updates, on_request=None):
+    # updates: [(post_id, 바꿀 필드 dict), ...]
+    return send_requests(client, [('POST', f'/wp/v2/posts/{post_id}', data) for post_id, data in updates],
+                         on_request=on_request)
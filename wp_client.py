@@ -0,0 +1,184 @@
+import base64
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from background_executor import TaskCancelled
+from wp_metrics import TimedHTTPAdapter, endpoint_name, record_response, take_connect_time
+from rate_limit import THROTTLE_STATUSES, MAX_INLINE_WAIT, get_rate_limiter, is_blocked_response, parse_retry_after
+
+# 도메인별로 keep-alive Session 을 재사용하는 워드프레스 REST API 클라이언트.
+# 매 요청마다 TCP/TLS 핸드셰이크를 반복하지 않도록 모든 GUI 가 get_client() 로 공유한다.
+
+# br 응답은 brotli 모듈이 있어야 urllib3 가 풀 수 있으므로 있을 때만 요청한다.
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+# (connect, read) 초 단위
+DEFAULT_TIMEOUT = (5, 30)
+# 429/503 + 짧은 Retry-After 를 받았을 때 기다렸다가 다시 보내는 횟수 (GET/HEAD 만)
+THROTTLE_RETRIES = 2
+# 다시 보내도 서버 상태가 바뀌지 않는 메서드. POST 등은 발행 큐가 멱등 키로 재시도한다.
+RETRYABLE_METHODS = ('GET', 'HEAD')
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+# WordPress REST API 의 per_page 최대값
+MAX_PER_PAGE = 100
+DEFAULT_PAGE_WORKERS = 4
+CATEGORY_FIELDS = 'id,name,parent,count'
+TAG_FIELDS = 'id,name,count'
+
+
+class WordPressAPIError(Exception):
+    def __init__(self, response):
+        super().__init__(f'{response.status_code} {response.reason}')
+        self.response = response
+        self.status_code = response.status_code
+
+
+def normalize_domain(domain):
+    return domain.strip().rstrip('/')
+
+
+class WordPressClient:
+    def __init__(self, domain, username, password, timeout=DEFAULT_TIMEOUT,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE):
+        self.domain = normalize_domain(domain)
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = TimedHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # Basic-Auth 헤더는 한 번만 만들어 두고 모든 요청에 재사용한다.
+        token = base64.b64encode(f'{username}:{password}'.encode('utf-8')).decode('ascii')
+        self.session.headers.update({
+            'Authorization': f'Basic {token}',
+            'Accept': 'application/json',
+            'Accept-Encoding': ACCEPT_ENCODING,
+        })
+
+    def url(self, path):
+        return f"{self.domain}/wp-json/{path.lstrip('/')}"
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        # 도메인별 속도 조절/차단기(rate_limit) 를 거쳐 보낸다. GET/HEAD 는 429/503 에 짧은 Retry-After 가 오면
+        # 그만큼 기다렸다가 다시 보낸다. 503 은 서버가 요청을 처리한 뒤에도 올 수 있으므로 POST 는 다시 보내지 않는다.
+        limiter = get_rate_limiter().for_domain(self.domain)
+        retryable = method.upper() in RETRYABLE_METHODS
+        # 파일 업로드처럼 본문을 흘려보내는 요청은 응답 시간에 전송 시간이 섞인다.
+        streamed = hasattr(kwargs.get('data'), 'read')
+        for attempt in range(THROTTLE_RETRIES + 1):
+            limiter.acquire()
+            # 요청마다 연결/TTFB/전체 시간을 wp_metrics 링 버퍼에 기록한다.
+            take_connect_time()
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, self.url(path), **kwargs)
+            except requests.exceptions.RequestException as e:
+                limiter.release(error=e)
+                record_response(self.domain, method, path, None, started, error=e)
+                raise
+            status = response.status_code
+            retry_after = parse_retry_after(response.headers.get('Retry-After')) if status in THROTTLE_STATUSES else None
+            # 응답 시간은 서버 처리 시간에 가까운 TTFB 로 본다. 업로드는 전송 시간이 섞이므로 보지 않는다.
+            limiter.release(status, None if streamed else response.elapsed.total_seconds(), retry_after,
+                            is_blocked_response(response), key=(method, endpoint_name(path)))
+            record_response(self.domain, method, path, response, started, stream=kwargs.get('stream', False))
+            if (retry_after is None or retry_after > MAX_INLINE_WAIT or not retryable
+                    or attempt == THROTTLE_RETRIES):
+                return response
+            response.close()
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def fetch_all_pages(self, path, params=None, on_page=None, max_workers=DEFAULT_PAGE_WORKERS, should_cancel=None):
+        items, _ = self.fetch_pages(path, params=params, on_page=on_page, max_workers=max_workers,
+                                    should_cancel=should_cancel)
+        return items
+
+    def fetch_pages(self, path, params=None, on_page=None, max_workers=DEFAULT_PAGE_WORKERS, should_cancel=None):
+        # 1페이지를 받아 X-WP-TotalPages 를 확인한 뒤 나머지 페이지를 동시에 요청한다.
+        # on_page(page, items, total_pages) 는 페이지가 도착하는 순서대로 호출한 스레드에서 불린다.
+        # (전체 항목, 페이지 순서대로의 응답 목록) 을 돌려준다. 응답은 ETag 등 헤더를 보는 용도다.
+        # should_cancel() 이 참이 되면 TaskCancelled 를 낸다 (일부 페이지만 받은 목록을 완전한 결과로 쓰지 않도록).
+        params = dict(params or {})
+        params.setdefault('per_page', MAX_PER_PAGE)
+
+        def get_page(page):
+            response = self.get(path, params={**params, 'page': page})
+            if response.status_code != 200:
+                raise WordPressAPIError(response)
+            return response
+
+        first = get_page(1)
+        total_pages = int(first.headers.get('X-WP-TotalPages') or 1)
+        responses = {1: first}
+        pages = {1: first.json()}
+        if on_page:
+            on_page(1, pages[1], total_pages)
+        if total_pages > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, total_pages - 1)) as pool:
+                futures = {pool.submit(get_page, page): page for page in range(2, total_pages + 1)}
+                for future in as_completed(futures):
+                    if should_cancel and should_cancel():
+                        for pending in futures:
+                            pending.cancel()
+                        raise TaskCancelled()
+                    page = futures[future]
+                    responses[page] = future.result()
+                    pages[page] = responses[page].json()
+                    if on_page:
+                        on_page(page, pages[page], total_pages)
+        return ([item for page in sorted(pages) for item in pages[page]],
+                [responses[page] for page in sorted(responses)])
+
+    def fetch_categories(self, on_page=None, should_cancel=None):
+        return self.fetch_all_pages('wp/v2/categories', params={'_fields': CATEGORY_FIELDS},
+                                    on_page=on_page, should_cancel=should_cancel)
+
+    def fetch_tags(self, on_page=None, should_cancel=None):
+        return self.fetch_all_pages('wp/v2/tags', params={'_fields': TAG_FIELDS},
+                                    on_page=on_page, should_cancel=should_cancel)
+
+    def close(self):
+        self.session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(domain, username, password, **options):
+    # (도메인, 사용자) 마다 하나의 클라이언트를 공유한다. 비밀번호가 바뀌면 새로 만든다.
+    key = (normalize_domain(domain), username)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None and client.password == password and not options:
+            return client
+        if client is not None:
+            client.close()
+        client = WordPressClient(domain, username, password, **options)
+        _clients[key] = client
+        return client
+
+
+def close_all_clients():
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
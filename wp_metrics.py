@@ -0,0 +1,278 @@
+import collections
+import json
+import os
+import re
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from app_paths import data_path
+
+# 워드프레스/Gemini 호출마다 엔드포인트, 도메인, 상태 코드, 바이트 수, 연결 시간(DNS+TCP+TLS), TTFB, 전체 시간을
+# 고정 크기 링 버퍼에 기록한다. UI 스레드 지연(after 폴링이 늦게 불린 시간) 도 함께 기록해
+# 느린 원인이 네트워크/서버/Tk 스레드 중 어디인지 구분할 수 있게 한다.
+# 통계는 사이트별 최근 구간의 백분위로 보고, JSON 과 Prometheus 텍스트 형식 파일로 내보낼 수 있다.
+
+DEFAULT_CAPACITY = 5000
+DEFAULT_WINDOW = 300
+METRICS_JSON_FILE = 'metrics.json'
+METRICS_PROM_FILE = 'metrics.prom'
+QUANTILES = (0.5, 0.95, 0.99)
+
+KIND_WORDPRESS = 'wordpress'
+KIND_GEMINI = 'gemini'
+KIND_UI = 'ui'
+# 이보다 늦게 불린 UI 폴링만 기록한다 (매 프레임 기록하면 링 버퍼가 금방 찬다).
+UI_LAG_THRESHOLD = 0.05
+
+_local = threading.local()
+
+
+def _add_connect_time(seconds):
+    _local.connect_time = getattr(_local, 'connect_time', 0.0) + seconds
+
+
+def take_connect_time():
+    # 이 스레드에서 마지막으로 읽은 뒤 새로 맺은 연결에 걸린 시간 (재사용한 연결이면 0)
+    seconds = getattr(_local, 'connect_time', 0.0)
+    _local.connect_time = 0.0
+    return seconds
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - started)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        # DNS 조회 + TCP 연결 + TLS 핸드셰이크
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - started)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    # 새 연결을 맺는 데 걸린 시간을 잴 수 있도록 연결 클래스를 바꾼 어댑터
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool,
+                                                   'https': TimedHTTPSConnectionPool}
+
+
+def endpoint_name(path):
+    # /wp/v2/posts/123 -> /wp/v2/posts/{id} (엔드포인트별로 묶기 위해)
+    path = '/' + path.split('?', 1)[0].strip('/')
+    return re.sub(r'/\d+(?=/|$)', '/{id}', path)
+
+
+class RequestMetric:
+    __slots__ = ('timestamp', 'kind', 'domain', 'endpoint', 'method', 'status', 'bytes', 'connect', 'ttfb',
+                 'total', 'error')
+
+    def __init__(self, kind, domain, endpoint, method='GET', status=0, bytes=0, connect=0.0, ttfb=0.0,
+                 total=0.0, error=None):
+        self.timestamp = time.time()
+        self.kind = kind
+        self.domain = domain
+        self.endpoint = endpoint
+        self.method = method
+        self.status = status
+        self.bytes = bytes
+        self.connect = connect
+        self.ttfb = ttfb
+        self.total = total
+        self.error = error
+
+    @property
+    def failed(self):
+        return self.error is not None or self.status >= 400
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def quantile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class MetricsRecorder:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self._records = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        # 링 버퍼에서 밀려난 기록도 Prometheus 카운터에는 남도록 누적값을 따로 센다.
+        self._totals = collections.Counter()
+        self.enabled = True
+
+    def record(self, metric):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._records.append(metric)
+            key = (metric.kind, metric.domain)
+            self._totals[key + ('count',)] += 1
+            self._totals[key + ('errors',)] += 1 if metric.failed else 0
+            self._totals[key + ('seconds',)] += metric.total
+            self._totals[key + ('bytes',)] += metric.bytes
+
+    def records(self, window=None, kind=None):
+        since = time.time() - window if window else 0
+        with self._lock:
+            records = list(self._records)
+        return [r for r in records if r.timestamp >= since and (kind is None or r.kind == kind)]
+
+    def totals(self):
+        with self._lock:
+            return dict(self._totals)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._totals.clear()
+
+    def summary(self, window=DEFAULT_WINDOW):
+        # {(kind, domain): 통계 dict}. 시간 단위는 초.
+        groups = collections.defaultdict(list)
+        for record in self.records(window):
+            groups[(record.kind, record.domain)].append(record)
+        result = {}
+        for key, records in groups.items():
+            totals = [r.total for r in records]
+            connects = [r.connect for r in records if r.connect > 0]
+            stats = {
+                'count': len(records),
+                'errors': sum(1 for r in records if r.failed),
+                'bytes': sum(r.bytes for r in records),
+                'new_connections': len(connects),
+                'connect_avg': sum(connects) / len(connects) if connects else 0.0,
+                'ttfb_p50': quantile([r.ttfb for r in records], 0.5),
+            }
+            for q in QUANTILES:
+                stats[f'p{int(q * 100)}'] = quantile(totals, q)
+            result[key] = stats
+        return result
+
+    def export_json(self, path=None, window=DEFAULT_WINDOW):
+        path = path or data_path(METRICS_JSON_FILE)
+        data = {
+            'generated_at': time.time(),
+            'window': window,
+            'summary': [dict(kind=kind, domain=domain, **stats)
+                        for (kind, domain), stats in sorted(self.summary(window).items())],
+            'records': [r.to_dict() for r in self.records(window)],
+        }
+        _atomic_write(path, json.dumps(data, ensure_ascii=False, indent=1))
+        return path
+
+    def export_prometheus(self, path=None, window=DEFAULT_WINDOW):
+        path = path or data_path(METRICS_PROM_FILE)
+        lines = [
+            '# HELP wpbot_request_duration_seconds Request duration over the recent window.',
+            '# TYPE wpbot_request_duration_seconds summary',
+        ]
+        totals = self.totals()
+        for (kind, domain), stats in sorted(self.summary(window).items()):
+            labels = f'kind="{_escape(kind)}",domain="{_escape(domain)}"'
+            for q in QUANTILES:
+                lines.append(f'wpbot_request_duration_seconds{{{labels},quantile="{q}"}} {stats[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f'wpbot_request_duration_seconds_sum{{{labels}}} {totals.get((kind, domain, "seconds"), 0):.6f}')
+            lines.append(f'wpbot_request_duration_seconds_count{{{labels}}} {totals.get((kind, domain, "count"), 0)}')
+        for name, field, help_text in (('wpbot_request_errors_total', 'errors', 'Failed requests (status >= 400 or exception).'),
+                                       ('wpbot_response_bytes_total', 'bytes', 'Response body bytes.')):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for (kind, domain, total_field), value in sorted(totals.items()):
+                if total_field == field:
+                    lines.append(f'{name}{{kind="{_escape(kind)}",domain="{_escape(domain)}"}} {value}')
+        _atomic_write(path, '\n'.join(lines) + '\n')
+        return path
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _atomic_write(path, text):
+    tmp_path = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class AutoExporter:
+    # interval 초마다 JSON/Prometheus 파일을 다시 쓴다 (모니터링이 파일을 읽어 가도록).
+    def __init__(self, recorder, interval=15.0, json_path=None, prom_path=None):
+        self.recorder = recorder
+        self.interval = interval
+        self.json_path = json_path
+        self.prom_path = prom_path
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='wpbot-metrics-export', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.recorder.export_json(self.json_path)
+                self.recorder.export_prometheus(self.prom_path)
+            except OSError:
+                pass
+
+
+_recorder = MetricsRecorder()
+
+
+def get_recorder():
+    return _recorder
+
+
+def record_response(domain, method, path, response, started, error=None, stream=False):
+    # WordPressClient.request 에서 호출한다. response.elapsed 는 요청을 보낸 뒤 헤더를 받을 때까지의 시간이다.
+    total = time.perf_counter() - started
+    connect = take_connect_time()
+    if response is None:
+        _recorder.record(RequestMetric(KIND_WORDPRESS, domain, endpoint_name(path), method, total=total,
+                                       connect=connect, error=str(error)))
+        return
+    # stream=True 이면 본문을 아직 읽지 않았으므로 Content-Length 를 쓴다.
+    size = int(response.headers.get('Content-Length') or 0) if stream else len(response.content or b'')
+    _recorder.record(RequestMetric(KIND_WORDPRESS, domain, endpoint_name(path), method, response.status_code,
+                                   size, connect, response.elapsed.total_seconds(), total))
+
+
+def record_gemini(model_name, started, ttfb=None, chars=0, error=None):
+    total = time.perf_counter() - started
+    _recorder.record(RequestMetric(KIND_GEMINI, 'generativelanguage.googleapis.com', model_name, 'POST',
+                                   200 if error is None else 0, chars, 0.0, ttfb if ttfb is not None else total,
+                                   total, None if error is None else str(error)))
+
+
+def record_ui_lag(seconds):
+    if seconds < UI_LAG_THRESHOLD:
+        return
+    _recorder.record(RequestMetric(KIND_UI, 'tk', 'after', 'POLL', total=seconds, ttfb=seconds))
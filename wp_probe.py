@@ -0,0 +1,129 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 계정 추가/재확인 시 사용하는 읽기 전용 점검.
+# /wp-json/ (REST API 접근) 과 /wp/v2/users/me?context=edit (권한) 를 동시에 요청하고,
+# 결과는 (도메인, 사용자) 별로 일정 시간 캐시해 다시 확인할 때 요청을 보내지 않는다.
+
+PROBE_TTL = 600
+WRITE_CAPABILITIES = ('edit_posts', 'publish_posts')
+NOT_REST_ENDPOINT = 'WP REST API 엔드포인트가 아닙니다'
+
+
+class AccountProbe:
+    def __init__(self, index_status, user_status, index=None, user=None, error=None):
+        self.index_status = index_status
+        self.user_status = user_status
+        self.index = index or {}
+        self.user = user or {}
+        # 200 이지만 JSON 이 아닌 응답을 받았을 때의 설명
+        self.error = error
+        self.checked_at = time.time()
+
+    @property
+    def reachable(self):
+        return self.index_status == 200 and self.error is None
+
+    @property
+    def authenticated(self):
+        return self.user_status == 200 and self.error is None
+
+    @property
+    def capabilities(self):
+        return self.user.get('capabilities') or {}
+
+    @property
+    def can_write(self):
+        return self.authenticated and all(self.capabilities.get(cap) for cap in WRITE_CAPABILITIES)
+
+    @property
+    def namespaces(self):
+        return self.index.get('namespaces') or []
+
+    @property
+    def supports_batch(self):
+        # WordPress 5.6+ 의 /wp-json/batch/v1
+        return 'batch/v1' in self.namespaces
+
+
+def _password_fingerprint(password):
+    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+
+
+def _read_json(response):
+    # (status, body, error). 200 인데 JSON 객체가 아니면 (HTML 페이지, 보안 플러그인 차단 화면 등)
+    # WP REST API 가 아닌 것으로 본다.
+    if response.status_code != 200:
+        return response.status_code, None, None
+    try:
+        body = response.json()
+    except ValueError:
+        return 200, None, NOT_REST_ENDPOINT
+    if not isinstance(body, dict):
+        return 200, None, NOT_REST_ENDPOINT
+    return 200, body, None
+
+
+def probe_account(client, timeout=None):
+    # timeout 을 주면 클라이언트 기본값 대신 쓴다 (점검은 짧게 끝내야 하므로).
+    options = {'timeout': timeout} if timeout else {}
+
+    def get_index():
+        return _read_json(client.get('/', params={'_fields': 'name,namespaces'}, **options))
+
+    def get_me():
+        return _read_json(client.get('wp/v2/users/me', params={'context': 'edit', '_fields': 'id,name,roles,capabilities'},
+                                     **options))
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        index_future = pool.submit(get_index)
+        me_future = pool.submit(get_me)
+        index_status, index, index_error = index_future.result()
+        user_status, user, user_error = me_future.result()
+    return AccountProbe(index_status, user_status, index=index, user=user, error=index_error or user_error)
+
+
+class ProbeCache:
+    def __init__(self, ttl=PROBE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, client):
+        key = (client.domain, client.username)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        fingerprint, probe = entry
+        if fingerprint != _password_fingerprint(client.password) or time.time() - probe.checked_at >= self.ttl:
+            return None
+        return probe
+
+    def put(self, client, probe):
+        with self._lock:
+            self._entries[(client.domain, client.username)] = (_password_fingerprint(client.password), probe)
+
+    def invalidate(self, domain, username):
+        with self._lock:
+            self._entries.pop((domain, username), None)
+
+    def probe(self, client, refresh=False, timeout=None):
+        # (probe, cached) 를 돌려준다. 일시적인 오류(5xx/네트워크)는 캐시하지 않는다.
+        if not refresh:
+            probe = self.get(client)
+            if probe is not None:
+                return probe, True
+        probe = probe_account(client, timeout)
+        if probe.index_status < 500 and probe.user_status < 500:
+            self.put(client, probe)
+        return probe, False
+
+
+_default_cache = ProbeCache()
+
+
+def get_probe_cache():
+    return _default_cache
@@ -0,0 +1,205 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 가짜 워드프레스 서버(fake_wp_server.py) 를 띄워 계정 추가/카테고리 조회/발행 경로의 성능을 잰다.
+#   python wpbot_bench.py --posts 500 --latency-ms 30
+#   python wpbot_bench.py --compare ~/.wpbot/bench/bench-20250101-120000.json
+# 결과(건/s, p50/p95/p99 지연, HTTP 요청/TCP 연결 수) 는 JSON 으로 저장해 실행끼리 비교할 수 있다.
+
+SCENARIOS = ('account_add', 'category_fetch', 'category_revalidate', 'publish')
+USERNAME = 'bench'
+PASSWORD = 'bench-password'
+
+
+def percentile(values, pct):
+    # 최근접 순위 방식
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(name, latencies, elapsed, server, errors=0, extra=None):
+    counters = server.state.snapshot()
+    result = {
+        'scenario': name,
+        'ops': len(latencies),
+        'errors': errors,
+        'elapsed': round(elapsed, 4),
+        'ops_per_sec': round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'requests': counters['requests'],
+        'connections': counters['connections'],
+        'status_counts': counters['status_counts'],
+    }
+    result.update(extra or {})
+    return result
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def run_concurrently(fn, count, workers):
+    # fn() 을 count 번 실행하고 (각 지연 시간 목록, 오류 수, 전체 시간) 을 돌려준다.
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in [pool.submit(timed, fn) for _ in range(count)]:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    return latencies, errors, time.perf_counter() - started
+
+
+def bench_account_add(server, args):
+    from wp_client import get_client
+    from wp_probe import probe_account
+    client = get_client(server.url, USERNAME, PASSWORD)
+
+    def add():
+        probe = probe_account(client)
+        if not probe.can_write:
+            raise RuntimeError(probe.user_status)
+
+    latencies, errors, elapsed = run_concurrently(add, args.iterations, args.workers)
+    return summarize('account_add', latencies, elapsed, server, errors)
+
+
+def bench_category_fetch(server, args):
+    from wp_client import get_client
+    client = get_client(server.url, USERNAME, PASSWORD)
+    latencies, errors, elapsed = run_concurrently(client.fetch_categories, args.iterations, args.workers)
+    return summarize('category_fetch', latencies, elapsed, server, errors, {'categories': args.categories})
+
+
+def bench_category_revalidate(server, args):
+    # 디스크 캐시가 있는 상태에서 새로고침 (ETag 로 304 재검증)
+    from wp_client import get_client
+    from taxonomy_cache import TaxonomyCache, load_terms
+    client = get_client(server.url, USERNAME, PASSWORD)
+    cache = TaxonomyCache(path=os.path.join(tempfile.mkdtemp(prefix='wpbot-bench-'), 'taxonomy.json'))
+    load_terms(client, 'categories', cache)
+    server.state.reset_counters()
+    latencies, errors, elapsed = run_concurrently(lambda: load_terms(client, 'categories', cache, refresh=True),
+                                                  args.iterations, args.workers)
+    return summarize('category_revalidate', latencies, elapsed, server, errors)
+
+
+def bench_publish(server, args):
+    from wpbot_core import stream_publish
+    accounts = [{'domain': server.url, 'username': USERNAME, 'password': PASSWORD}]
+    rows = ((i, {'title': f'벤치마크 글 {i}', 'content': f'<p>본문 {i}</p>', 'categories': '카테고리 1|카테고리 2'})
+            for i in range(1, args.posts + 1))
+    latencies = []
+
+    def on_result(result):
+        latencies.append(result.elapsed)
+
+    stats = stream_publish(rows, accounts, workers=args.workers, on_result=on_result)
+    return summarize('publish', latencies, stats.elapsed, server, stats.failed,
+                     {'batch': not args.no_batch, 'client_requests': stats.requests})
+
+
+BENCHMARKS = {
+    'account_add': bench_account_add,
+    'category_fetch': bench_category_fetch,
+    'category_revalidate': bench_category_revalidate,
+    'publish': bench_publish,
+}
+
+
+def run(args):
+    # 캐시 파일이 실제 데이터 폴더를 건드리지 않도록 임시 폴더를 쓴다.
+    os.environ['WPBOT_HOME'] = tempfile.mkdtemp(prefix='wpbot-bench-home-')
+    from fake_wp_server import FakeConfig, FakeWordPressServer
+    from wp_client import close_all_clients
+    results = {}
+    for name in args.scenarios:
+        # 시나리오마다 새 서버 (카운터/연결 분리)
+        config = FakeConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                            categories=args.categories, username=USERNAME, password=PASSWORD,
+                            batch=not args.no_batch)
+        server = FakeWordPressServer(config).start()
+        try:
+            results[name] = BENCHMARKS[name](server, args)
+        finally:
+            close_all_clients()
+            server.stop()
+        print(format_result(results[name]), file=sys.stderr)
+    return {
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'config': {key: getattr(args, key) for key in ('iterations', 'posts', 'workers', 'latency_ms', 'jitter_ms',
+                                                       'error_rate', 'categories', 'no_batch')},
+        'results': results,
+    }
+
+
+def format_result(result):
+    return (f"{result['scenario']:<20} {result['ops']:>6}건 {result['ops_per_sec']:>9.1f}건/s  "
+            f"p50 {result['p50_ms']:>7.1f}ms p95 {result['p95_ms']:>7.1f}ms p99 {result['p99_ms']:>7.1f}ms  "
+            f"요청 {result['requests']:>5} 연결 {result['connections']:>3} 오류 {result['errors']}")
+
+
+def compare(current, baseline):
+    lines = []
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            continue
+        changes = []
+        for key in ('ops_per_sec', 'p50_ms', 'p95_ms', 'p99_ms', 'requests', 'connections'):
+            if before.get(key):
+                changes.append(f'{key} {(result[key] - before[key]) / before[key] * 100:+.1f}%')
+        lines.append(f"{name:<20} " + ', '.join(changes))
+    return '\n'.join(lines)
+
+
+def default_output_path():
+    from app_paths import data_path
+    directory = data_path('bench')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, time.strftime('bench-%Y%m%d-%H%M%S.json'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='가짜 워드프레스 서버로 성능 측정')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--iterations', type=int, default=200, help='계정 추가/카테고리 조회 반복 횟수')
+    parser.add_argument('--posts', type=int, default=500, help='발행할 글 수')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='서버 응답 지연')
+    parser.add_argument('--jitter-ms', type=float, default=10.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--categories', type=int, default=250)
+    parser.add_argument('--no-batch', action='store_true', help='batch/v1 미지원 사이트로 측정')
+    parser.add_argument('--output', help='결과 JSON 경로 (기본: ~/.wpbot/bench/bench-시각.json)')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON')
+    args = parser.parse_args(argv)
+    # 기본 출력 경로는 실제 데이터 폴더 기준이므로 WPBOT_HOME 을 바꾸기 전에 정한다.
+    output = args.output or default_output_path()
+    report = run(args)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'결과 저장: {output}', file=sys.stderr)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print(compare(report, json.load(f)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,293 @@
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from wpbot_core import (DEFAULT_WORKERS, PostSpec, StreamStats, client_for, collect_term_names, describe_error,
+                        ensure_terms, iter_rows, load_accounts, split_term_values, stream_publish)
+from bulk_update import Chain, Recategorize, ReplaceText, RewriteTitle, batch_enabled, bulk_update, describe_changes
+from term_resolver import get_term_resolver
+from wp_client import DEFAULT_PAGE_WORKERS, close_all_clients, normalize_domain
+from site_export import CODEC_GZIP, CODEC_ZSTD, RESOURCE_NAMES, available_codecs, export_sites, iter_export_rows
+
+# 화면 없이 (cron, 서버에서) 쓰는 명령줄 도구.
+#   python wpbot_cli.py publish posts.csv --accounts accounts.json --workers 8
+#   WPBOT_PASSWORD=... python wpbot_cli.py publish posts.jsonl --domain https://example.com --username admin
+# 입력 열: title, content, categories(ID 또는 이름/"부모/자식" 경로를 | 로 구분, JSONL 은 목록도 가능),
+#          tags(ID 또는 이름을 | 로 구분), status, domain, slug, date,
+#          featured_image(로컬 이미지 경로), ... 본문의 로컬 <img src> 는 업로드 후 사이트 주소로 바뀐다.
+#          (상대 경로는 입력 파일이 있는 폴더 기준이고, 그 폴더 밖의 파일과 이미지가 아닌 파일은 올리지 않는다)
+#   python wpbot_cli.py update --domain https://example.com --username admin --replace 옛문구 새문구 [--apply]
+# update 는 기존 글을 고친다. --apply 가 없으면 바뀔 글과 쓰기 요청 수만 보여준다 (dry-run).
+# --create-missing 을 주면 발행 전에 입력 전체를 한 번 훑어 사이트에 없는 카테고리/태그를 한 번에 만든다.
+#   python wpbot_cli.py export backup/ --accounts accounts.json [--compress zstd]
+# export 는 사이트 전체를 <폴더>/<사이트>/*.jsonl.gz 로 내보낸다. 중간에 멈추면 같은 명령으로 이어서 받는다.
+#   python wpbot_cli.py import backup/example.com --domain https://new.example.com --username admin --create-missing
+# import 는 내보낸 글을 publish 와 같은 방식으로 발행한다 (카테고리는 경로, 태그는 이름으로 맞춘다).
+# 결과는 글마다 JSON 한 줄로 표준 출력에, 진행 상황과 요약은 표준 오류에 쓴다.
+
+PROGRESS_INTERVAL = 5.0
+
+
+def parse_accounts(args):
+    if args.accounts:
+        return load_accounts(args.accounts)
+    password = os.environ.get('WPBOT_PASSWORD')
+    if not (args.domain and args.username and password):
+        raise SystemExit('--accounts 파일이나 --domain/--username 과 WPBOT_PASSWORD 환경 변수가 필요합니다.')
+    return [{'domain': normalize_domain(args.domain), 'username': args.username, 'password': password}]
+
+
+def result_line(result):
+    record = {'domain': result.domain, 'ok': result.ok}
+    if result.spec is not None:
+        record['line'] = result.spec.line
+        record['title'] = result.spec.title
+    if result.ok:
+        record['id'] = result.post_id
+    else:
+        record['error'] = describe_error(result.error)
+    if result.missing:
+        record['missing_categories'] = result.missing
+    if result.missing_tags:
+        record['missing_tags'] = result.missing_tags
+    return json.dumps(record, ensure_ascii=False)
+
+
+def scan_term_names(rows, base_dir):
+    # 입력을 한 번 훑어 필요한 카테고리/태그 이름만 모은다 (글 내용은 들고 있지 않는다).
+    specs = []
+    for line, row in rows:
+        try:
+            specs.append(PostSpec.from_row(row, line, base_dir))
+        except (ValueError, AttributeError):
+            continue
+        if len(specs) >= 1000:
+            yield specs
+            specs = []
+    yield specs
+
+
+def create_missing_terms(args, rows, accounts, base_dir):
+    names = {}
+    for specs in scan_term_names(rows, base_dir):
+        for domain, (categories, tags) in collect_term_names(specs).items():
+            merged = names.setdefault(domain, (set(), set()))
+            merged[0].update(categories)
+            merged[1].update(tags)
+    for domain, (created, errors) in ensure_terms(accounts, names, workers=args.workers).items():
+        print(f'[분류] {domain}: {created}개 생성' + (f', 실패 {errors}' if errors else ''), file=sys.stderr)
+
+
+def cmd_publish(args):
+    base_dir = os.path.dirname(os.path.abspath(args.input))
+    return publish_rows(args, parse_accounts(args), lambda: iter_rows(args.input, args.format), base_dir)
+
+
+def cmd_import(args):
+    if not os.path.isdir(args.site_dir):
+        raise SystemExit(f'내보낸 사이트 폴더가 아닙니다: {args.site_dir}')
+    return publish_rows(args, parse_accounts(args), lambda: iter_export_rows(args.site_dir), args.site_dir)
+
+
+def publish_rows(args, accounts, make_rows, base_dir):
+    # make_rows() 는 (줄 번호, dict) 이터레이터를 새로 만든다 (--create-missing 이면 두 번 읽는다).
+    if args.create_missing:
+        create_missing_terms(args, make_rows(), accounts, base_dir)
+    cancelled = [False]
+    last_report = [time.perf_counter()]
+    stats = StreamStats()
+
+    def on_interrupt(signum, frame):
+        # 첫 Ctrl+C 는 새 글 제출만 멈추고 진행 중인 요청은 마무리한다. 한 번 더 누르면 바로 종료한다.
+        cancelled[0] = True
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        print('중지 요청: 진행 중인 요청을 마무리합니다...', file=sys.stderr)
+
+    signal.signal(signal.SIGINT, on_interrupt)
+
+    def on_result(result):
+        print(result_line(result), flush=True)
+        now = time.perf_counter()
+        if now - last_report[0] >= args.progress_interval:
+            last_report[0] = now
+            print(f'[진행] {stats.summary()}', file=sys.stderr, flush=True)
+
+    stream_publish(make_rows(), accounts, workers=args.workers,
+                   max_in_flight=args.max_in_flight, on_result=on_result,
+                   should_cancel=lambda: cancelled[0], stats=stats, base_dir=base_dir)
+    close_all_clients()
+    print(f'[완료] {stats.summary()}', file=sys.stderr)
+    return 0 if stats.failed == 0 and stats.invalid == 0 else 1
+
+
+def cmd_export(args):
+    accounts = parse_accounts(args)
+    resources = args.only.split(',') if args.only else RESOURCE_NAMES
+    unknown = set(resources) - set(RESOURCE_NAMES)
+    if unknown:
+        raise SystemExit(f'알 수 없는 항목: {", ".join(sorted(unknown))} (가능: {", ".join(RESOURCE_NAMES)})')
+    if args.compress not in available_codecs():
+        raise SystemExit('zstd 로 압축하려면 zstandard 패키지가 필요합니다 (pip install zstandard).')
+    cancelled = [False]
+    last_report = [time.perf_counter()]
+
+    def on_interrupt(signum, frame):
+        # 요청한 페이지까지 받아 체크포인트를 남기고 멈춘다. 다시 실행하면 이어서 받는다.
+        cancelled[0] = True
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        print('중지 요청: 받는 중인 페이지를 저장하고 멈춥니다...', file=sys.stderr)
+
+    signal.signal(signal.SIGINT, on_interrupt)
+
+    def on_page(domain, resource, page, total_pages, items):
+        now = time.perf_counter()
+        if now - last_report[0] >= args.progress_interval:
+            last_report[0] = now
+            print(f'[진행] {domain} {resource} {page}/{total_pages} 페이지', file=sys.stderr, flush=True)
+
+    def on_site(domain, result):
+        if isinstance(result, Exception):
+            record = {'domain': domain, 'ok': False, 'error': describe_error(result)}
+        else:
+            record = {'ok': result.complete, **result.as_dict()}
+        print(json.dumps(record, ensure_ascii=False), flush=True)
+
+    results = export_sites(accounts, args.out_dir, args.compress, args.workers, args.sites, resources,
+                           restart=args.restart, on_page=on_page, on_site=on_site,
+                           should_cancel=lambda: cancelled[0])
+    close_all_clients()
+    ok = all(not isinstance(result, Exception) and result.complete for result in results.values())
+    return 0 if ok else 1
+
+
+def parse_term_ids(client, values):
+    # 카테고리 ID 또는 이름/경로 -> ID 목록
+    ids, names = split_term_values(values or [])
+    if names:
+        found, missing = get_term_resolver().resolve(client, names)
+        if missing:
+            raise SystemExit(f'{client.domain}: 카테고리를 찾을 수 없습니다: {", ".join(missing)}')
+        ids.extend(found)
+    return ids
+
+
+def build_transform(args, client):
+    transforms = []
+    for old, new in args.replace or []:
+        transforms.append(ReplaceText(old, new, args.field, regex=args.regex, ignore_case=args.ignore_case))
+    if args.title:
+        transforms.append(RewriteTitle(args.title))
+    if args.add_category or args.remove_category:
+        transforms.append(Recategorize(parse_term_ids(client, args.add_category),
+                                       parse_term_ids(client, args.remove_category)))
+    if not transforms:
+        raise SystemExit('--replace, --title, --add-category, --remove-category 중 하나 이상이 필요합니다.')
+    return Chain(transforms)
+
+
+def cmd_update(args):
+    accounts = parse_accounts(args)
+    failed = 0
+    for account in accounts:
+        client = client_for(account)
+        transform = build_transform(args, client)
+        params = {}
+        if args.search:
+            params['search'] = args.search
+        if args.category:
+            params['categories'] = ','.join(str(i) for i in parse_term_ids(client, args.category))
+        try:
+            plan, results = bulk_update(client, transform, params, dry_run=not args.apply)
+        except Exception as e:
+            print(json.dumps({'domain': account['domain'], 'ok': False, 'error': describe_error(e)},
+                             ensure_ascii=False), flush=True)
+            failed += 1
+            continue
+        results = dict(results or [])
+        for post_id, changes in plan.changes:
+            record = {'domain': account['domain'], 'id': post_id, 'fields': sorted(changes)}
+            if args.apply:
+                record['ok'] = results.get(post_id) is None
+                if results.get(post_id):
+                    record['error'] = results[post_id]
+                    failed += 1
+            else:
+                record['changes'] = changes
+                # 미리보기에서는 바뀔 내용을 사람이 읽기 쉬운 한 줄로도 보여준다.
+                print(describe_changes(post_id, changes), file=sys.stderr)
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+        for post_id, error in plan.errors:
+            print(json.dumps({'domain': account['domain'], 'id': post_id, 'ok': False, 'error': error},
+                             ensure_ascii=False), flush=True)
+        label = '[적용]' if args.apply else '[미리보기]'
+        print(f'{label} {account["domain"]}: {plan.summary(batch_enabled(client))}', file=sys.stderr)
+    close_all_clients()
+    return 0 if failed == 0 else 1
+
+
+def add_account_arguments(parser):
+    parser.add_argument('--accounts', help='계정 목록 JSON 파일')
+    parser.add_argument('--domain', help='단일 계정 도메인 (비밀번호는 WPBOT_PASSWORD)')
+    parser.add_argument('--username', help='단일 계정 사용자 이름')
+
+
+def add_publish_arguments(parser):
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='동시 요청 수')
+    parser.add_argument('--max-in-flight', type=int, help='동시에 처리 중인 요청(배치 포함)의 최대 수 (기본: 워커 수 x 2)')
+    parser.add_argument('--create-missing', action='store_true', help='없는 카테고리/태그를 발행 전에 만든다')
+    parser.add_argument('--progress-interval', type=float, default=PROGRESS_INTERVAL, help='진행 상황 출력 간격(초)')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='wpbot', description='워드프레스 일괄 발행 도구')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    publish = sub.add_parser('publish', help='CSV/JSONL 파일의 글을 발행한다')
+    publish.add_argument('input', help='입력 파일 (.csv, .jsonl)')
+    publish.add_argument('--format', choices=['csv', 'jsonl'], help='입력 형식 (기본: 확장자로 판단)')
+    add_account_arguments(publish)
+    add_publish_arguments(publish)
+    publish.set_defaults(func=cmd_publish)
+
+    export = sub.add_parser('export', help='사이트 전체를 압축된 JSONL 로 내보낸다 (이어받기 가능)')
+    export.add_argument('out_dir', help='출력 폴더 (사이트마다 하위 폴더를 만든다)')
+    add_account_arguments(export)
+    export.add_argument('--compress', choices=[CODEC_GZIP, CODEC_ZSTD], default=CODEC_GZIP, help='압축 형식')
+    export.add_argument('--only', help=f'내보낼 항목 (쉼표 구분, 기본: {",".join(RESOURCE_NAMES)})')
+    export.add_argument('--workers', type=int, default=DEFAULT_PAGE_WORKERS, help='사이트마다 동시에 받는 페이지 수')
+    export.add_argument('--sites', type=int, default=4, help='동시에 내보내는 사이트 수')
+    export.add_argument('--restart', action='store_true', help='체크포인트를 무시하고 처음부터 받는다')
+    export.add_argument('--progress-interval', type=float, default=PROGRESS_INTERVAL, help='진행 상황 출력 간격(초)')
+    export.set_defaults(func=cmd_export)
+
+    import_ = sub.add_parser('import', help='export 로 내보낸 사이트 폴더의 글을 발행한다')
+    import_.add_argument('site_dir', help='내보낸 사이트 폴더 (예: backup/example.com)')
+    add_account_arguments(import_)
+    add_publish_arguments(import_)
+    import_.set_defaults(func=cmd_import)
+
+    update = sub.add_parser('update', help='기존 글을 한꺼번에 고친다 (기본은 미리보기)')
+    add_account_arguments(update)
+    update.add_argument('--search', help='이 문구가 들어간 글만')
+    update.add_argument('--category', action='append', help='이 카테고리(ID 또는 이름/경로)의 글만')
+    update.add_argument('--replace', nargs=2, action='append', metavar=('OLD', 'NEW'), help='찾아 바꾸기 (여러 번 가능)')
+    update.add_argument('--field', choices=['content', 'title', 'excerpt'], default='content', help='--replace 대상 필드')
+    update.add_argument('--regex', action='store_true', help='--replace 의 OLD 를 정규식으로')
+    update.add_argument('--ignore-case', action='store_true')
+    update.add_argument('--title', help='제목 템플릿 ({title}, {id} 치환). 예: "[공지] {title}"')
+    update.add_argument('--add-category', action='append', help='추가할 카테고리 (ID 또는 이름/경로)')
+    update.add_argument('--remove-category', action='append', help='뺄 카테고리 (ID 또는 이름/경로)')
+    update.add_argument('--apply', action='store_true', help='실제로 적용한다')
+    update.set_defaults(func=cmd_update)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,417 @@
+import csv
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlparse
+from wp_client import get_client, normalize_domain, WordPressAPIError
+from rate_limit import is_blocked_response
+from term_resolver import get_term_resolver
+from wp_batch import MAX_BATCH_SIZE, create_posts, supports_batch
+from media_upload import get_media_uploader, media_paths
+
+# GUI 없이 쓸 수 있는 계정/카테고리/글 발행 로직.
+# GUI, 발행 큐, 명령줄 도구(wpbot_cli.py) 가 모두 이 모듈을 사용한다.
+
+DEFAULT_WORKERS = 8
+# 동시에 처리 중인 요청(배치 포함)의 최대 수 = 워커 수 * IN_FLIGHT_FACTOR (입력 파일을 한꺼번에 읽지 않는다)
+IN_FLIGHT_FACTOR = 2
+# CSV 의 categories 열은 이 문자로 여러 카테고리 이름을 구분한다 (이름에 쉼표가 들어갈 수 있어서).
+CATEGORY_SEPARATOR = '|'
+EXTRA_POST_FIELDS = ('slug', 'date', 'date_gmt', 'tags', 'featured_media', 'excerpt')
+
+
+def render_template(text, account):
+    # 사이트별 템플릿: {domain}, {host}, {username} 만 치환한다.
+    # (본문에 다른 중괄호가 있어도 깨지지 않도록 str.format 은 쓰지 않는다.)
+    values = {
+        '{domain}': account['domain'],
+        '{host}': urlparse(account['domain']).netloc or account['domain'],
+        '{username}': account['username'],
+    }
+    for placeholder, value in values.items():
+        text = text.replace(placeholder, value)
+    return text
+
+
+def split_term_values(values):
+    # 카테고리/태그 값 목록 -> (ID 목록, 이름 목록). 숫자로만 된 문자열은 ID 로 본다 (CSV 에서는 ID 도 문자열로 읽힌다).
+    ids, names = [], []
+    for value in values:
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, int):
+            ids.append(value)
+        elif isinstance(value, str) and value.strip():
+            value = value.strip()
+            if value.isascii() and value.isdigit():
+                ids.append(int(value))
+            else:
+                names.append(value)
+    return ids, names
+
+
+def client_for(account):
+    return get_client(account['domain'], account['username'], account['password'])
+
+
+def resolve_category_ids(client, names):
+    # 이름 또는 "부모/자식" 경로 목록 -> 사이트에 있는 카테고리 ID 목록
+    return get_term_resolver().resolve(client, names)[0]
+
+
+def build_post_data(account, title, content, category_ids, status='publish', extra=None):
+    post_data = {
+        'title': render_template(title, account),
+        'content': render_template(content, account),
+        'categories': category_ids,
+        'status': status,
+    }
+    for field in EXTRA_POST_FIELDS:
+        if extra and extra.get(field) not in (None, ''):
+            post_data[field] = extra[field]
+    return post_data
+
+
+def create_post(client, post_data):
+    # 새 글 ID 를 돌려준다. 201 이 아니면 WordPressAPIError, 네트워크 오류는 requests 예외가 올라간다.
+    response = client.post('wp/v2/posts', json=post_data)
+    if response.status_code != 201:
+        raise WordPressAPIError(response)
+    return response.json().get('id')
+
+
+def attach_media(client, content, featured_image=None, base_dir=None, uploader=None):
+    # 본문의 로컬 이미지와 대표 이미지를 사이트에 올리고 (바뀐 본문, featured_media ID 또는 None) 을 돌려준다.
+    # 본문의 로컬 경로는 base_dir 가 있을 때만 (입력 파일로 발행할 때) 바꾼다.
+    if not featured_image and (not base_dir or '<img' not in content.lower()):
+        return content, None
+    return (uploader or get_media_uploader()).prepare_post(client, content, featured_image, base_dir)
+
+
+def describe_error(error):
+    if isinstance(error, WordPressAPIError):
+        if error.status_code == 401:
+            return '인증 실패: 사용자 이름 또는 비밀번호가 올바르지 않습니다.'
+        if error.status_code == 429:
+            return '요청이 너무 많아 사이트가 잠시 거절했습니다 (429). 잠시 후 다시 시도하세요.'
+        if error.status_code == 503:
+            return '사이트가 일시적으로 응답할 수 없습니다 (503).'
+        if is_blocked_response(error.response):
+            return '보안 플러그인/방화벽이 요청을 차단했습니다 (403).'
+        return f'{error.status_code}: {error.response.text[:300]}'
+    return str(error)
+
+
+class PostSpec:
+    # 입력 파일의 한 행. domain 이 비어 있으면 모든 계정에 발행한다.
+    def __init__(self, title, content, category_names=None, category_ids=None, status='publish', domain=None,
+                 extra=None, line=None, featured_image=None, base_dir=None, tag_names=None):
+        self.title = title
+        self.content = content
+        # 카테고리 이름은 "뉴스/IT/AI" 처럼 부모 경로를 포함할 수 있다.
+        self.category_names = category_names or []
+        self.category_ids = category_ids
+        self.tag_names = tag_names or []
+        self.status = status or 'publish'
+        self.domain = normalize_domain(domain) if domain else None
+        self.extra = extra or {}
+        self.line = line
+        # 대표 이미지/본문 이미지의 로컬 경로 (상대 경로는 base_dir 기준)
+        self.featured_image = featured_image or None
+        self.base_dir = base_dir
+
+    @classmethod
+    def from_row(cls, row, line=None, base_dir=None):
+        title = (row.get('title') or '').strip()
+        content = row.get('content') or ''
+        if not title or not content:
+            raise ValueError('title 과 content 는 필수입니다.')
+        categories = row.get('categories') or []
+        if isinstance(categories, str):
+            categories = categories.split(CATEGORY_SEPARATOR)
+        ids, names = split_term_values(categories)
+        extra = {field: row[field] for field in EXTRA_POST_FIELDS if row.get(field) not in (None, '')}
+        # tags 열도 ID 와 이름(| 구분) 을 섞어 받는다.
+        tags = extra.pop('tags', None) or []
+        if isinstance(tags, str):
+            tags = tags.split(CATEGORY_SEPARATOR)
+        tag_ids, tag_names = split_term_values(tags)
+        if tag_ids:
+            extra['tags'] = tag_ids
+        return cls(title, content, names, ids or None, row.get('status'), row.get('domain'), extra, line,
+                   row.get('featured_image'), base_dir, tag_names)
+
+
+def iter_rows(path, fmt=None):
+    # 파일을 한 행씩 읽어 (줄 번호, dict) 를 돌려준다. fmt 가 없으면 확장자로 판단한다.
+    fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_num, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_num, json.loads(line)
+
+
+class PostResult:
+    def __init__(self, spec, account, post_id=None, error=None, missing=None, elapsed=0.0, missing_tags=None):
+        self.spec = spec
+        self.account = account
+        self.post_id = post_id
+        self.error = error
+        self.missing = missing or []
+        self.missing_tags = missing_tags or []
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def domain(self):
+        return self.account['domain'] if self.account else (self.spec.domain if self.spec else None)
+
+
+def resolve_terms(client, spec, resolver):
+    # (카테고리 ID, 태그 ID, 없는 카테고리, 없는 태그). ID 와 이름이 함께 있으면 둘 다 쓴다.
+    category_ids, missing = list(spec.category_ids or []), []
+    if spec.category_names:
+        found, missing = resolver.resolve(client, spec.category_names)
+        category_ids += [term_id for term_id in found if term_id not in category_ids]
+    tag_ids, missing_tags = [], []
+    if spec.tag_names:
+        tag_ids, missing_tags = resolver.resolve(client, spec.tag_names, 'tags')
+    return category_ids, tag_ids, missing, missing_tags
+
+
+def prepare_post_data(client, account, spec, resolver):
+    # (post_data, 없는 카테고리, 없는 태그)
+    category_ids, tag_ids, missing, missing_tags = resolve_terms(client, spec, resolver)
+    content, featured_media = attach_media(client, spec.content, spec.featured_image, spec.base_dir)
+    post_data = build_post_data(account, spec.title, content, category_ids, spec.status, spec.extra)
+    if tag_ids:
+        post_data['tags'] = list(dict.fromkeys(post_data.get('tags', []) + tag_ids))
+    if featured_media:
+        post_data['featured_media'] = featured_media
+    return post_data, missing, missing_tags
+
+
+def publish_post(account, spec, resolver=None):
+    started = time.perf_counter()
+    missing, missing_tags = [], []
+    try:
+        client = client_for(account)
+        post_data, missing, missing_tags = prepare_post_data(client, account, spec, resolver or get_term_resolver())
+        post_id = create_post(client, post_data)
+    except Exception as e:
+        return PostResult(spec, account, error=e, missing=missing, elapsed=time.perf_counter() - started,
+                          missing_tags=missing_tags)
+    return PostResult(spec, account, post_id=post_id, missing=missing, elapsed=time.perf_counter() - started,
+                      missing_tags=missing_tags)
+
+
+def publish_posts(account, specs, resolver=None, on_request=None):
+    # 같은 사이트의 글 여러 개를 batch/v1 로 묶어 보낸다 (지원하지 않으면 하나씩). 입력 순서대로 PostResult 목록.
+    started = time.perf_counter()
+    resolver = resolver or get_term_resolver()
+    results = [None] * len(specs)
+    prepared = []
+    try:
+        client = client_for(account)
+    except Exception as e:
+        return [PostResult(spec, account, error=e) for spec in specs]
+    # 배치에 들어 있는 글들의 이미지를 한꺼번에 동시에 올려 둔다 (실패는 아래에서 글마다 다시 드러난다).
+    paths = [path for spec in specs for path in media_paths(spec.content, spec.featured_image, spec.base_dir)]
+    if len(paths) > 1:
+        try:
+            get_media_uploader().ensure_many(client, paths)
+        except Exception:
+            pass
+    for index, spec in enumerate(specs):
+        try:
+            post_data, missing, missing_tags = prepare_post_data(client, account, spec, resolver)
+        except Exception as e:
+            results[index] = PostResult(spec, account, error=e)
+            continue
+        prepared.append((index, post_data, missing, missing_tags))
+    try:
+        responses = create_posts(client, [item[1] for item in prepared], on_request=on_request)
+    except Exception as e:
+        responses = [e] * len(prepared)
+    share = (time.perf_counter() - started) / max(1, len(specs))
+    for (index, _, missing, missing_tags), response in zip(prepared, responses):
+        spec = specs[index]
+        if isinstance(response, Exception):
+            result = PostResult(spec, account, error=response)
+        elif response.ok:
+            result = PostResult(spec, account, post_id=response.body.get('id'))
+        else:
+            result = PostResult(spec, account, error=response.error_text)
+        result.missing, result.missing_tags, result.elapsed = missing, missing_tags, share
+        results[index] = result
+    return results
+
+
+def collect_term_names(specs):
+    # {대상 도메인 또는 None(모든 계정): (카테고리 이름 집합, 태그 이름 집합)}
+    names = {}
+    for spec in specs:
+        categories, tags = names.setdefault(spec.domain, (set(), set()))
+        categories.update(spec.category_names)
+        tags.update(spec.tag_names)
+    return names
+
+
+def ensure_terms(accounts, names, resolver=None, workers=DEFAULT_WORKERS, on_request=None):
+    # 발행 전에 모든 글에 필요한 카테고리/태그 중 없는 것을 사이트마다 한 번에 만든다.
+    # {도메인: (만든 항목 수, {이름: 오류})}
+    resolver = resolver or get_term_resolver()
+    shared_categories, shared_tags = names.get(None, (set(), set()))
+
+    def ensure(account):
+        client = client_for(account)
+        categories, tags = names.get(normalize_domain(account['domain']), (set(), set()))
+        created, errors = resolver.ensure(client, sorted(shared_categories | categories), on_request=on_request)
+        created_tags, tag_errors = resolver.ensure(client, sorted(shared_tags | tags), 'tags', on_request=on_request)
+        errors.update(tag_errors)
+        return len(created) + len(created_tags), errors
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='wpbot-terms') as pool:
+        futures = {account['domain']: pool.submit(ensure, account) for account in accounts}
+        for domain, future in futures.items():
+            try:
+                results[domain] = future.result()
+            except Exception as e:
+                results[domain] = (0, {'*': describe_error(e)})
+    return results
+
+
+class StreamStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.invalid = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.requests = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    @property
+    def completed(self):
+        return self.succeeded + self.failed
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def throughput(self):
+        elapsed = self.elapsed
+        return self.completed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def average_latency(self):
+        return self.busy_seconds / self.completed if self.completed else 0.0
+
+    def summary(self):
+        return (f'행 {self.rows} (잘못된 행 {self.invalid}) / 발행 성공 {self.succeeded} / 실패 {self.failed}, '
+                f'HTTP 요청 {self.requests}, {self.elapsed:.1f}s, {self.throughput:.2f}건/s, '
+                f'글당 {self.average_latency * 1000:.0f}ms')
+
+
+def stream_publish(rows, accounts, workers=DEFAULT_WORKERS, max_in_flight=None, on_result=None,
+                   should_cancel=None, resolver=None, stats=None, base_dir=None):
+    # rows 는 (줄 번호, dict) 이터레이터. 사이트별로 글을 모아 batch/v1 한 번(최대 25개)으로 보내고,
+    # 처리 중인 요청이 max_in_flight 개를 넘지 않게 입력을 읽으므로 입력 크기와 관계없이 메모리 사용량이 일정하다.
+    # on_result(result) 는 이 스레드에서 호출된다.
+    max_in_flight = max_in_flight or workers * IN_FLIGHT_FACTOR
+    resolver = resolver or get_term_resolver()
+    by_domain = {normalize_domain(a['domain']): a for a in accounts}
+    stats = stats or StreamStats()
+    pending = set()
+    # (도메인, 사용자) -> [계정, 배치 크기, 모인 글 목록]
+    buffers = {}
+
+    def collect(done):
+        for future in done:
+            for result in future.result():
+                stats.busy_seconds += result.elapsed
+                if result.ok:
+                    stats.succeeded += 1
+                else:
+                    stats.failed += 1
+                if on_result:
+                    on_result(result)
+
+    def submit(account, specs):
+        nonlocal pending
+        while len(pending) >= max_in_flight:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+        pending.add(pool.submit(publish_posts, account, specs, resolver, stats.count_request))
+
+    def buffer_for(account):
+        key = (normalize_domain(account['domain']), account['username'])
+        buffer = buffers.get(key)
+        if buffer is None:
+            try:
+                batch_size = MAX_BATCH_SIZE if supports_batch(client_for(account)) else 1
+            except Exception:
+                batch_size = 1
+            buffer = buffers[key] = [account, batch_size, []]
+        return buffer
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='wpbot-publish') as pool:
+        for line, row in rows:
+            if should_cancel and should_cancel():
+                break
+            stats.rows += 1
+            try:
+                spec = PostSpec.from_row(row, line, base_dir)
+            except (ValueError, AttributeError) as e:
+                stats.invalid += 1
+                if on_result:
+                    on_result(PostResult(None, None, error=f'{line}행: {e}'))
+                continue
+            if spec.domain:
+                targets = [by_domain[spec.domain]] if spec.domain in by_domain else []
+                if not targets:
+                    stats.failed += 1
+                    if on_result:
+                        on_result(PostResult(spec, None, error=f'{spec.domain} 계정이 없습니다.'))
+                    continue
+            else:
+                targets = accounts
+            for account in targets:
+                buffer = buffer_for(account)
+                buffer[2].append(spec)
+                if len(buffer[2]) >= buffer[1]:
+                    submit(account, buffer[2])
+                    buffer[2] = []
+        # 이미 읽은 글은 취소되었더라도 보낸다 (진행 중인 작업으로 취급).
+        for account, _, specs in buffers.values():
+            if specs:
+                submit(account, specs)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    return stats
+
+
+def load_accounts(path):
+    # [{"domain": ..., "username": ..., "password": ...}, ...] 형식의 JSON 파일
+    with open(path, encoding='utf-8') as f:
+        accounts = json.load(f)
+    for account in accounts:
+        account['domain'] = normalize_domain(account['domain'])
+    return accounts